@@ -0,0 +1,123 @@
+import hashlib
+import os
+import numpy as np
+from backend.spatial import build_index
+
+# Street light and police station layers (etl/ingest_assets.py --csv-out data).
+# Both are optional; without them the bonuses below stay 0.
+#
+#   lighting_bonus = min(MAX_LIGHTING_BONUS,
+#                        LIGHT_BONUS_PER_LEVEL * brightness of working lights within LIGHT_RADIUS_M)
+#   police_bonus   = MAX_POLICE_BONUS * mean over the POLICE_K nearest stations
+#                    of max(0, 1 - distance / POLICE_RANGE_M)
+#
+# Both are radius joins on grid indexes, run on the same chunk of points as
+# the crime query, so extra layers add array work rather than per-point calls.
+
+LIGHTS_PATH = os.getenv("LIGHTS_PATH", "data/street_lights.csv")
+POLICE_STATIONS_PATH = os.getenv("POLICE_STATIONS_PATH", "data/police_stations.csv")
+
+LIGHT_RADIUS_M = float(os.getenv("LIGHT_RADIUS_M", "50"))
+LIGHT_BONUS_PER_LEVEL = float(os.getenv("LIGHT_BONUS_PER_LEVEL", "0.5"))
+MAX_LIGHTING_BONUS = float(os.getenv("MAX_LIGHTING_BONUS", "10"))
+POLICE_K = int(os.getenv("POLICE_K", "3"))
+POLICE_RANGE_M = float(os.getenv("POLICE_RANGE_M", "2000"))
+MAX_POLICE_BONUS = float(os.getenv("MAX_POLICE_BONUS", "5"))
+
+# AssetLayers constructor arguments, as stored in the crime snapshot (backend/snapshot.py)
+ASSET_ARRAYS = ("light_lats", "light_lons", "brightness", "station_lats", "station_lons")
+
+
+def _cell_deg(radius_m: float) -> float:
+    return max(radius_m / 111320.0, 1e-4)
+
+
+class AssetLayers:
+    """Working street lights (with brightness) and police stations, indexed."""
+
+    def __init__(self, light_lats, light_lons, brightness, station_lats, station_lons):
+        self.light_lats = np.asarray(light_lats, dtype=np.float64)
+        self.light_lons = np.asarray(light_lons, dtype=np.float64)
+        self.brightness = np.asarray(brightness, dtype=np.float64)
+        self.station_lats = np.asarray(station_lats, dtype=np.float64)
+        self.station_lons = np.asarray(station_lons, dtype=np.float64)
+        # Cells about one query radius wide, so a lookup scans ~9 small cells
+        self.light_index = build_index(
+            self.light_lats, self.light_lons, kind="grid", cell_deg=_cell_deg(LIGHT_RADIUS_M)
+        ) if len(self.light_lats) else None
+        self.station_index = build_index(
+            self.station_lats, self.station_lons, kind="grid", cell_deg=_cell_deg(POLICE_RANGE_M)
+        ) if len(self.station_lats) else None
+
+    @property
+    def num_lights(self) -> int:
+        return len(self.light_lats)
+
+    @property
+    def num_stations(self) -> int:
+        return len(self.station_lats)
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha1()
+        for arr in (self.light_lats, self.light_lons, self.brightness, self.station_lats, self.station_lons):
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def lighting(self, lats, lons):
+        """Return (lighting_bonus, lights_nearby) arrays for the given points."""
+        n = len(lats)
+        if self.light_index is None:
+            return np.zeros(n), np.zeros(n, dtype=np.int64)
+        pts, inc = self.light_index.query_radius_batch(lats, lons, LIGHT_RADIUS_M)
+        counts = np.bincount(pts, minlength=n)
+        level = np.bincount(pts, weights=self.brightness[inc], minlength=n)
+        return np.minimum(LIGHT_BONUS_PER_LEVEL * level, MAX_LIGHTING_BONUS), counts
+
+    def police(self, lats, lons, k: int = POLICE_K):
+        """Return (police_bonus, nearest station distance in m, inf if none in range)."""
+        n = len(lats)
+        bonus = np.zeros(n)
+        nearest = np.full(n, np.inf)
+        if self.station_index is None:
+            return bonus, nearest
+        pts, _, dist = self.station_index.query_radius_batch(lats, lons, POLICE_RANGE_M, return_distance=True)
+        if len(pts) == 0:
+            return bonus, nearest
+        # k nearest per point: sort by (point, distance), keep each point's first k
+        order = np.lexsort((dist, pts))
+        pts, dist = pts[order], dist[order]
+        rank = np.arange(len(pts)) - np.searchsorted(pts, pts, side="left")
+        nearest[pts[rank == 0]] = dist[rank == 0]
+        pts, dist = pts[rank < k], dist[rank < k]
+        closeness = np.bincount(pts, weights=1.0 - dist / POLICE_RANGE_M, minlength=n)
+        return MAX_POLICE_BONUS * closeness / k, nearest
+
+
+def asset_paths() -> tuple:
+    return LIGHTS_PATH, POLICE_STATIONS_PATH
+
+
+def read_asset_csvs(lights_path: str = None, stations_path: str = None):
+    """AssetLayers from the CSVs that exist, or None when neither does."""
+    lights_path = LIGHTS_PATH if lights_path is None else lights_path
+    stations_path = POLICE_STATIONS_PATH if stations_path is None else stations_path
+    has_lights = bool(lights_path) and os.path.exists(lights_path)
+    has_stations = bool(stations_path) and os.path.exists(stations_path)
+    if not has_lights and not has_stations:
+        return None
+    import pandas as pd
+    light_lats = light_lons = brightness = np.empty(0)
+    station_lats = station_lons = np.empty(0)
+    if has_lights:
+        lights = pd.read_csv(lights_path).dropna(subset=["latitude", "longitude"])
+        if "is_working" in lights.columns:
+            lights = lights[lights["is_working"].astype(str).str.lower().isin(("true", "1"))]
+        level = lights["brightness_level"] if "brightness_level" in lights.columns else pd.Series(1.0, index=lights.index)
+        light_lats, light_lons = lights["latitude"].to_numpy(), lights["longitude"].to_numpy()
+        brightness = level.fillna(1.0).to_numpy()
+    if has_stations:
+        stations = pd.read_csv(stations_path).dropna(subset=["latitude", "longitude"])
+        station_lats, station_lons = stations["latitude"].to_numpy(), stations["longitude"].to_numpy()
+    layers = AssetLayers(light_lats, light_lons, brightness, station_lats, station_lons)
+    print(f"Loaded {layers.num_lights} working street lights and {layers.num_stations} police stations.")
+    return layers
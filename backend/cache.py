@@ -0,0 +1,156 @@
+import importlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from backend import metrics
+from backend.temporal import time_bucket
+
+ROUTE_CACHE_BACKEND = os.getenv("ROUTE_CACHE_BACKEND", "memory") # memory, off, or module:Class
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "1024"))
+ROUTE_CACHE_TTL = float(os.getenv("ROUTE_CACHE_TTL", "600"))
+ROUTE_CACHE_PRECISION = int(os.getenv("ROUTE_CACHE_PRECISION", "4")) # decimals, 4 ~ 11 m
+
+
+class CacheBackend:
+    """Key/value store interface for cached routes.
+
+    Keys are strings and values are JSON-serializable, so implementations
+    backed by an external store (Redis, memcached, ...) can be plugged in
+    with `ROUTE_CACHE_BACKEND=package.module:ClassName`. The class is
+    constructed with `maxsize` and `ttl` keyword arguments.
+    """
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryCache(CacheBackend):
+    # LRU with a per-entry TTL; safe to share between threads
+    def __init__(self, maxsize: int = ROUTE_CACHE_SIZE, ttl: float = ROUTE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def load_backend(spec: str, **kwargs):
+    if not spec or spec == "off":
+        return None
+    if spec == "memory":
+        return InMemoryCache(**kwargs)
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)(**kwargs)
+
+
+class RouteCache:
+    """Caches OSRM responses and scored /route results.
+
+    Both are keyed on start/end coordinates snapped to `precision` decimals
+    plus the travel mode; scored results are additionally keyed on the
+    remaining request options and the crime dataset version, and the
+    scored layer is cleared whenever the dataset is reloaded.
+    """
+
+    def __init__(self, osrm_backend, routes_backend, precision: int = ROUTE_CACHE_PRECISION):
+        self.osrm = osrm_backend
+        self.routes = routes_backend
+        self.precision = precision
+
+    @classmethod
+    def from_env(cls):
+        kwargs = {"maxsize": ROUTE_CACHE_SIZE, "ttl": ROUTE_CACHE_TTL}
+        return cls(load_backend(ROUTE_CACHE_BACKEND, **kwargs), load_backend(ROUTE_CACHE_BACKEND, **kwargs))
+
+    @property
+    def enabled(self) -> bool:
+        return self.osrm is not None
+
+    def snap(self, request):
+        # Snapped coordinates are also what gets sent to OSRM, so a cached
+        # response is exactly the answer for its key
+        p = self.precision
+        return (round(request.start_lat, p), round(request.start_lon, p),
+                round(request.end_lat, p), round(request.end_lon, p))
+
+    def _osrm_key(self, request) -> str:
+        # Segment scoring needs OSRM's node annotations, which other modes skip
+        return "osrm:" + json.dumps([request.mode, request.scoring == "segments", *self.snap(request)])
+
+    def _routes_key(self, request, data_version: str) -> str:
+        options = request.model_dump(
+            mode="json", exclude={"start_lat", "start_lon", "end_lat", "end_lon"}
+        )
+        # Scores only depend on the departure's time bucket, not the exact time
+        options["departure_time"] = time_bucket(request.departure_time)
+        return "routes:" + json.dumps([data_version, *self.snap(request), options], sort_keys=True)
+
+    def get_osrm(self, request):
+        if not self.enabled:
+            return None
+        return _counted("osrm", self.osrm.get(self._osrm_key(request)))
+
+    def set_osrm(self, request, data):
+        if self.enabled:
+            self.osrm.set(self._osrm_key(request), data)
+
+    def get_routes(self, request, data_version: str):
+        if not self.enabled:
+            return None
+        return _counted("routes", self.routes.get(self._routes_key(request, data_version)))
+
+    def set_routes(self, request, data_version: str, routes: list):
+        if self.enabled:
+            self.routes.set(self._routes_key(request, data_version), routes)
+
+    def invalidate_routes(self):
+        if self.enabled:
+            self.routes.clear()
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        return {"enabled": True, "osrm": self.osrm.stats(), "routes": self.routes.stats()}
+
+
+def _counted(layer: str, value):
+    metrics.inc("route_cache_requests_total", layer=layer, result="miss" if value is None else "hit")
+    return value
@@ -0,0 +1,124 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Where CPU-bound scoring runs, so it doesn't block the event loop:
+#
+#   inline  - on the event loop (no hand-off overhead, but one request at a time)
+#   thread  - a thread pool; the NumPy kernels release the GIL, Python glue doesn't
+#   process - a process pool; each worker memory-maps the crime snapshot
+#             (scripts/build_snapshot.py), so the arrays live once in the page
+#             cache however many workers there are
+#
+# Workers load the dataset lazily and reload when the parent's dataset
+# version moves on, so hot reloads reach them on their next task. Compacted
+# ingested incidents are replayed from the incident log; pending (delta)
+# incidents travel with each task.
+
+SCORING_EXECUTOR = os.getenv("SCORING_EXECUTOR", "thread")
+EXECUTORS = ("inline", "thread", "process")
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0")) or os.cpu_count() or 1
+# Calls with fewer points score inline: cheaper than the hand-off, and they
+# don't queue behind large batches in the pool
+SCORING_OFFLOAD_MIN_POINTS = int(os.getenv("SCORING_OFFLOAD_MIN_POINTS", "64"))
+
+_pool = None
+_pool_kind = None
+_unavailable = set() # In a worker: (source, version) pairs that failed to load
+
+
+def get_pool(kind: str = None):
+    global _pool, _pool_kind
+    kind = kind or SCORING_EXECUTOR
+    if kind not in EXECUTORS:
+        raise ValueError(f"Unknown SCORING_EXECUTOR '{kind}'. Choose from {EXECUTORS}")
+    if kind == "inline":
+        return None
+    if _pool is None or _pool_kind != kind:
+        shutdown()
+        if kind == "thread":
+            _pool = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+        else:
+            import multiprocessing
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            _pool = ProcessPoolExecutor(max_workers=SCORING_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        _pool_kind = kind
+        print(f"Scoring on a {kind} pool of {SCORING_WORKERS} workers.")
+    return _pool
+
+
+def shutdown():
+    global _pool, _pool_kind
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = _pool_kind = None
+
+
+async def run(fn, lats, *args, kind: str = None):
+    """Await `fn(lats, *args)` on the configured executor.
+
+    `fn` is a module-level function of backend.scoring (picklable by name).
+    """
+    args = (lats,) + args
+    pool = get_pool(kind)
+    if pool is None or len(lats) < SCORING_OFFLOAD_MIN_POINTS:
+        return fn(*args)
+    loop = asyncio.get_running_loop()
+    if _pool_kind == "thread":
+        return await loop.run_in_executor(pool, fn, *args)
+
+    from backend import scoring
+    dataset = scoring.DATASET
+    if dataset is None:
+        return fn(*args)
+    delta = dataset.delta.batch() if len(dataset.delta) else None
+    result = await loop.run_in_executor(pool, _worker_call, fn, args, dataset.source_path, dataset.version,
+                                        dataset.incident_seq, delta)
+    if result is None:
+        # Worker couldn't load the same data (e.g. built in memory, not from a file)
+        return fn(*args)
+    return result
+
+
+async def warm_up(kind: str = None):
+    # Start the workers and load their data before the first request needs them
+    pool = get_pool(kind)
+    if pool is None or _pool_kind != "process":
+        return
+    from backend import scoring
+    dataset = scoring.DATASET
+    if dataset is None:
+        return
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(
+        loop.run_in_executor(pool, _worker_dataset, dataset.source_path, dataset.version, dataset.incident_seq)
+        for _ in range(SCORING_WORKERS)
+    ))
+
+
+def _dataset_version():
+    from backend import scoring
+    dataset = scoring.DATASET
+    return dataset.version if dataset is not None else None
+
+
+def _worker_dataset(source_path, version, incident_seq=0) -> bool:
+    # Runs in a pool process: (re)load when behind the parent's version
+    from backend import scoring
+    if _dataset_version() != version and source_path and (source_path, version) not in _unavailable:
+        scoring.load_crime_data(source_path, incident_limit=incident_seq)
+        if _dataset_version() != version:
+            _unavailable.add((source_path, version))
+    return _dataset_version() == version
+
+
+def _worker_call(fn, args, source_path, version, incident_seq=0, delta=None):
+    if not _worker_dataset(source_path, version, incident_seq):
+        return None
+    from backend import scoring
+    from backend.incidents import IncidentDelta
+    dataset = scoring.DATASET
+    # The delta only grows while the version stands, so its length identifies it
+    if len(dataset.delta) != (len(delta) if delta is not None else 0):
+        dataset.delta = IncidentDelta(incident_seq, delta)
+    return fn(*args)
@@ -0,0 +1,128 @@
+import math
+import numpy as np
+from backend.spatial import EARTH_RADIUS_M, haversine_np
+
+GEOMETRY_FORMATS = ("geojson", "polyline5", "polyline6")
+# Web Mercator metres per pixel at zoom 0 on the equator (256 px tiles)
+METERS_PER_PIXEL_Z0 = 156543.03392
+
+
+def encode_polyline(coordinates, precision: int = 5) -> str:
+    """Google encoded polyline of GeoJSON-ordered `[[lon, lat], ...]`."""
+    if len(coordinates) == 0:
+        return ""
+    pts = np.rint(np.asarray(coordinates, dtype=np.float64)[:, ::-1] * 10 ** precision).astype(np.int64)
+    deltas = np.diff(pts, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    # Zig-zag sign encoding, then 5-bit chunks
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1).tolist()
+
+    out = []
+    for v in values:
+        while v >= 0x20:
+            out.append(chr((0x20 | (v & 0x1F)) + 63))
+            v >>= 5
+        out.append(chr(v + 63))
+    return "".join(out)
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> list:
+    coords, index, lat, lon = [], 0, 0, 0
+    factor = 10 ** precision
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append([lon / factor, lat / factor])
+    return coords
+
+
+def zoom_tolerance(zoom: int, lat: float) -> float:
+    # Half a screen pixel at this zoom, in metres
+    return METERS_PER_PIXEL_Z0 * math.cos(math.radians(lat)) / 2 ** zoom / 2
+
+
+def simplify(coordinates, tolerance_m: float) -> list:
+    """Douglas-Peucker simplification of `[[lon, lat], ...]` with a metric tolerance."""
+    coords = np.asarray(coordinates, dtype=np.float64)
+    n = len(coords)
+    if n < 3 or tolerance_m <= 0:
+        return coords.tolist()
+
+    # Local equirectangular projection is plenty accurate at route scale
+    lat0 = math.radians(coords[:, 1].mean())
+    x = np.radians(coords[:, 0]) * math.cos(lat0) * EARTH_RADIUS_M
+    y = np.radians(coords[:, 1]) * EARTH_RADIUS_M
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        seg = math.hypot(dx, dy)
+        px, py = x[a + 1:b] - x[a], y[a + 1:b] - y[a]
+        if seg == 0:
+            dist = np.hypot(px, py)
+        else:
+            dist = np.abs(px * dy - py * dx) / seg
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance_m:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return coords[keep].tolist()
+
+
+def densify(coordinates, interval_m: float, max_points: int = None):
+    """Points every `interval_m` metres along a `[[lon, lat], ...]` line.
+
+    Returns `(lats, lons, step_m)`: the midpoints of equal steps of at most
+    `interval_m` covering the whole line, and the step length each point
+    stands for. Independent of how densely the input is noded. With
+    `max_points`, long lines get a wider step instead of more points.
+    """
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    lons, lats = coords[:, 0], coords[:, 1]
+    if len(coords) < 2:
+        return lats.copy(), lons.copy(), 0.0
+
+    seg = haversine_np(lats[:-1], lons[:-1], lats[1:], lons[1:])
+    cum = np.concatenate(([0.0], np.cumsum(seg)))
+    total = float(cum[-1])
+    n = max(1, int(math.ceil(total / interval_m)))
+    if max_points:
+        n = min(n, max_points)
+    step = total / n
+
+    s = (np.arange(n) + 0.5) * step
+    i = np.clip(np.searchsorted(cum, s, side="right") - 1, 0, len(seg) - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(seg[i] > 0, (s - cum[i]) / seg[i], 0.0)
+    return lats[i] + t * (lats[i + 1] - lats[i]), lons[i] + t * (lons[i + 1] - lons[i]), step
+
+
+def encode_geometry(geometry: dict, fmt: str = "geojson", simplify_zoom: int = None):
+    """RouteResponse.geometry: the GeoJSON LineString object, or an encoded polyline string."""
+    coordinates = geometry["coordinates"]
+    if simplify_zoom is not None and len(coordinates) > 2:
+        mid_lat = coordinates[len(coordinates) // 2][1]
+        coordinates = simplify(coordinates, zoom_tolerance(simplify_zoom, mid_lat))
+        geometry = {**geometry, "coordinates": coordinates}
+    if fmt == "polyline5":
+        return encode_polyline(coordinates, 5)
+    if fmt == "polyline6":
+        return encode_polyline(coordinates, 6)
+    return geometry
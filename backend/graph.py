@@ -0,0 +1,348 @@
+import heapq
+import json
+import math
+import numpy as np
+from backend.spatial import build_index, haversine_np
+from backend.scoring import haversine_distance
+
+# Free-flow speeds (km/h) per OSM highway type for the driving profile
+DRIVING_SPEEDS_KMH = {
+    "motorway": 100, "motorway_link": 50,
+    "trunk": 80, "trunk_link": 40,
+    "primary": 60, "primary_link": 40,
+    "secondary": 50, "secondary_link": 35,
+    "tertiary": 40, "tertiary_link": 30,
+    "unclassified": 30, "residential": 25,
+    "living_street": 10, "service": 15,
+}
+# Walking uses every way pedestrians may use, at a constant pace, ignoring oneway
+WALKING_HIGHWAYS = set(DRIVING_SPEEDS_KMH) - {"motorway", "motorway_link", "trunk", "trunk_link"} | {
+    "footway", "pedestrian", "path", "steps", "track", "cycleway", "corridor",
+}
+WALKING_SPEED_KMH = 5.0
+PROFILES = ("driving", "walking")
+
+GRAPH_ARRAYS = ("node_ids", "node_lats", "node_lons", "indptr", "targets",
+                "edge_length", "edge_time", "edge_way")
+
+
+class RoadGraph:
+    """Road network in compressed sparse row (CSR) form.
+
+    Outgoing edges of node `u` are `indptr[u]:indptr[u + 1]`; per-edge
+    arrays (`targets`, `edge_length` in metres, `edge_time` in seconds,
+    `edge_way` = OSM way id) share that indexing. `edge_risk` (0 safe ..
+    1 unsafe) is filled from the crime scores by `set_edge_risk`.
+    """
+
+    def __init__(self, node_ids, node_lats, node_lons, indptr, targets,
+                 edge_length, edge_time, edge_way, profile: str = "driving"):
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.node_lats = np.asarray(node_lats, dtype=np.float64)
+        self.node_lons = np.asarray(node_lons, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.edge_length = np.asarray(edge_length, dtype=np.float32)
+        self.edge_time = np.asarray(edge_time, dtype=np.float32)
+        self.edge_way = np.asarray(edge_way, dtype=np.int64)
+        self.profile = profile
+        self.edge_risk = np.zeros(len(self.targets), dtype=np.float32)
+
+        self.node_index = build_index(self.node_lats, self.node_lons, kind="grid")
+        # Fastest speed on any edge keeps the A* heuristic admissible
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speeds = self.edge_length / self.edge_time
+        self.max_speed = float(np.nanmax(speeds)) if len(speeds) else 1.0
+        self._cost_cache = {}
+        self._lists = None
+        self._edge_keys = None
+        self._midpoints = None # (lats, lons, grid index) of edge midpoints, built on first use
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def edge_sources(self) -> np.ndarray:
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+
+    @classmethod
+    def from_edges(cls, node_ids, node_lats, node_lons, src, dst, edge_time, edge_way, profile="driving"):
+        # Sort edge list by source node and build the CSR offsets
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        order = np.argsort(src, kind="stable")
+        src, dst = src[order], dst[order]
+        lats = np.asarray(node_lats, dtype=np.float64)
+        lons = np.asarray(node_lons, dtype=np.float64)
+        length = haversine_np(lats[src], lons[src], lats[dst], lons[dst])
+        indptr = np.zeros(len(lats) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(lats)), out=indptr[1:])
+        return cls(node_ids, lats, lons, indptr, dst, length,
+                   np.asarray(edge_time)[order], np.asarray(edge_way)[order], profile)
+
+    # --- Persistence ---------------------------------------------------
+
+    def save(self, path: str):
+        arrays = {name: getattr(self, name) for name in GRAPH_ARRAYS}
+        meta = {"profile": self.profile}
+        np.savez(path, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **arrays)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as f:
+            meta = json.loads(f["meta"].tobytes().decode())
+            return cls(*(f[name] for name in GRAPH_ARRAYS), profile=meta["profile"])
+
+    # --- OSM import ----------------------------------------------------
+
+    @classmethod
+    def from_osm(cls, path: str, profile: str = "driving"):
+        """Build a graph from an OSM extract (.osm XML, or .pbf with pyosmium)."""
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Choose from {PROFILES}")
+        if path.endswith(".pbf"):
+            ways, coords = _read_pbf(path, profile)
+        else:
+            ways, coords = _read_osm_xml(path, profile)
+
+        node_ids = np.array(sorted(coords), dtype=np.int64)
+        position = {nid: i for i, nid in enumerate(node_ids.tolist())}
+        lats = np.array([coords[n][0] for n in node_ids.tolist()])
+        lons = np.array([coords[n][1] for n in node_ids.tolist()])
+
+        src, dst, way_ids, speeds = [], [], [], []
+        for way_id, refs, speed_kmh, oneway in ways:
+            refs = [position[r] for r in refs if r in position]
+            for a, b in zip(refs, refs[1:]):
+                if oneway != -1:
+                    src.append(a); dst.append(b); way_ids.append(way_id); speeds.append(speed_kmh)
+                if oneway != 1:
+                    src.append(b); dst.append(a); way_ids.append(way_id); speeds.append(speed_kmh)
+
+        src, dst = np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+        length = haversine_np(lats[src], lons[src], lats[dst], lons[dst])
+        edge_time = length / (np.array(speeds, dtype=np.float64) / 3.6)
+        return cls.from_edges(node_ids, lats, lons, src, dst, edge_time, way_ids, profile)
+
+    # --- Safety --------------------------------------------------------
+
+    def _edge_midpoints(self):
+        if self._midpoints is None:
+            src = self.edge_sources()
+            mid_lats = (self.node_lats[src] + self.node_lats[self.targets]) / 2
+            mid_lons = (self.node_lons[src] + self.node_lons[self.targets]) / 2
+            self._midpoints = (mid_lats, mid_lons, build_index(mid_lats, mid_lons, kind="grid"))
+        return self._midpoints
+
+    def set_edge_risk(self, score_fn):
+        """Score every edge midpoint with `score_fn(lats, lons) -> array of 0-100 scores`."""
+        mid_lats, mid_lons, _ = self._edge_midpoints()
+        scores = np.asarray(score_fn(mid_lats, mid_lons), dtype=np.float32)
+        self.edge_risk = (100.0 - scores) / 100.0
+        self._cost_cache.clear()
+
+    def update_edge_risk(self, score_fn, lats, lons, radius_m: float) -> int:
+        """Rescore only the edges whose midpoint is within `radius_m` of a point
+        (e.g. newly added incidents); returns the number of edges rescored."""
+        mid_lats, mid_lons, index = self._edge_midpoints()
+        _, edges = index.query_radius_batch(lats, lons, radius_m)
+        edges = np.unique(edges)
+        if len(edges):
+            risk = self.edge_risk.copy() # Swapped whole: concurrent routing never sees a partial update
+            risk[edges] = (100.0 - np.asarray(score_fn(mid_lats[edges], mid_lons[edges]), dtype=np.float32)) / 100.0
+            self.edge_risk = risk
+            self._cost_cache.clear()
+        return len(edges)
+
+    def edge_costs(self, safety_weight: float) -> list:
+        # Travel time inflated by up to (1 + safety_weight) on the riskiest edges
+        key = round(float(safety_weight), 6)
+        costs = self._cost_cache.get(key)
+        if costs is None:
+            costs = (self.edge_time * (1.0 + key * self.edge_risk)).tolist()
+            self._cost_cache[key] = costs
+        return costs
+
+    # --- Queries -------------------------------------------------------
+
+    def nearest_node(self, lat: float, lon: float, max_radius_m: float = 2000):
+        idx, _ = self.node_index.nearest(lat, lon, k=1, max_radius_m=max_radius_m)
+        return int(idx[0]) if len(idx) else None
+
+    def edges_between(self, osm_node_ids) -> np.ndarray:
+        """Edge id for each consecutive pair of an OSM node sequence (-1 if absent).
+
+        Maps an OSRM `annotations=nodes` list onto this graph. A pair with
+        no edge in that direction (e.g. OSRM using another profile's oneway
+        rules) resolves to the reverse edge, which belongs to the same way.
+        """
+        if self._edge_keys is None:
+            order = np.argsort(self.node_ids, kind="stable")
+            keys = self.edge_sources() * self.num_nodes + self.targets
+            edge_order = np.argsort(keys, kind="stable")
+            self._edge_keys = (order, self.node_ids[order], keys[edge_order], edge_order)
+        order, sorted_ids, sorted_keys, edge_order = self._edge_keys
+
+        ids = np.asarray(osm_node_ids, dtype=np.int64)
+        if len(ids) < 2 or self.num_edges == 0:
+            return np.empty(0, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        nodes = np.where(sorted_ids[pos] == ids, order[pos], -1)
+        u, v = nodes[:-1], nodes[1:]
+
+        edges = np.full(len(u), -1, dtype=np.int64)
+        valid = (u >= 0) & (v >= 0)
+        for a, b in ((u, v), (v, u)):
+            keys = a * self.num_nodes + b
+            idx = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+            hit = valid & (edges < 0) & (sorted_keys[idx] == keys)
+            edges[hit] = edge_order[idx[hit]]
+        return edges
+
+    def shortest_path(self, src: int, dst: int, safety_weight: float = 0.0):
+        """A* over `edge_costs(safety_weight)`; returns edge ids or None."""
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.targets.tolist(),
+                           self.node_lats.tolist(), self.node_lons.tolist())
+        indptr, targets, lats, lons = self._lists
+        costs = self.edge_costs(safety_weight)
+        inv_speed = 1.0 / self.max_speed
+        goal_lat, goal_lon = lats[dst], lons[dst]
+
+        best = {src: 0.0}
+        came_from = {}
+        closed = set()
+        heap = [(haversine_distance(lats[src], lons[src], goal_lat, goal_lon) * inv_speed, 0.0, src)]
+        while heap:
+            _, g, u = heapq.heappop(heap)
+            if u == dst:
+                break
+            if u in closed:
+                continue
+            closed.add(u)
+            for e in range(indptr[u], indptr[u + 1]):
+                v = targets[e]
+                ng = g + costs[e]
+                if ng < best.get(v, math.inf):
+                    best[v] = ng
+                    came_from[v] = (u, e)
+                    h = haversine_distance(lats[v], lons[v], goal_lat, goal_lon) * inv_speed
+                    heapq.heappush(heap, (ng + h, ng, v))
+        else:
+            return None
+
+        edges = []
+        node = dst
+        while node != src:
+            node, e = came_from[node]
+            edges.append(e)
+        edges.reverse()
+        return edges
+
+    def path_to_route(self, edges: list, src: int) -> dict:
+        # Same shape as an OSRM route so /route can score it unchanged
+        nodes = [src] + self.targets[edges].tolist()
+        coordinates = np.column_stack((self.node_lons[nodes], self.node_lats[nodes])).tolist()
+        return {
+            "geometry": {"type": "LineString", "coordinates": coordinates},
+            "distance": float(self.edge_length[edges].sum()),
+            "duration": float(self.edge_time[edges].sum()),
+            "edges": edges,
+        }
+
+    def routes(self, start_lat, start_lon, end_lat, end_lon, safety_weights=(0.0, 2.0, 8.0)) -> list:
+        """Distinct paths from fastest (weight 0) to increasingly safety-weighted."""
+        src = self.nearest_node(start_lat, start_lon)
+        dst = self.nearest_node(end_lat, end_lon)
+        if src is None or dst is None:
+            return []
+        if src == dst:
+            return [self.path_to_route([], src)]
+
+        routes, seen = [], set()
+        for weight in safety_weights:
+            edges = self.shortest_path(src, dst, weight)
+            if edges is None or tuple(edges) in seen:
+                continue
+            seen.add(tuple(edges))
+            routes.append(self.path_to_route(edges, src))
+        return routes
+
+
+def _way_speed(tags: dict, profile: str):
+    highway = tags.get("highway")
+    if profile == "walking":
+        return WALKING_SPEED_KMH if highway in WALKING_HIGHWAYS else None
+    return DRIVING_SPEEDS_KMH.get(highway)
+
+
+def _way_oneway(tags: dict, profile: str) -> int:
+    if profile == "walking":
+        return 0
+    value = tags.get("oneway")
+    if value in ("yes", "true", "1") or tags.get("highway", "").startswith("motorway"):
+        return 1
+    if value == "-1":
+        return -1
+    return 0
+
+
+def _read_osm_xml(path: str, profile: str):
+    import xml.etree.ElementTree as ET
+
+    # Pass 1: routable ways and the node ids they reference
+    ways, referenced = [], set()
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+            speed = _way_speed(tags, profile)
+            if speed is not None:
+                refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+                ways.append((int(elem.get("id")), refs, speed, _way_oneway(tags, profile)))
+                referenced.update(refs)
+        if elem.tag in ("node", "way", "relation"):
+            elem.clear()
+
+    # Pass 2: coordinates of referenced nodes only
+    coords = {}
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "node":
+            nid = int(elem.get("id"))
+            if nid in referenced:
+                coords[nid] = (float(elem.get("lat")), float(elem.get("lon")))
+        if elem.tag in ("node", "way", "relation"):
+            elem.clear()
+    return ways, coords
+
+
+def _read_pbf(path: str, profile: str):
+    try:
+        import osmium
+    except ImportError:
+        raise ImportError("Reading .pbf extracts requires pyosmium (pip install osmium); "
+                          "alternatively convert the extract to .osm XML first.")
+
+    class Handler(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.ways, self.coords = [], {}
+
+        def way(self, w):
+            tags = {t.k: t.v for t in w.tags}
+            speed = _way_speed(tags, profile)
+            if speed is None:
+                return
+            refs = []
+            for n in w.nodes:
+                if n.location.valid():
+                    self.coords[n.ref] = (n.location.lat, n.location.lon)
+                    refs.append(n.ref)
+            self.ways.append((w.id, refs, speed, _way_oneway(tags, profile)))
+
+    handler = Handler()
+    handler.apply_file(path, locations=True)
+    return handler.ways, handler.coords
@@ -0,0 +1,202 @@
+import json
+import os
+from datetime import datetime
+import numpy as np
+from backend import temporal
+from backend.serialization import dumps
+from backend.spatial import build_index
+from backend.store import CrimeStore
+
+# Incidents reported through POST /incidents, on top of the crime data file.
+#
+#   delta     IncidentDelta: append-only, in memory; queried through a small
+#             grid index that is rebuilt when a read finds it has grown
+#   ingested  IncidentLayer: compacted incidents, immutable like the base
+#             store and part of the CrimeDataset
+#
+# Scores read base + ingested + delta, so an incident counts from the moment
+# its POST returns (read-your-writes, per process). Once the delta holds
+# INCIDENT_COMPACT_THRESHOLD incidents a background compaction merges it into
+# a new ingested layer and swaps the dataset; past INCIDENT_MAX_DELTA,
+# ingestion waits for that compaction, which bounds what every query pays
+# for the delta. The base store, its snapshot and raster are never rebuilt.
+#
+# Accepted incidents are appended to INCIDENT_LOG_PATH (NDJSON, one writer
+# process) before they are acknowledged; build_dataset replays the log, so
+# they survive reloads and restarts. Without a log they last until the next
+# reload.
+
+INCIDENT_LOG_PATH = os.getenv("INCIDENT_LOG_PATH", "data/incidents.ndjson") # Empty: memory only
+INCIDENT_COMPACT_THRESHOLD = int(os.getenv("INCIDENT_COMPACT_THRESHOLD", "5000"))
+INCIDENT_MAX_DELTA = int(os.getenv("INCIDENT_MAX_DELTA", "20000"))
+
+
+class IncidentBatch:
+    """Columnar incidents: coordinates, crime type names, severity (NaN when
+    unknown) and epoch times (temporal.NO_TIME when unknown)."""
+
+    def __init__(self, lats, lons, crime_types, severity, times):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.crime_types = list(crime_types)
+        self.severity = np.asarray(severity, dtype=np.float32)
+        self.times = np.asarray(times, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.lats)
+
+    @classmethod
+    def from_records(cls, records: list):
+        # Dicts as written to the log: lat, lon, crime_type, severity, date_time (ISO string)
+        if not records:
+            return cls.empty()
+        date_times = [r.get("date_time") for r in records]
+        times = (temporal.parse_times(date_times) if any(date_times)
+                 else np.full(len(records), temporal.NO_TIME, dtype=np.int64))
+        return cls(
+            [r["lat"] for r in records],
+            [r["lon"] for r in records],
+            [r.get("crime_type") or "Unknown" for r in records],
+            [np.nan if r.get("severity") is None else r["severity"] for r in records],
+            times,
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [])
+
+    @classmethod
+    def concat(cls, batches: list):
+        batches = [b for b in batches if len(b)]
+        if len(batches) == 1:
+            return batches[0]
+        if not batches:
+            return cls.empty()
+        return cls(
+            np.concatenate([b.lats for b in batches]),
+            np.concatenate([b.lons for b in batches]),
+            [t for b in batches for t in b.crime_types],
+            np.concatenate([b.severity for b in batches]),
+            np.concatenate([b.times for b in batches]),
+        )
+
+    def slice(self, start: int, end: int = None):
+        return IncidentBatch(self.lats[start:end], self.lons[start:end], self.crime_types[start:end],
+                             self.severity[start:end], self.times[start:end])
+
+    def to_store(self) -> CrimeStore:
+        # Types coded in order of first appearance (no pandas)
+        codes, names = [], {}
+        for t in self.crime_types:
+            codes.append(names.setdefault(t, len(names)))
+        return CrimeStore(self.lats, self.lons, np.array(codes, dtype=np.int16), list(names),
+                          self.severity, times=self.times)
+
+
+class IncidentLayer:
+    """An immutable batch of ingested incidents with its store and grid index."""
+
+    def __init__(self, batch: IncidentBatch):
+        self.batch = batch
+        self.store = batch.to_store()
+        self.index = build_index(self.store.lats, self.store.lons, kind="grid")
+
+    def __len__(self):
+        return len(self.batch)
+
+
+class IncidentDelta:
+    """Incidents ingested since the dataset was built, in arrival order.
+
+    `start_seq` is the log position of the first one. Appends are
+    serialized by the caller (scoring.add_incidents); `layer()` needs no
+    lock, it reads a length and the batches it covers.
+    """
+
+    def __init__(self, start_seq: int = 0, batch: IncidentBatch = None):
+        self.start_seq = start_seq
+        self._batches = []
+        self._count = 0
+        self._layer = None # (count, IncidentLayer) of the last read
+        if batch is not None and len(batch):
+            self.append(batch)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, batch: IncidentBatch):
+        self._batches.append(batch)
+        self._count += len(batch) # After the batch is in place: readers never see a short list
+
+    def batch(self) -> IncidentBatch:
+        count, batches = self._count, list(self._batches)
+        batch = IncidentBatch.concat(batches)
+        return batch if len(batch) == count else batch.slice(0, count)
+
+    def layer(self):
+        """IncidentLayer over the current contents, or None when empty."""
+        cached = self._layer
+        count = self._count
+        if count == 0:
+            return None
+        if cached is None or cached[0] != count:
+            batch = self.batch()
+            cached = self._layer = (len(batch), IncidentLayer(batch))
+        return cached[1]
+
+    def tail(self, seq: int) -> IncidentBatch:
+        # Entries from log position `seq` on (everything when seq precedes the delta)
+        return self.batch().slice(max(0, seq - self.start_seq))
+
+
+def validate(record: dict) -> dict:
+    """A log record from an incident dict; raises ValueError when it is unusable."""
+    try:
+        lat, lon = float(record["lat"]), float(record["lon"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("lat and lon are required numbers")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("lat/lon out of range")
+    severity = record.get("severity")
+    date_time = record.get("date_time")
+    if date_time is not None:
+        if isinstance(date_time, str):
+            date_time = datetime.fromisoformat(date_time)
+        # Logged as naive local time: offsets mixed across reports would make the log unparseable
+        date_time = temporal.local_time(date_time).isoformat()
+    return {
+        "lat": lat,
+        "lon": lon,
+        "crime_type": str(record.get("crime_type") or "Unknown"),
+        "severity": None if severity is None else float(severity),
+        "date_time": date_time,
+    }
+
+
+def append_log(records: list, path: str = None):
+    path = INCIDENT_LOG_PATH if path is None else path
+    if not path or not records:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(b"".join(dumps(r) + b"\n" for r in records))
+
+
+def read_log(path: str = None, limit: int = None):
+    """(IncidentBatch, lines read) from the first `limit` complete log lines."""
+    path = INCIDENT_LOG_PATH if path is None else path
+    if not path or not os.path.exists(path) or limit == 0:
+        return IncidentBatch.empty(), 0
+    records, lines = [], 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break # Still being written
+            lines += 1
+            try:
+                records.append(validate(json.loads(line)))
+            except ValueError as e: # json.JSONDecodeError is a ValueError
+                print(f"Skipping line {lines} of {path} ({e}).")
+            if limit is not None and lines >= limit:
+                break
+    return IncidentBatch.from_records(records), lines
@@ -1,123 +1,673 @@
-from fastapi import FastAPI, HTTPException
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
 from . import schemas
-from typing import List
-import json
-import httpx
+from typing import List, Optional
+from datetime import datetime
+import asyncio
+import hmac
+import os
+import numpy as np
 from contextlib import asynccontextmanager
-from backend.scoring import load_crime_data, calculate_safety_score
+from backend.scoring import load_crime_data, calculate_safety_score, score_values
+from backend.routing import OSRMClient, RoutingError
+from backend.cache import RouteCache
+from backend import scoring, reloader, executor, metrics, tiles, incidents
+from backend.geometry import densify, encode_geometry
+from backend.serialization import FastJSONResponse, dumps
+
+# Heavy or rarely used modules (httpx, pandas, SQLAlchemy) are imported where
+# they are first needed. STARTUP_PROFILE=1 logs startup stage timings.
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "0") == "1"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Load Data on Startup
-    load_crime_data()
+    t0 = time.perf_counter()
+    if scoring.SCORING_BACKEND == "postgis":
+        from backend import postgis_scoring
+        postgis_scoring.check_config(scoring.SCORING_MODE)
+        print("Scoring from PostGIS (SCORING_BACKEND=postgis); in-memory crime data not loaded.")
+    else:
+        load_crime_data(reloader.DATA_PATH)
+    if STARTUP_PROFILE:
+        print(f"[startup] import -> lifespan: {(t0 - _IMPORT_STARTED) * 1000:.1f} ms, "
+              f"load_crime_data: {(time.perf_counter() - t0) * 1000:.1f} ms")
+    if scoring.SCORING_BACKEND != "postgis":
+        await executor.warm_up()
+    # One pooled routing client for the application lifetime
+    app.state.osrm = OSRMClient()
+    watcher = None
+    if reloader.DATA_WATCH_INTERVAL > 0 and scoring.SCORING_BACKEND != "postgis":
+        watcher = asyncio.create_task(reloader.watch_crime_data(reloader.DATA_WATCH_INTERVAL))
     yield
+    if watcher is not None:
+        watcher.cancel()
+    await app.state.osrm.aclose()
+    executor.shutdown()
+    if scoring.SCORING_BACKEND == "postgis":
+        from backend.database import get_engine
+        await get_engine().dispose()
+
+# OSRM responses and scored routes; scored entries are dropped on data reload
+route_cache = RouteCache.from_env()
+
+def route_version(request) -> str:
+    # Results keep their key across incident compactions where scores allow it
+    # (locally routed paths follow the road graph, which compactions update)
+    if request.engine == "local":
+        return scoring.data_version()
+    return scoring.score_version(timed=request.departure_time is not None)
+
+def _invalidate_routes(compacted):
+    if compacted is None:
+        route_cache.invalidate_routes()
+
+scoring.add_reload_listener(_invalidate_routes)
 
 app = FastAPI(title="Safe Route Recommender API", lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="backend/static"), name="static")
 
+if STARTUP_PROFILE:
+    _first_response_logged = False
+
+    @app.middleware("http")
+    async def log_first_response(request: Request, call_next):
+        global _first_response_logged
+        response = await call_next(request)
+        if not _first_response_logged:
+            _first_response_logged = True
+            print(f"[startup] first response ({request.url.path}): "
+                  f"{(time.perf_counter() - _IMPORT_STARTED) * 1000:.1f} ms after import")
+        return response
+
+if metrics.METRICS_ENABLED or metrics.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Local routing engine: CSR road graph built by scripts/build_road_graph.py
+ROAD_GRAPH_PATH = os.getenv("ROAD_GRAPH_PATH", "data/road_graph.npz")
+LOCAL_SAFETY_WEIGHTS = tuple(float(w) for w in os.getenv("LOCAL_SAFETY_WEIGHTS", "0,2,8").split(","))
+_road_graph = None
+_road_graph_lock = asyncio.Lock()
+
+def _load_road_graph():
+    global _road_graph
+    from backend.graph import RoadGraph
+    graph = RoadGraph.load(ROAD_GRAPH_PATH)
+    dataset = None
+    while dataset is not scoring.DATASET:
+        # A reload while scoring found no graph to rescore: score against the new data
+        dataset = scoring.DATASET
+        graph.set_edge_risk(score_values)
+    print(f"Loaded road graph {ROAD_GRAPH_PATH} ({graph.num_nodes} nodes, {graph.num_edges} edges).")
+    _road_graph = graph
+
+async def get_road_graph():
+    # Loaded and scored in a worker thread on first use; concurrent first requests wait for one load
+    if _road_graph is None and os.path.exists(ROAD_GRAPH_PATH):
+        async with _road_graph_lock:
+            if _road_graph is None:
+                await asyncio.to_thread(_load_road_graph)
+    return _road_graph
+
+def _rescore_road_graph(compacted):
+    # Runs in the reloader's worker thread (scoring.set_dataset), off the request path
+    if _road_graph is None:
+        return
+    if compacted is None:
+        _road_graph.set_edge_risk(score_values)
+    else:
+        # Only edges within reach of the merged incidents can change
+        _road_graph.update_edge_risk(score_values, *scoring.compaction_reach(compacted))
+
+scoring.add_reload_listener(_rescore_road_graph)
+
+# Per-way scores precomputed by etl/score_road_segments.py for `"scoring": "segments"`
+SEGMENT_SCORES_PATH = os.getenv("SEGMENT_SCORES_PATH", "data/segment_scores.npz")
+# Fraction of a route's length that must map onto scored segments, else it is sampled
+SEGMENT_MIN_COVERAGE = float(os.getenv("SEGMENT_MIN_COVERAGE", "0.8"))
+_segment_scores = None # False once checked and unavailable
+
+def get_segment_scores():
+    global _segment_scores
+    if scoring.DATASET is None:
+        # postgis backend or no crime data loaded: nothing to check staleness against, so routes are sampled
+        return None
+    if _segment_scores is None:
+        from backend.segments import load_segment_scores
+        _segment_scores = load_segment_scores(SEGMENT_SCORES_PATH, scoring.DATASET.store) or False
+    return _segment_scores or None
+
+def _reset_segment_scores(compacted):
+    # Re-check staleness against the reloaded crime data on next use; they are
+    # built from the crime records alone, so compactions leave them valid
+    global _segment_scores
+    if compacted is None:
+        _segment_scores = None
+
+scoring.add_reload_listener(_reset_segment_scores)
+
+def get_osrm_client() -> OSRMClient:
+    client = getattr(app.state, "osrm", None)
+    if client is None:
+        client = app.state.osrm = OSRMClient()
+    return client
+
 @app.get("/")
 async def root():
     from fastapi.responses import FileResponse
     return FileResponse("backend/static/index.html")
 
+# "scoring": "continuous": sample spacing along the route, and a per-route
+# point cap that bounds scoring latency on very long routes
+ROUTE_SAMPLE_INTERVAL_M = float(os.getenv("ROUTE_SAMPLE_INTERVAL_M", "50"))
+ROUTE_MAX_SAMPLES = int(os.getenv("ROUTE_MAX_SAMPLES", "1000"))
+ROUTE_HOTSPOT_POINTS = 5 # Lowest-scoring samples whose crime types are reported
+
+def sample_route_points(coordinates: list) -> list:
+    # Sampling Strategy
+    points_to_sample = [
+        coordinates[0],
+        coordinates[len(coordinates)//2],
+        coordinates[-1]
+    ]
+    
+    # Add intermediate points if route is long
+    if len(coordinates) > 10:
+         step = len(coordinates) // 5
+         points_to_sample = coordinates[::step]
+    return points_to_sample
+
 @app.post("/route", response_model=List[schemas.RouteResponse])
 async def get_safe_route(request: schemas.RouteRequest):
-    # USE PUBLIC OSRM API (Note: This is for demo only, respect rate limits)
-    OSRM_URL = "http://router.project-osrm.org/route/v1/driving"
-    
-    # 1. Call OSRM
-    coords = f"{request.start_lon},{request.start_lat};{request.end_lon},{request.end_lat}"
-    # Request multiple alternatives
-    url = f"{OSRM_URL}/{coords}?alternatives=true&steps=false&geometries=geojson&overview=full"
-    
-    async with httpx.AsyncClient() as client:
+    score_version = route_version(request)
+    cached = route_cache.get_routes(request, score_version)
+    if cached is not None:
+        metrics.handler_done()
+        return route_response(request, cached)
+
+    data = await fetch_routes(request)
+
+    # 2. Process Routes
+    with metrics.stage("scoring"):
+        # Modes that score a whole route at once yield (score, analysis); None falls back to sampling
+        scored = [None] * len(data["routes"])
+        mode = whole_route_scoring(request)
+        if mode == "segments":
+            scored = await segment_route_scores(data["routes"])
+        elif mode == "continuous":
+            scored = await continuous_route_scores(data["routes"], request.departure_time)
+
+        # Score the sampled points of every remaining alternative in one batch
+        samples = [
+            sample_route_points(route["geometry"]["coordinates"]) if result is None else []
+            for route, result in zip(data["routes"], scored)
+        ]
+        flat = [pt for pts in samples for pt in pts]
+        # OSRM is [lon, lat], scoring is (lat, lon)
+        flat_results = await scoring.ascore_points(
+            [pt[1] for pt in flat], [pt[0] for pt in flat], when=request.departure_time
+        )
+
+    with metrics.stage("analysis"):
+        routes = []
+        offset = 0
+        for route, points_to_sample, result in zip(data["routes"], samples, scored):
+            if result is None:
+                result = sampled_analysis(flat_results[offset:offset + len(points_to_sample)])
+                offset += len(points_to_sample)
+            routes.append(route_result(request, route, *result))
+
+    routes.sort(key=lambda x: x["safety_score"], reverse=True)
+    route_cache.set_routes(request, score_version, routes)
+    metrics.handler_done()
+    return route_response(request, routes)
+
+def whole_route_scoring(request: schemas.RouteRequest):
+    """"segments", "continuous" or None (sample points) for this request."""
+    if request.scoring == "sampled":
+        return None
+    # Segment scores are time-independent; timed requests on timed data score continuously
+    dataset = scoring.DATASET
+    timed = request.departure_time is not None and dataset is not None and dataset.store.has_times
+    return "segments" if request.scoring == "segments" and not timed else "continuous"
+
+def sampled_analysis(points_results: list):
+    # (average score, analysis bullets) of one route's sampled points
+    avg_score = sum(res["score"] for res in points_results) / len(points_results)
+
+    # Aggregate Analysis
+    unique_crimes = set()
+    total_crimes_nearby = 0
+
+    for res in points_results:
+         if "crime_types" in res["details"]:
+             unique_crimes.update(res["details"]["crime_types"])
+         total_crimes_nearby += res["details"].get("crimes_nearby", 0)
+
+    analysis_points = []
+    if avg_score > 80:
+         analysis_points.append("✅ Route passes through statistically safe districts.")
+    else:
+         if total_crimes_nearby > 0:
+             analysis_points.append(f"⚠️ {total_crimes_nearby} reported incidents nearby.")
+         if unique_crimes:
+             top_crimes = list(unique_crimes)[:3]
+             analysis_points.append(f"🚨 Major risks: {', '.join(top_crimes)}")
+    return avg_score, analysis_points
+
+def route_result(request: schemas.RouteRequest, route: dict, avg_score: float, analysis_points: list) -> dict:
+    # Fallback description
+    explanation = f"Safety Score: {round(avg_score, 1)}/100. "
+    if avg_score < 50: explanation += "High Risk Zone."
+
+    # Plain dicts in RouteResponse field order
+    return {
+        "geometry": encode_geometry(route["geometry"], request.geometry_format, request.simplify_zoom),
+        "safety_score": round(avg_score, 1),
+        "duration_seconds": route["duration"],
+        "distance_meters": route["distance"],
+        "warnings": [],
+        "description": explanation,
+        "analysis": analysis_points,
+    }
+
+async def segment_route_scores(routes: list) -> list:
+    """Length-weighted precomputed segment scores per route.
+
+    Local routes carry their graph edge ids; OSRM routes are mapped onto the
+    graph through their node annotations. Entries are `(score, analysis)`,
+    or None where segment data is missing or covers too little of the route.
+    """
+    segments = get_segment_scores()
+    graph = await get_road_graph() if segments is not None else None
+    if graph is None:
+        return [None] * len(routes)
+
+    results = []
+    for route in routes:
+        edges = route.get("edges")
+        if edges is None:
+            nodes = [n for leg in route.get("legs", []) for n in leg.get("annotation", {}).get("nodes", [])]
+            edges = graph.edges_between(nodes)
+            edges = edges[edges >= 0]
+        score, scored_length, way_scores = segments.score_edges(graph, edges)
+        if score is None or scored_length < SEGMENT_MIN_COVERAGE * route["distance"]:
+            results.append(None)
+            continue
+        analysis = []
+        unsafe = sum(1 for way_score in way_scores.values() if way_score < 50)
+        if score > 80:
+            analysis.append("✅ Route passes through statistically safe districts.")
+        elif unsafe:
+            analysis.append(f"⚠️ {unsafe} of {len(way_scores)} road segments score below 50.")
+        results.append((score, analysis))
+    return results
+
+async def continuous_route_scores(routes: list, when: Optional[datetime] = None) -> list:
+    """Length-weighted mean score of every route, densified at a metric interval.
+
+    All alternatives are densified (at most ROUTE_MAX_SAMPLES points each,
+    wider steps beyond that) and scored in one vectorized pass; the score
+    is the integral of the point score along distance over route length.
+    """
+    densified = [densify(route["geometry"]["coordinates"], ROUTE_SAMPLE_INTERVAL_M, ROUTE_MAX_SAMPLES)
+                 for route in routes]
+    values = await scoring.ascore_values(
+        np.concatenate([d[0] for d in densified]), np.concatenate([d[1] for d in densified]), when=when
+    )
+
+    results, offset = [], 0
+    for lats, lons, step in densified:
+        scores = values[offset:offset + len(lats)]
+        offset += len(lats)
+        if len(scores) == 0:
+            results.append(None)
+            continue
+        # Equal steps, so the length-weighted mean is the plain mean
+        score = float(scores.mean())
+        analysis = []
+        if score > 80:
+            analysis.append("✅ Route passes through statistically safe districts.")
+        else:
+            high_risk_km = float((scores < 50).sum()) * step / 1000
+            if high_risk_km > 0:
+                analysis.append(f"⚠️ {high_risk_km:.1f} km of the route runs through high-risk areas.")
+            # Crime types only for the worst stretches, not every point
+            worst = np.argsort(scores)[:ROUTE_HOTSPOT_POINTS]
+            crime_types = set()
+            for res in await scoring.ascore_points(lats[worst], lons[worst], when=when):
+                crime_types.update(res["details"]["crime_types"])
+            if crime_types:
+                analysis.append(f"🚨 Major risks: {', '.join(sorted(crime_types)[:3])}")
+        results.append((score, analysis))
+    return results
+
+def route_response(request: schemas.RouteRequest, routes: list):
+    # Compact formats opt into one-pass encoding without pydantic re-validation
+    if request.geometry_format != "geojson" or request.simplify_zoom is not None:
+        return FastJSONResponse(routes)
+    return [schemas.RouteResponse(**r) for r in routes]
+
+# /route/stream: scoring time allowed before the remaining alternatives get a
+# coarse score, and the vertices that coarse score samples per route
+ROUTE_STREAM_BUDGET_MS = float(os.getenv("ROUTE_STREAM_BUDGET_MS", "1000"))
+ROUTE_COARSE_POINTS = 8
+
+@app.post("/route/stream")
+async def stream_safe_route(request: schemas.RouteRequest):
+    """NDJSON variant of /route: alternatives are scored concurrently and each
+    one is written as soon as it is ready, then a final ranking line.
+
+        {"type": "route", "index": 1, "coarse": false, "route": {RouteResponse}}
+        {"type": "ranking", "order": [1, 0], "coarse": [], "elapsed_ms": 12.3}
+
+    `index` is the OSRM order, `order` ranks indexes safest first. Routes
+    still scoring after ROUTE_STREAM_BUDGET_MS get a coarse score from a
+    few vertices and are listed in the ranking's `coarse`.
+    """
+    t0 = time.perf_counter()
+    score_version = route_version(request)
+    cached = route_cache.get_routes(request, score_version)
+    # Routing errors are raised here, before the 200 status goes out
+    data = await fetch_routes(request) if cached is None else None
+    metrics.handler_done()
+
+    def line(obj) -> bytes:
+        return dumps(obj) + b"\n"
+
+    async def lines():
+        if cached is not None:
+            # Cached lists are already sorted
+            for i, route in enumerate(cached):
+                yield line({"type": "route", "index": i, "coarse": False, "route": route})
+            yield line({"type": "ranking", "order": list(range(len(cached))), "coarse": [],
+                        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1)})
+            return
+
+        alternatives = data["routes"]
+        results = [None] * len(alternatives)
+        failed = []
+        tasks = {asyncio.create_task(score_alternative(request, route)): i for i, route in enumerate(alternatives)}
+        deadline = t0 + ROUTE_STREAM_BUDGET_MS / 1000
         try:
-            response = await client.get(url)
-            if response.status_code != 200:
-                print(f"OSRM Error: {response.text}")
-                raise HTTPException(status_code=500, detail="Routing engine error")
-            data = response.json()
-        except httpx.RequestError as exc:
-             raise HTTPException(status_code=503, detail=f"Routing service unavailable: {exc}")
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.perf_counter()),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    i = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        print(f"Scoring route {i} failed ({e}); using the coarse score.")
+                        failed.append(i)
+                        continue
+                    if all(r is None for r in results):
+                        metrics.observe("stage_duration_ms", (time.perf_counter() - t0) * 1000, stage="first_route")
+                    results[i] = route_result(request, alternatives[i], *result)
+                    yield line({"type": "route", "index": i, "coarse": False, "route": results[i]})
+        finally:
+            # Over budget, or the client went away
+            for task in tasks:
+                task.cancel()
+
+        coarse = sorted(failed + list(tasks.values()))
+        for i in coarse:
+            results[i] = route_result(request, alternatives[i], *await coarse_alternative(request, alternatives[i]))
+            yield line({"type": "route", "index": i, "coarse": True, "route": results[i]})
+
+        order = sorted(range(len(results)), key=lambda i: results[i]["safety_score"], reverse=True)
+        if not coarse:
+            route_cache.set_routes(request, score_version, [results[i] for i in order])
+        yield line({"type": "ranking", "order": order, "coarse": coarse,
+                    "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1)})
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+async def score_alternative(request: schemas.RouteRequest, route: dict):
+    """(score, analysis) of one alternative, as /route scores it."""
+    mode = whole_route_scoring(request)
+    result = None
+    if mode == "segments":
+        result = (await segment_route_scores([route]))[0]
+    elif mode == "continuous":
+        result = (await continuous_route_scores([route], request.departure_time))[0]
+    if result is None:
+        points = sample_route_points(route["geometry"]["coordinates"])
+        result = sampled_analysis(await scoring.ascore_points(
+            [pt[1] for pt in points], [pt[0] for pt in points], when=request.departure_time
+        ))
+    return result
+
+async def coarse_alternative(request: schemas.RouteRequest, route: dict):
+    # A few evenly spaced vertices: small enough to score inline, whatever the executor
+    coordinates = route["geometry"]["coordinates"]
+    picks = np.unique(np.linspace(0, len(coordinates) - 1, ROUTE_COARSE_POINTS).round().astype(int))
+    points = [coordinates[k] for k in picks]
+    score, analysis = sampled_analysis(await scoring.ascore_points(
+        [pt[1] for pt in points], [pt[0] for pt in points], when=request.departure_time
+    ))
+    return score, analysis + ["⏱️ Coarse estimate: full scoring ran over the time budget."]
+
+async def fetch_routes(request: schemas.RouteRequest) -> dict:
+    if request.engine == "local":
+        with metrics.stage("routing"):
+            data = await local_routes(request)
+    else:
+        with metrics.stage("osrm"):
+            data = await osrm_routes(request)
 
     if data["code"] != "Ok":
         raise HTTPException(status_code=400, detail="No route found")
+    return data
 
-    # 2. Process Routes
-    routes = []
-    
-    for route in data["routes"]:
-        geometry = route["geometry"]
-        coordinates = geometry["coordinates"]
-        
-        # Sampling Strategy
-        points_to_sample = [
-            coordinates[0],
-            coordinates[len(coordinates)//2],
-            coordinates[-1]
-        ]
-        
-        # Add intermediate points if route is long
-        if len(coordinates) > 10:
-             step = len(coordinates) // 5
-             points_to_sample = coordinates[::step]
-
-        points_results = []
-        total_score = 0
-        for pt in points_to_sample:
-            # OSRM is [lon, lat], scoring is (lat, lon)
-            res = await calculate_safety_score(pt[1], pt[0])
-            points_results.append(res)
-            total_score += res["score"]
-            
-        avg_score = total_score / len(points_to_sample)
-        
-        # Aggregate Analysis
-        unique_crimes = set()
-        total_crimes_nearby = 0
-        
-        for res in points_results:
-             if "crime_types" in res["details"]:
-                 unique_crimes.update(res["details"]["crime_types"])
-             total_crimes_nearby += res["details"].get("crimes_nearby", 0)
-
-        analysis_points = []
-        if avg_score > 80:
-             analysis_points.append("✅ Route passes through statistically safe districts.")
+async def osrm_routes(request: schemas.RouteRequest) -> dict:
+    # 1. Call OSRM (multiple alternatives)
+    data = route_cache.get_osrm(request)
+    if data is None:
+        if route_cache.enabled:
+            coords = route_cache.snap(request)
         else:
-             if total_crimes_nearby > 0:
-                 analysis_points.append(f"⚠️ {total_crimes_nearby} reported incidents nearby.")
-             if unique_crimes:
-                 top_crimes = list(unique_crimes)[:3]
-                 analysis_points.append(f"🚨 Major risks: {', '.join(top_crimes)}")
-        
-        # Fallback description
-        explanation = f"Safety Score: {round(avg_score, 1)}/100. "
-        if avg_score < 50: explanation += "High Risk Zone."
-             
-        routes.append(
-            schemas.RouteResponse(
-                geometry=json.dumps(geometry),
-                safety_score=round(avg_score, 1),
-                duration_seconds=route["duration"],
-                distance_meters=route["distance"],
-                warnings=[],
-                description=explanation,
-                analysis=analysis_points
-            )
-        )
-    
-    routes.sort(key=lambda x: x.safety_score, reverse=True)
-    return routes
+            coords = (request.start_lat, request.start_lon, request.end_lat, request.end_lon)
+        try:
+            data = await get_osrm_client().route(*coords, annotations=request.scoring == "segments")
+        except RoutingError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+        if data["code"] == "Ok":
+            route_cache.set_osrm(request, data)
+    return data
+
+async def local_routes(request: schemas.RouteRequest) -> dict:
+    graph = await get_road_graph()
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Local routing graph not available")
+    routes = await asyncio.to_thread(
+        graph.routes, request.start_lat, request.start_lon, request.end_lat, request.end_lon, LOCAL_SAFETY_WEIGHTS
+    )
+    return {"code": "Ok" if routes else "NoRoute", "routes": routes}
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return route_cache.stats()
+
+metrics.add_gauge("crime_records", lambda: len(scoring.DATASET.store), "Incidents in the loaded crime dataset.")
+metrics.add_gauge("crime_data_loaded_timestamp_seconds", lambda: scoring.DATASET.loaded_at,
+                  "When the current crime dataset was loaded.")
+metrics.add_gauge("incidents_pending", lambda: len(scoring.DATASET.delta),
+                  "Ingested incidents awaiting compaction.")
+metrics.add_gauge("osrm_upstream_calls", lambda: get_osrm_client().stats["upstream_calls"],
+                  "Calls that reached the OSRM server (coalesced and cached ones excluded).")
+
+# Heatmap tiles; the memory layer is dropped on reload (disk tiles are keyed by version)
+tile_cache = tiles.TileCache()
+scoring.add_reload_listener(lambda compacted: tile_cache.clear_memory())
+
+@app.get("/tiles/{layer}/{z}/{x}/{y}.png")
+async def get_tile(layer: str, z: int, x: int, y: int, if_none_match: Optional[str] = Header(None)):
+    if layer not in tiles.LAYERS:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer. Choose from {tiles.LAYERS}")
+    if not (tiles.TILE_MIN_ZOOM <= z <= tiles.TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    version = tiles.tile_version(layer)
+    headers = {"ETag": tiles.etag(version), "Cache-Control": "public, max-age=60"}
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    # Renders run off the event loop; cached tiles are a dict lookup or a small file read
+    png = await asyncio.to_thread(tile_cache.tile, layer, z, x, y, version)
+    return Response(png, media_type="image/png", headers=headers)
+
+@app.get("/tiles/stats")
+async def get_tile_stats():
+    return tile_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # Prometheus text format; counters are per process (one uvicorn worker each)
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled (METRICS_ENABLED=0)")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/score", response_model=schemas.SafetyScoreResponse)
-async def get_safety_score(lat: float, lon: float):
-    result = await calculate_safety_score(lat, lon)
+async def get_safety_score(lat: float, lon: float, time: Optional[datetime] = None,
+                           radius_meters: float = Query(500, gt=0, le=schemas.MAX_RADIUS_METERS)):
+    data_version = scoring.data_version()
+    with metrics.stage("scoring"):
+        result = await calculate_safety_score(lat, lon, radius_meters, when=time)
+    metrics.handler_done()
     return schemas.SafetyScoreResponse(
         latitude=lat,
         longitude=lon,
         score=result["score"],
-        details=result["details"]
+        details={**result["details"], "data_version": data_version}
     )
+
+# Upper bound on points per /score/batch call
+MAX_BATCH_POINTS = 10000
+
+@app.post("/score/batch", response_model=List[schemas.SafetyScoreResponse])
+async def get_safety_scores(request: schemas.BatchScoreRequest):
+    if len(request.points) > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_POINTS} points per request")
+
+    data_version = scoring.data_version()
+    with metrics.stage("scoring"):
+        results = await scoring.ascore_points(
+            [p.lat for p in request.points],
+            [p.lon for p in request.points],
+            request.radius_meters,
+            when=request.time,
+        )
+    metrics.handler_done()
+    return [
+        schemas.SafetyScoreResponse(
+            latitude=p.lat,
+            longitude=p.lon,
+            score=result["score"],
+            details={**result["details"], "data_version": data_version}
+        )
+        for p, result in zip(request.points, results)
+    ]
+
+# Shared secret for /admin endpoints; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/reload")
+async def reload_data(x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    if scoring.SCORING_BACKEND == "postgis":
+        raise HTTPException(status_code=400, detail="SCORING_BACKEND=postgis reads the database directly")
+    stats = await reloader.reload_crime_data()
+    if not stats["reloaded"]:
+        raise HTTPException(status_code=500, detail=stats)
+    return stats
+
+# NDJSON lines per append in /incidents/bulk, and rejected lines reported back
+INGEST_CHUNK = 1000
+INGEST_MAX_ERRORS = 10
+
+def check_ingest(token):
+    check_admin(token)
+    if scoring.SCORING_BACKEND == "postgis":
+        raise HTTPException(status_code=400, detail="SCORING_BACKEND=postgis reads the database directly")
+    if scoring.DATASET is None:
+        raise HTTPException(status_code=503, detail="Crime data not loaded")
+
+@app.post("/incidents", response_model=schemas.IngestResponse)
+async def add_incident(report: schemas.IncidentReport, x_admin_token: str = Header(None)):
+    """Add one incident. It counts in every score computed after this returns."""
+    check_ingest(x_admin_token)
+    return await reloader.ingest_incidents([incidents.validate(report.model_dump())])
+
+@app.post("/incidents/bulk", response_model=schemas.IngestResponse)
+async def add_incidents(request: Request, x_admin_token: str = Header(None)):
+    """Add incidents from an NDJSON body (one IncidentReport object per line),
+    appended in chunks as the body streams in. Invalid lines are skipped and
+    counted; the rest are accepted."""
+    check_ingest(x_admin_token)
+    stats = {"accepted": 0, "rejected": 0, "errors": [], "pending": len(scoring.DATASET.delta),
+             "data_version": scoring.data_version()}
+    records, buffer, line_no = [], b"", 0
+
+    async def flush():
+        if records:
+            result = await reloader.ingest_incidents(records)
+            stats.update(accepted=stats["accepted"] + result["accepted"], pending=result["pending"],
+                         data_version=result["data_version"])
+            records.clear()
+
+    def parse(line):
+        nonlocal line_no
+        line_no += 1
+        if not line.strip():
+            return
+        try:
+            records.append(incidents.validate(schemas.IncidentReport.model_validate_json(line).model_dump()))
+        except ValidationError as e:
+            stats["rejected"] += 1
+            if len(stats["errors"]) < INGEST_MAX_ERRORS:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"]) or "line"
+                stats["errors"].append(f"line {line_no}: {field}: {error['msg']}")
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse(line)
+        if len(records) >= INGEST_CHUNK:
+            await flush()
+    parse(buffer)
+    await flush()
+    return stats
+
+@app.get("/admin/data")
+async def get_data_status(x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    dataset = scoring.DATASET
+    return {
+        "data_version": scoring.data_version(),
+        "source": dataset.source_path if dataset is not None else None,
+        "records": len(dataset.store) if dataset is not None else 0,
+        "street_lights": dataset.assets.num_lights if dataset is not None and dataset.assets else 0,
+        "police_stations": dataset.assets.num_stations if dataset is not None and dataset.assets else 0,
+        "ingested_incidents": len(dataset.ingested) if dataset is not None and dataset.ingested else 0,
+        "pending_incidents": len(dataset.delta) if dataset is not None else 0,
+        "load_ms": round(dataset.load_ms, 1) if dataset is not None else None,
+        "loaded_at": dataset.loaded_at if dataset is not None else None,
+        "max_rss_mb": round(reloader.max_rss_mb(), 1),
+        "last_reload": reloader.LAST_RELOAD,
+        "last_compaction": reloader.LAST_COMPACTION,
+    }
@@ -0,0 +1,228 @@
+import bisect
+import contextvars
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# In-process request metrics, exposed in Prometheus text format on /metrics.
+#
+#   counters    inc("points_scored_total", n, backend="memory")
+#   histograms  observe("stage_duration_ms", ms, stage="osrm"), or
+#               `with stage("osrm"): ...` which also feeds Server-Timing
+#
+# With METRICS_ENABLED=0 the middleware is not installed and every call
+# here returns at its first line (stage() hands back a shared nullcontext).
+# Counters updated inside process-pool workers (SCORING_EXECUTOR=process)
+# stay in the worker and are not reported.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Per-request `Server-Timing` header with the stage durations (browser devtools show it)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+# Fraction of requests run under cProfile, dumped to PROFILE_DIR as .prof files
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+HELP = {
+    "http_requests_total": "HTTP requests by route and status.",
+    "http_request_duration_ms": "HTTP request latency in milliseconds.",
+    "stage_duration_ms": "Time spent per request stage in milliseconds.",
+    "points_scored_total": "Points scored, by scoring backend.",
+    "score_queries_total": "In-memory scoring calls, by path (raster, radius, kde).",
+    "incidents_scanned_total": "Incident-point pairs found by in-memory radius/kernel joins.",
+    "route_cache_requests_total": "Route cache lookups by layer and result.",
+}
+
+_lock = threading.Lock()
+_counters = {} # (name, labels) -> value
+_histograms = {} # (name, labels) -> [bucket counts..., +Inf count, sum]
+_gauges = {} # name -> (fn returning a number, help)
+_noop = nullcontext()
+
+# Per-request state for Server-Timing: {"stages": [(name, ms)], "handler_done": t}
+_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, ms: float, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS_MS) + 2)
+        hist[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        hist[-1] += ms
+
+
+def add_gauge(name: str, fn, help: str = ""):
+    # `fn()` is read at scrape time; exceptions drop the gauge from that scrape
+    _gauges[name] = (fn, help)
+
+
+@contextmanager
+def _timed_stage(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        observe("stage_duration_ms", ms, stage=name)
+        state = _request.get()
+        if state is not None:
+            state["stages"].append((name, ms))
+
+
+def stage(name: str):
+    """Context manager timing one request stage (osrm, scoring, analysis, ...)."""
+    if not METRICS_ENABLED:
+        return _noop
+    return _timed_stage(name)
+
+
+def handler_done():
+    # Marks the end of the endpoint body; the middleware times the rest as "serialize"
+    state = _request.get()
+    if state is not None:
+        state["handler_done"] = time.perf_counter()
+
+
+def server_timing(state: dict, total_ms: float) -> str:
+    totals = {}
+    for name, ms in state["stages"]:
+        totals[name] = totals.get(name, 0.0) + ms
+    parts = [f"{name};dur={ms:.1f}" for name, ms in totals.items()]
+    return ", ".join(parts + [f"total;dur={total_ms:.1f}"])
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+    lines, seen = [], set()
+
+    def header(name, kind, help=None):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {help or HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{name}{_labels(labels)} {value:g}")
+    for (name, labels), hist in sorted(histograms.items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS_MS + ("+Inf",), hist[:-1]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {hist[-1]:.3f}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    for name, (fn, help) in sorted(_gauges.items()):
+        try:
+            value = float(fn())
+        except Exception:
+            continue
+        header(name, "gauge", help)
+        lines.append(f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    # Tests and benchmarks
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+_profiling = False
+
+
+async def profiled(call, route: str):
+    """Await `call()` under cProfile and dump the stats to PROFILE_DIR.
+
+    cProfile sees the whole thread, so requests running concurrently on the
+    event loop show up in the same profile. One profile at a time.
+    """
+    global _profiling
+    if _profiling:
+        return await call()
+    import cProfile
+    _profiling = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return await call()
+    finally:
+        profiler.disable()
+        _profiling = False
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{time.time_ns() % 10**6}.prof"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request count and latency per route template,
+    the "serialize" stage, Server-Timing and sampled profiles.
+
+    Plain ASGI rather than @app.middleware("http"), which runs every
+    request in an extra task and costs more than the metrics themselves.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        state = {"stages": [], "handler_done": None, "status": 500}
+        token = _request.set(state)
+        t0 = time.perf_counter()
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                t1 = time.perf_counter()
+                state["status"] = message["status"]
+                if state["handler_done"] is not None:
+                    ms = (t1 - state["handler_done"]) * 1000
+                    observe("stage_duration_ms", ms, stage="serialize")
+                    state["stages"].append(("serialize", ms))
+                if SERVER_TIMING:
+                    header = server_timing(state, (t1 - t0) * 1000).encode()
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", header)]}
+            await send(message)
+
+        try:
+            if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+                await profiled(lambda: self.app(scope, receive, send_timed), scope["path"])
+            else:
+                await self.app(scope, receive, send_timed)
+        finally:
+            # Route template, not the raw path, keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            inc("http_requests_total", method=scope["method"], route=route, status=state["status"])
+            observe("http_request_duration_ms", (time.perf_counter() - t0) * 1000, route=route)
+            _request.reset(token)
@@ -6,6 +6,7 @@ class CrimeIncident(Base):
     __tablename__ = "crime_incidents"
 
     id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(String, unique=True, index=True) # Stable key for idempotent ETL upserts
     crime_type = Column(String, index=True) # e.g., 'Theft', 'Assault'
     description = Column(String)
     date_time = Column(DateTime)
@@ -16,6 +17,7 @@ class StreetLight(Base):
     __tablename__ = "street_lights"
 
     id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(String, unique=True, index=True) # Stable key for idempotent ETL upserts
     location = Column(Geometry('POINT', srid=4326))
     is_working = Column(Boolean, default=True)
     brightness_level = Column(Integer) # 1-5
@@ -24,6 +26,7 @@ class PoliceStation(Base):
     __tablename__ = "police_stations"
 
     id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(String, unique=True, index=True) # Stable key for idempotent ETL upserts
     name = Column(String)
     address = Column(String)
     location = Column(Geometry('POINT', srid=4326))
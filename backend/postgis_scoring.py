@@ -0,0 +1,159 @@
+import os
+import weakref
+from typing import List
+from backend.store import HIGH_SEVERITY_TYPES, MEDIUM_SEVERITY_TYPES, DEFAULT_PENALTY
+from backend import temporal
+
+# Scoring against the crime_incidents table instead of the in-memory store,
+# for datasets too large for one process (SCORING_BACKEND=postgis).
+#
+# A whole batch of points is scored by one query: the points are passed as
+# two float8 arrays, unnested, and joined to incidents with ST_DWithin on
+# geography (metres), which the GiST expression index below serves.
+#
+#   text     - SQLAlchemy text() over the pooled async engine
+#   prepared - the same SQL as an asyncpg prepared statement, prepared once
+#              per pooled connection and reused
+#
+# Timed queries pass the query bucket's row of temporal.WEIGHTS and index it
+# with each incident's date_time bucket (1-based; 49 = untimed, weight 1),
+# and apply temporal.recency_weights in SQL. Its two table-wide inputs (the
+# newest incident time and the mean decay) are read once per process.
+# SCORING_MODE=kde has no SQL counterpart: check_config refuses it at startup.
+
+POSTGIS_QUERY_MODE = os.getenv("POSTGIS_QUERY_MODE", "prepared") # prepared or text
+QUERY_MODES = ("prepared", "text")
+# Points per query; bounds the size of a single join
+POSTGIS_BATCH_POINTS = int(os.getenv("POSTGIS_BATCH_POINTS", "2000"))
+
+GEOGRAPHY_INDEX = "ix_crime_incidents_location_geog"
+
+
+def _sql_list(values) -> str:
+    return ", ".join("'" + v.replace("'", "''") + "'" for v in values)
+
+
+# Same per-type penalty as backend.store.crime_type_penalty
+PENALTY_SQL = (
+    f"CASE WHEN c.crime_type IN ({_sql_list(HIGH_SEVERITY_TYPES)}) THEN 5.0 "
+    f"WHEN c.crime_type IN ({_sql_list(MEDIUM_SEVERITY_TYPES)}) THEN 3.0 "
+    f"ELSE {DEFAULT_PENALTY} END"
+)
+
+# temporal.incident_buckets in SQL (isodow 6, 7 = weekend), as a 1-based array index
+BUCKET_SQL = (
+    f"CASE WHEN c.date_time IS NULL THEN {temporal.NO_BUCKET + 1} "
+    f"ELSE (CASE WHEN extract(isodow FROM c.date_time) >= 6 THEN {temporal.HOURS} ELSE 0 END "
+    f"+ extract(hour FROM c.date_time))::int + 1 END"
+)
+
+# temporal.recency_weights: $5 newest epoch, $6 half-life in days (<= 0: off), $7 mean decay
+RECENCY_SQL = (
+    "CASE WHEN c.date_time IS NULL OR CAST($6 AS float8) <= 0 THEN 1.0 "
+    "ELSE power(0.5, least((CAST($5 AS float8) - extract(epoch FROM c.date_time)::float8) / 86400.0 "
+    "/ CAST($6 AS float8), 1000.0)) / CAST($7 AS float8) END" # least(): no float underflow on very old incidents
+)
+
+SCORE_SQL = f"""
+WITH q AS (
+    SELECT t.ord, ST_SetSRID(ST_MakePoint(t.lon, t.lat), 4326)::geography AS g
+    FROM unnest(CAST($1 AS float8[]), CAST($2 AS float8[])) WITH ORDINALITY AS t(lat, lon, ord)
+)
+SELECT q.ord,
+       count(c.id) AS crimes_nearby,
+       coalesce(sum(({PENALTY_SQL}) * coalesce((CAST($4 AS float8[]))[{BUCKET_SQL}] * {RECENCY_SQL}, 1.0)), 0)
+           AS crime_penalty,
+       coalesce(array_agg(DISTINCT c.crime_type) FILTER (WHERE c.crime_type IS NOT NULL), '{{}}') AS crime_types
+FROM q
+LEFT JOIN crime_incidents c ON ST_DWithin(c.location::geography, q.g, $3)
+GROUP BY q.ord
+ORDER BY q.ord
+"""
+
+# SQLAlchemy text() spells bind parameters by name
+TEXT_SQL = (SCORE_SQL.replace("$1", ":lats").replace("$2", ":lons")
+            .replace("$3", ":radius").replace("$4", ":weights")
+            .replace("$5", ":newest").replace("$6", ":half_life").replace("$7", ":norm"))
+
+RECENCY_STATS_SQL = """
+SELECT max(t), avg(power(0.5, least(((SELECT max(extract(epoch FROM date_time))::float8 FROM crime_incidents) - t)
+                                     / 86400.0 / :half_life, 1000.0)))
+FROM (SELECT extract(epoch FROM date_time)::float8 AS t FROM crime_incidents WHERE date_time IS NOT NULL) s
+"""
+
+_prepared = weakref.WeakKeyDictionary() # asyncpg connection -> prepared statement
+_recency = None # (newest epoch, half-life days, mean decay), see RECENCY_SQL
+
+
+def check_config(scoring_mode: str):
+    """Raise ValueError for settings this backend can't score like the in-memory one."""
+    if scoring_mode != "radius":
+        raise ValueError(f"SCORING_MODE={scoring_mode} is not supported with SCORING_BACKEND=postgis; "
+                         f"use SCORING_MODE=radius")
+
+
+async def _recency_params(conn):
+    global _recency
+    if _recency is None:
+        half_life = temporal.TEMPORAL_HALF_LIFE_DAYS
+        newest, norm = None, None
+        if half_life > 0:
+            from sqlalchemy import text
+            newest, norm = (await conn.execute(text(RECENCY_STATS_SQL), {"half_life": half_life})).one()
+        # No timed incidents (or decay off): every weight is 1
+        _recency = (float(newest), half_life, float(norm)) if newest is not None and norm else (0.0, 0.0, 1.0)
+    return _recency
+
+
+async def ensure_indexes():
+    """GiST index on location::geography so ST_DWithin in metres can use it."""
+    from sqlalchemy import text
+    from backend.database import get_engine
+
+    async with get_engine().begin() as conn:
+        await conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {GEOGRAPHY_INDEX} ON crime_incidents "
+            f"USING gist ((location::geography))"
+        ))
+        await conn.execute(text("ANALYZE crime_incidents"))
+
+
+async def _fetch_batch(conn, lats, lons, radius_meters, weights, mode, recency):
+    newest, half_life, norm = recency
+    if mode == "prepared":
+        raw = await conn.get_raw_connection()
+        apg = raw.driver_connection
+        stmt = _prepared.get(apg)
+        if stmt is None:
+            stmt = _prepared[apg] = await apg.prepare(SCORE_SQL)
+        return await stmt.fetch(lats, lons, float(radius_meters), weights, newest, half_life, norm)
+
+    from sqlalchemy import text
+    result = await conn.execute(text(TEXT_SQL), {"lats": lats, "lons": lons, "radius": float(radius_meters),
+                                                 "weights": weights, "newest": newest, "half_life": half_life,
+                                                 "norm": norm})
+    return result.all()
+
+
+async def score_points(lats, lons, radius_meters: float = 500, mode: str = POSTGIS_QUERY_MODE,
+                       time_bucket: int = None) -> List[dict]:
+    """PostGIS counterpart of `scoring.score_points`: one result dict per point."""
+    if mode not in QUERY_MODES:
+        raise ValueError(f"Unknown POSTGIS_QUERY_MODE '{mode}'. Choose from {QUERY_MODES}")
+    from backend.database import get_engine
+    from backend.scoring import _score_result
+
+    lats = [float(x) for x in lats]
+    lons = [float(x) for x in lons]
+    weights = temporal.WEIGHTS[time_bucket].tolist() if time_bucket is not None else None
+    results = []
+    async with get_engine().connect() as conn:
+        # Recency only weights timed queries, as in the in-memory store
+        recency = await _recency_params(conn) if weights is not None else (0.0, 0.0, 1.0)
+        for start in range(0, len(lats), POSTGIS_BATCH_POINTS):
+            end = start + POSTGIS_BATCH_POINTS
+            rows = await _fetch_batch(conn, lats[start:end], lons[start:end], radius_meters, weights, mode, recency)
+            results.extend(
+                _score_result(row[2], row[1], sorted(row[3])) for row in rows
+            )
+    return results
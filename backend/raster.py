@@ -0,0 +1,184 @@
+import json
+import math
+import numpy as np
+from backend.spatial import EARTH_RADIUS_M
+from backend.temporal import TIME_BUCKETS
+from backend import kde
+
+# ~110 m between cell centres in latitude (~98 m in longitude over Delhi)
+DEFAULT_CELL_DEG = 0.001
+MAX_TYPES = 64 # Crime types are stored as a uint64 bitmask per cell
+BUILD_CHUNK_CELLS = 4096
+
+
+class SafetyRaster:
+    """Precomputed radius score on a regular lat/lon grid.
+
+    Cell (i, j) holds the crime penalty, incident count and crime-type bitmask
+    of the point `(lat0 + i * cell_deg, lon0 + j * cell_deg)`. The grid covers
+    the data extent plus one scoring radius, so anything outside it scores
+    a clean 100. Lookups are a couple of array reads per point.
+
+    Optional `time_penalty` layers (one per `temporal` time bucket) hold the
+    time-weighted penalty, so timed lookups are just as cheap. With a
+    `kernel` the grid holds kernel-density penalties (backend/kde.py), a
+    precomputed convolution of the incidents with that kernel.
+    """
+
+    def __init__(self, lat0, lon0, cell_deg, penalty, counts, type_mask, crime_types, radius_m, fingerprint,
+                 time_penalty=None, kernel=None, bandwidth_m=None):
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.cell_deg = float(cell_deg)
+        self.penalty = penalty
+        self.counts = counts
+        self.type_mask = type_mask
+        self.crime_types = list(crime_types)
+        self.radius_m = float(radius_m)
+        self.fingerprint = fingerprint
+        self.time_penalty = time_penalty
+        self.kernel = kernel
+        self.bandwidth_m = float(bandwidth_m) if bandwidth_m is not None else None
+
+    @property
+    def shape(self):
+        return self.penalty.shape
+
+    @classmethod
+    def build(cls, store, index, radius_m: float = 500, cell_deg: float = DEFAULT_CELL_DEG, time_layers: bool = False,
+              kernel: str = None, bandwidth_m: float = None):
+        if len(store.crime_types) > MAX_TYPES:
+            raise ValueError(f"Raster supports at most {MAX_TYPES} crime types, got {len(store.crime_types)}")
+
+        reach_m = radius_m if kernel is None else kde.support_m(kernel, bandwidth_m)
+        margin = math.degrees(reach_m / EARTH_RADIUS_M)
+        lat0 = float(store.lats.min()) - margin
+        max_abs_lat = min(max(abs(store.lats.min()), abs(store.lats.max())) + margin, 89.9)
+        lon_margin = margin / math.cos(math.radians(max_abs_lat))
+        lon0 = float(store.lons.min()) - lon_margin
+        nrows = int(math.ceil((float(store.lats.max()) + margin - lat0) / cell_deg)) + 1
+        ncols = int(math.ceil((float(store.lons.max()) + lon_margin - lon0) / cell_deg)) + 1
+
+        rows, cols = np.divmod(np.arange(nrows * ncols, dtype=np.int64), ncols)
+        cell_lats = lat0 + rows * cell_deg
+        cell_lons = lon0 + cols * cell_deg
+
+        penalty = np.zeros(nrows * ncols, dtype=np.float32)
+        counts = np.zeros(nrows * ncols, dtype=np.uint32)
+        type_mask = np.zeros(nrows * ncols, dtype=np.uint64)
+        time_penalty = None
+        if time_layers and store.has_times:
+            time_penalty = np.zeros((TIME_BUCKETS, nrows * ncols), dtype=np.float32)
+
+        for start in range(0, nrows * ncols, BUILD_CHUNK_CELLS):
+            end = min(start + BUILD_CHUNK_CELLS, nrows * ncols)
+            if kernel is None:
+                pts, inc = index.query_radius_batch(cell_lats[start:end], cell_lons[start:end], radius_m)
+                weight = 1.0
+            else:
+                pts, inc, weight = kde.kernel_weights(
+                    index, cell_lats[start:end], cell_lons[start:end], radius_m, kernel, bandwidth_m
+                )
+            if len(pts) == 0:
+                continue
+            size = end - start
+            severity = kernel is not None
+            counts[start:end] = np.bincount(pts, minlength=size)
+            penalty[start:end] = np.bincount(pts, weights=weight * store.penalties(inc, severity=severity), minlength=size)
+            bits = np.left_shift(np.uint64(1), store.type_codes[inc].astype(np.uint64))
+            np.bitwise_or.at(type_mask[start:end], pts, bits)
+            if time_penalty is not None:
+                for bucket in range(TIME_BUCKETS):
+                    time_penalty[bucket, start:end] = np.bincount(pts, weights=weight * store.penalties(inc, bucket, severity), minlength=size)
+
+        return cls(
+            lat0, lon0, cell_deg,
+            penalty.reshape(nrows, ncols),
+            counts.reshape(nrows, ncols),
+            type_mask.reshape(nrows, ncols),
+            store.crime_types, radius_m, store.fingerprint(),
+            time_penalty.reshape(TIME_BUCKETS, nrows, ncols) if time_penalty is not None else None,
+            kernel, bandwidth_m if kernel is not None else None,
+        )
+
+    def save(self, path: str):
+        meta = {
+            "lat0": self.lat0,
+            "lon0": self.lon0,
+            "cell_deg": self.cell_deg,
+            "radius_m": self.radius_m,
+            "crime_types": self.crime_types,
+            "fingerprint": self.fingerprint,
+            "kernel": self.kernel,
+            "bandwidth_m": self.bandwidth_m,
+        }
+        layers = {"time_penalty": self.time_penalty} if self.time_penalty is not None else {}
+        np.savez_compressed(
+            path,
+            penalty=self.penalty,
+            counts=self.counts,
+            type_mask=self.type_mask,
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            **layers,
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as f:
+            meta = json.loads(f["meta"].tobytes().decode())
+            return cls(
+                meta["lat0"], meta["lon0"], meta["cell_deg"],
+                f["penalty"], f["counts"], f["type_mask"],
+                meta["crime_types"], meta["radius_m"], meta["fingerprint"],
+                f["time_penalty"] if "time_penalty" in f.files else None,
+                meta.get("kernel"), meta.get("bandwidth_m"),
+            )
+
+    def lookup(self, lats, lons, interpolate: bool = False, time_bucket: int = None):
+        """Return (penalty, counts, type_mask) arrays for the given points.
+
+        Counts and crime types come from the nearest cell centre. With
+        `interpolate`, the penalty is bilinearly blended from the four
+        surrounding centres. `time_bucket` reads the penalty from that
+        time layer (see `has_time_layers`).
+        """
+        nrows, ncols = self.shape
+        fr = (np.asarray(lats, dtype=np.float64) - self.lat0) / self.cell_deg
+        fc = (np.asarray(lons, dtype=np.float64) - self.lon0) / self.cell_deg
+        inside = (fr >= 0) & (fr <= nrows - 1) & (fc >= 0) & (fc <= ncols - 1)
+
+        r = np.clip(np.rint(fr), 0, nrows - 1).astype(np.int64)
+        c = np.clip(np.rint(fc), 0, ncols - 1).astype(np.int64)
+        counts = np.where(inside, self.counts[r, c], 0)
+        type_mask = np.where(inside, self.type_mask[r, c], np.uint64(0))
+
+        if interpolate:
+            r0 = np.clip(np.floor(fr), 0, nrows - 2).astype(np.int64)
+            c0 = np.clip(np.floor(fc), 0, ncols - 2).astype(np.int64)
+            tr = np.clip(fr - r0, 0, 1)
+            tc = np.clip(fc - c0, 0, 1)
+            p = self._penalty_layer(time_bucket)
+            penalty = ((1 - tr) * (1 - tc) * p[r0, c0] + (1 - tr) * tc * p[r0, c0 + 1]
+                       + tr * (1 - tc) * p[r0 + 1, c0] + tr * tc * p[r0 + 1, c0 + 1])
+        else:
+            penalty = self._penalty_layer(time_bucket)[r, c]
+        return np.where(inside, penalty, 0.0), counts, type_mask
+
+    def matches(self, radius_m: float, kernel: str = None, bandwidth_m: float = None) -> bool:
+        # Built for this scoring configuration? (kernel None = hard radius)
+        if radius_m != self.radius_m or kernel != self.kernel:
+            return False
+        return kernel is None or float(bandwidth_m) == self.bandwidth_m
+
+    @property
+    def has_time_layers(self) -> bool:
+        return self.time_penalty is not None
+
+    def _penalty_layer(self, time_bucket):
+        if time_bucket is None or self.time_penalty is None:
+            return self.penalty
+        return self.time_penalty[time_bucket]
+
+    def type_names(self, mask) -> list:
+        mask = int(mask)
+        return [t for bit, t in enumerate(self.crime_types) if mask >> bit & 1]
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import resource
+import sys
+import time
+from backend import assets, incidents, scoring
+
+# Hot reload of the crime data without restarting the process.
+#
+# The new CrimeDataset is built in a worker thread while the current one keeps
+# serving, then swapped in with a single reference assignment. Triggered by
+# POST /admin/reload, or by the file watcher when DATA_WATCH_INTERVAL > 0.
+# Incident compactions (backend/incidents.py) swap datasets the same way and
+# take the same lock, so a reload never races a compaction.
+
+DATA_PATH = os.getenv("CRIME_DATA_PATH", "data/processed_crime.csv")
+# Seconds between checks of the data files; 0 disables the watcher
+DATA_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL", "0"))
+
+_reload_lock = asyncio.Lock()
+LAST_RELOAD = None # Stats of the most recent reload attempt
+LAST_COMPACTION = None # Stats of the most recent incident compaction
+_compaction = None # Running compaction task
+
+
+def max_rss_mb() -> float:
+    # Peak resident set size of this process; ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def watched_files(csv_path: str) -> list:
+    # Anything that changes what build_dataset returns
+    paths = [csv_path, scoring.RASTER_PATH, assets.LIGHTS_PATH, assets.POLICE_STATIONS_PATH]
+    if scoring.SNAPSHOT_PATH:
+        paths.append(os.path.join(scoring.SNAPSHOT_PATH, "meta.json"))
+    return [p for p in paths if p]
+
+
+def file_stamp(paths: list) -> tuple:
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamp.append((path, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append((path, None, None))
+    return tuple(stamp)
+
+
+async def reload_crime_data(csv_path: str = None) -> dict:
+    """Build a fresh dataset off the event loop and swap it in.
+
+    Concurrent triggers are serialized. On failure the current dataset
+    stays in place and `reloaded` is False.
+    """
+    global LAST_RELOAD
+    async with _reload_lock:
+        current = scoring.DATASET
+        csv_path = csv_path or (current.source_path if current is not None else None) or DATA_PATH
+        t0 = time.perf_counter()
+        dataset = await asyncio.to_thread(scoring.build_dataset, csv_path)
+        if dataset is not None:
+            # Listeners rescore derived data (road graph edges), keep them off the loop too
+            await asyncio.to_thread(scoring.set_dataset, dataset)
+        stats = {
+            "reloaded": dataset is not None,
+            "source": csv_path,
+            "data_version": scoring.data_version(),
+            "previous_version": current.version if current is not None else None,
+            "records": len(scoring.DATASET.store) if scoring.DATASET is not None else 0,
+            "reload_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "max_rss_mb": round(max_rss_mb(), 1),
+        }
+    LAST_RELOAD = stats
+    if stats["reloaded"]:
+        print(f"Reloaded crime data from {csv_path}: version {stats['previous_version']} -> "
+              f"{stats['data_version']}, {stats['records']} records in {stats['reload_ms']:.0f} ms "
+              f"(max RSS {stats['max_rss_mb']:.0f} MB).")
+    else:
+        print(f"Reload of {csv_path} failed; still serving version {stats['data_version']}.")
+    return stats
+
+
+async def watch_crime_data(interval: float = DATA_WATCH_INTERVAL):
+    """Poll the data files and reload once a change has settled.
+
+    A change must look the same on two consecutive polls before it is
+    loaded, so a file still being written is not picked up half way.
+    """
+    current = scoring.DATASET
+    paths = watched_files(current.source_path if current is not None else DATA_PATH)
+    loaded = file_stamp(paths)
+    pending = None
+    while True:
+        await asyncio.sleep(interval)
+        stamp = file_stamp(paths)
+        if stamp == loaded:
+            pending = None
+        elif stamp != pending:
+            pending = stamp
+        else:
+            print("Crime data changed on disk, reloading...")
+            await reload_crime_data(paths[0])
+            loaded, pending = stamp, None
+
+
+async def compact_incidents() -> dict:
+    """Merge pending incidents into the ingested layer, off the event loop."""
+    global LAST_COMPACTION
+    async with _reload_lock:
+        t0 = time.perf_counter()
+        merged = await asyncio.to_thread(scoring.compact_incidents)
+        dataset = scoring.DATASET
+        stats = {
+            "merged": merged,
+            "ingested": len(dataset.ingested) if dataset is not None and dataset.ingested is not None else 0,
+            "pending": len(dataset.delta) if dataset is not None else 0,
+            "data_version": scoring.data_version(),
+            "compact_ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
+    if merged:
+        LAST_COMPACTION = stats
+        print(f"Compacted {merged} incidents ({stats['ingested']} ingested, {stats['pending']} pending) "
+              f"in {stats['compact_ms']:.0f} ms.")
+    return stats
+
+
+def schedule_compaction():
+    # One compaction at a time; later triggers share the running one
+    global _compaction
+    if _compaction is None or _compaction.done():
+        _compaction = asyncio.create_task(compact_incidents())
+    return _compaction
+
+
+async def ingest_incidents(records: list) -> dict:
+    """Append validated incident records; they count in every score from the
+    moment this returns. Waits for a compaction while the delta is full."""
+    while True:
+        result = scoring.add_incidents(records)
+        if result is not None:
+            break
+        # shield: a client that goes away must not cancel the shared compaction
+        await asyncio.shield(schedule_compaction())
+    accepted, pending = result
+    if pending >= incidents.INCIDENT_COMPACT_THRESHOLD:
+        schedule_compaction()
+    return {"accepted": accepted, "pending": pending, "data_version": scoring.data_version()}
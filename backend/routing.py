@@ -0,0 +1,115 @@
+import asyncio
+import os
+
+# USE PUBLIC OSRM API by default (Note: This is for demo only, respect rate limits)
+OSRM_URL = os.getenv("OSRM_URL", "http://router.project-osrm.org")
+OSRM_PROFILE = os.getenv("OSRM_PROFILE", "driving")
+OSRM_MAX_CONNECTIONS = int(os.getenv("OSRM_MAX_CONNECTIONS", "20"))
+OSRM_MAX_CONCURRENCY = int(os.getenv("OSRM_MAX_CONCURRENCY", "10"))
+OSRM_TIMEOUT = float(os.getenv("OSRM_TIMEOUT", "10"))
+OSRM_CONNECT_TIMEOUT = float(os.getenv("OSRM_CONNECT_TIMEOUT", "3"))
+OSRM_RETRIES = int(os.getenv("OSRM_RETRIES", "2"))
+RETRY_BACKOFF_S = 0.2
+
+
+class RoutingError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class OSRMClient:
+    """Application-lifetime OSRM client.
+
+    - one pooled keep-alive `httpx.AsyncClient` (created on first use)
+    - at most `max_concurrency` upstream calls in flight
+    - retries with backoff on connection errors and 5xx/429 responses
+    - identical concurrent requests share a single upstream call
+    """
+
+    def __init__(self, base_url: str = OSRM_URL, profile: str = OSRM_PROFILE,
+                 max_connections: int = OSRM_MAX_CONNECTIONS, max_concurrency: int = OSRM_MAX_CONCURRENCY,
+                 timeout: float = OSRM_TIMEOUT, connect_timeout: float = OSRM_CONNECT_TIMEOUT,
+                 retries: int = OSRM_RETRIES, transport=None):
+        self.base_url = base_url.rstrip("/")
+        self.profile = profile
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self._transport = transport
+        self._http = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight = {}
+        self.stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0}
+
+    @property
+    def http(self):
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=30,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                transport=self._transport,
+            )
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def route(self, start_lat: float, start_lon: float, end_lat: float, end_lon: float,
+                    annotations: bool = False) -> dict:
+        """Fetch alternatives between two points; returns OSRM's JSON body.
+
+        `annotations=True` adds the OSM node ids of every leg
+        (`legs[i].annotation.nodes`). The returned dict may be shared with
+        concurrent callers and must not be mutated.
+        """
+        self.stats["requests"] += 1
+        key = (self.profile, start_lat, start_lon, end_lat, end_lon, annotations)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(start_lat, start_lon, end_lat, end_lon, annotations))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, start_lat, start_lon, end_lat, end_lon, annotations=False) -> dict:
+        import httpx
+        # OSRM expects lon,lat pairs
+        coords = f"{start_lon},{start_lat};{end_lon},{end_lat}"
+        path = f"/route/v1/{self.profile}/{coords}"
+        params = {"alternatives": "true", "steps": "false", "geometries": "geojson", "overview": "full"}
+        if annotations:
+            params["annotations"] = "nodes"
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(RETRY_BACKOFF_S * 2 ** (attempt - 1))
+            try:
+                async with self._semaphore:
+                    self.stats["upstream_calls"] += 1
+                    response = await self.http.get(path, params=params)
+            except httpx.RequestError as exc:
+                error = RoutingError(503, f"Routing service unavailable: {exc}")
+                continue
+
+            if response.status_code == 200:
+                return response.json()
+            print(f"OSRM Error: {response.text}")
+            error = RoutingError(500, "Routing engine error")
+            if response.status_code < 500 and response.status_code != 429:
+                break
+        raise error
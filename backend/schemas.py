@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Union
 from datetime import datetime
 
 class RouteRequest(BaseModel):
@@ -8,10 +8,20 @@ class RouteRequest(BaseModel):
     end_lat: float
     end_lon: float
     mode: str = "walking" # walking, bike
-    departure_time: Optional[datetime] = None
+    departure_time: Optional[datetime] = None # Scores weight incidents near this time of day
+    engine: Literal["osrm", "local"] = "osrm" # local: in-process safety-weighted routing (data/road_graph.npz)
+    geometry_format: Literal["geojson", "polyline5", "polyline6"] = "geojson" # polyline: Google encoded polyline
+    simplify_zoom: Optional[int] = Field(None, ge=0, le=22) # Douglas-Peucker to half a pixel at this map zoom
+    # sampled: a few points per route; continuous: length-weighted along the whole route;
+    # segments: precomputed road segment scores (data/segment_scores.npz)
+    scoring: Literal["sampled", "continuous", "segments"] = "sampled"
+
+class LineString(BaseModel):
+    type: Literal["LineString"] = "LineString"
+    coordinates: List[List[float]] # [lon, lat] pairs
 
 class RouteResponse(BaseModel):
-    geometry: str # Encoded polyline or GeoJSON
+    geometry: Union[LineString, str] # GeoJSON object, or encoded polyline string (see RouteRequest.geometry_format)
     safety_score: float
     duration_seconds: float
     distance_meters: float
@@ -25,3 +35,29 @@ class SafetyScoreResponse(BaseModel):
     longitude: float
     score: float
     details: dict
+
+# Scoring radius bound: cost grows with the radius squared
+MAX_RADIUS_METERS = 5000
+
+class ScorePoint(BaseModel):
+    lat: float
+    lon: float
+
+class BatchScoreRequest(BaseModel):
+    points: List[ScorePoint]
+    radius_meters: float = Field(500, gt=0, le=MAX_RADIUS_METERS)
+    time: Optional[datetime] = None # Weight incidents by time of day (see backend/temporal.py)
+
+class IncidentReport(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    crime_type: str = "Unknown" # Penalty by type as for the crime data file (backend/store.py)
+    date_time: Optional[datetime] = None # Naive = local time, as the CSV's Date Time column
+    severity: Optional[float] = None
+
+class IngestResponse(BaseModel):
+    accepted: int
+    rejected: int = 0
+    errors: List[str] = [] # First few rejected NDJSON lines and why
+    pending: int # Incidents awaiting compaction (see backend/incidents.py)
+    data_version: str
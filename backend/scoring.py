@@ -1,24 +1,230 @@
-import pandas as pd
+import hashlib
 import math
+import os
+import threading
+import time
+import numpy as np
 from typing import List, Dict
+from backend.spatial import build_index
+from backend.store import CrimeStore
+from backend.raster import SafetyRaster
+from backend.assets import AssetLayers, asset_paths, read_asset_csvs
+from backend.incidents import IncidentBatch, IncidentDelta, IncidentLayer
+from backend import snapshot, executor, temporal, kde, metrics, incidents
 
-# Global variable to hold data in memory
-CRIME_DATA = []
+# The loaded crime data as one immutable CrimeDataset. Reloads build a new
+# bundle and swap this single reference, so a request never sees a store
+# from one file and an index or raster from another.
+DATASET = None
+_RELOAD_LISTENERS = []
+# Orders incident appends against dataset swaps (see backend/incidents.py)
+_incident_lock = threading.Lock()
 
-def load_crime_data(csv_path: str = "data/processed_crime.csv"):
-    global CRIME_DATA
+# Spatial index used for radius queries: grid, kdtree or linear
+INDEX_KIND = os.getenv("CRIME_INDEX", "grid")
+
+# Precomputed score grid (scripts/build_safety_raster.py); used when present and current
+RASTER_PATH = os.getenv("SAFETY_RASTER_PATH", "data/safety_raster.npz")
+RASTER_INTERPOLATE = os.getenv("SAFETY_RASTER_INTERPOLATE", "0") == "1"
+
+# How incidents add up to a penalty: radius (count inside radius_meters) or
+# kde (kernel density, smooth; see backend/kde.py)
+SCORING_MODE = os.getenv("SCORING_MODE", "radius")
+SCORING_MODES = ("radius", "kde")
+
+# Where request-path scores come from: memory (this module) or postgis (backend/postgis_scoring.py)
+SCORING_BACKEND = os.getenv("SCORING_BACKEND", "memory")
+
+# Memory-mapped binary snapshot (scripts/build_snapshot.py); skips pandas and CSV parsing
+SNAPSHOT_PATH = os.getenv("CRIME_SNAPSHOT_PATH", "data/crime_snapshot")
+
+class CrimeDataset:
+    """Store, spatial index and raster built from one crime data file,
+    plus the street light / police station layers (None when absent) and
+    the compacted ingested incidents (the first `incident_seq` log entries).
+
+    Never mutated after construction, except for appends to `delta`;
+    `version` is a short fingerprint of everything else, so it changes
+    whenever the data does; `base_version` leaves out the ingested incidents.
+    """
+
+    def __init__(self, store: CrimeStore, index, raster, source_path: str = None, load_ms: float = 0.0,
+                 assets: AssetLayers = None, ingested: IncidentLayer = None, incident_seq: int = 0):
+        self.store = store
+        self.index = index
+        self.raster = raster
+        self.assets = assets
+        self.ingested = ingested
+        self.incident_seq = incident_seq
+        self.delta = IncidentDelta(incident_seq)
+        self.source_path = source_path
+        self.load_ms = load_ms
+        fingerprint = base = store.fingerprint()
+        if assets is not None:
+            base = hashlib.sha1((fingerprint + assets.fingerprint()).encode()).hexdigest()
+        if assets is not None or ingested is not None:
+            extra = [assets.fingerprint() if assets is not None else "",
+                     ingested.store.fingerprint() if ingested is not None else ""]
+            fingerprint = hashlib.sha1("".join([fingerprint] + extra).encode()).hexdigest()
+        self.version = fingerprint[:12]
+        self.base_version = base[:12]
+        self.loaded_at = time.time()
+
+def build_dataset(csv_path: str = "data/processed_crime.csv", incident_limit: int = None):
+    """Load `csv_path` (or its current snapshot) into a new CrimeDataset,
+    with the first `incident_limit` (default all) entries of the incident log.
+
+    Touches no module state, so it can run in a worker thread while the
+    current dataset keeps serving. Returns None when loading fails.
+    """
+    t0 = time.perf_counter()
     try:
-        df = pd.read_csv(csv_path)
-        # Ensure we have lat/lon
-        if 'Latitude' in df.columns and 'Longitude' in df.columns:
-            # Drop invalid rows
-            df = df.dropna(subset=['Latitude', 'Longitude'])
-            CRIME_DATA = df.to_dict('records')
-            print(f"Loaded {len(CRIME_DATA)} crime records into memory.")
+        if SCORING_MODE not in SCORING_MODES:
+            raise ValueError(f"Unknown SCORING_MODE '{SCORING_MODE}'. Choose from {SCORING_MODES}")
+        meta = snapshot.read_meta(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+        snapshot_assets = False
+        if meta and snapshot.is_current(meta, csv_path):
+            store, index = snapshot.load_snapshot(SNAPSHOT_PATH, meta, INDEX_KIND)
+            if index is None:
+                index = build_index(store.lats, store.lons, kind=INDEX_KIND)
+            print(f"Mapped {len(store)} crime records from snapshot {SNAPSHOT_PATH} ({INDEX_KIND} index).")
+            snapshot_assets = snapshot.assets_current(meta, asset_paths())
         else:
-            print("CSV missing Latitude/Longitude columns.")
+            if meta:
+                print(f"Ignoring stale snapshot {SNAPSHOT_PATH} ({csv_path} changed, rebuild it).")
+            store = read_crime_csv(csv_path)
+            if store is None:
+                return None
+            index = build_index(store.lats, store.lons, kind=INDEX_KIND)
+            print(f"Loaded {len(store)} crime records into memory ({INDEX_KIND} index).")
+        raster = load_safety_raster(RASTER_PATH, store)
+        assets = snapshot.load_assets(SNAPSHOT_PATH, meta) if snapshot_assets else read_asset_csvs()
+        logged, incident_seq = incidents.read_log(limit=incident_limit)
+        ingested = IncidentLayer(logged) if len(logged) else None
+        if ingested is not None:
+            print(f"Replayed {len(logged)} ingested incidents from {incidents.INCIDENT_LOG_PATH}.")
     except Exception as e:
         print(f"Error loading crime data: {e}")
+        return None
+    return CrimeDataset(store, index, raster, csv_path, (time.perf_counter() - t0) * 1000, assets,
+                        ingested, incident_seq)
+
+def set_dataset(dataset: CrimeDataset, compacted: IncidentBatch = None):
+    # Single reference assignment: readers see either the old bundle or the new one.
+    # Delta incidents the new bundle doesn't contain yet move over with it.
+    # `compacted`: the incidents a compaction moved into the ingested layer, when
+    # that is all that changed (same store, index, raster and assets).
+    global DATASET
+    with _incident_lock:
+        current = DATASET
+        if current is not None and len(current.delta):
+            dataset.delta = IncidentDelta(dataset.incident_seq, current.delta.tail(dataset.incident_seq))
+        DATASET = dataset
+    for listener in _RELOAD_LISTENERS:
+        listener(compacted)
+
+def load_crime_data(csv_path: str = "data/processed_crime.csv", incident_limit: int = None):
+    dataset = build_dataset(csv_path, incident_limit)
+    if dataset is not None:
+        set_dataset(dataset)
+    return dataset
+
+def data_version():
+    # Pending delta incidents count too, so caches keyed on it see new reports
+    dataset = DATASET
+    if dataset is None:
+        return None
+    pending = len(dataset.delta)
+    return f"{dataset.version}+{pending}" if pending else dataset.version
+
+def score_version(timed: bool = False):
+    """Like data_version, but unchanged by a compaction where scores are too.
+
+    Merging pending incidents into the ingested layer leaves untimed
+    radius scores as they were; recency and kde severity weights are
+    normalized over the whole layer, so those keep data_version.
+    """
+    dataset = DATASET
+    if dataset is None or timed or SCORING_MODE == "kde":
+        return data_version()
+    return f"{dataset.base_version}@{dataset.incident_seq + len(dataset.delta)}"
+
+def add_incidents(records: list):
+    """Log and append validated incident records (incidents.validate).
+
+    Returns (accepted, pending) once they count in every later score, or
+    None when the delta is full and a compaction has to run first.
+    """
+    batch = IncidentBatch.from_records(records)
+    with _incident_lock:
+        dataset = DATASET
+        if dataset is None:
+            raise RuntimeError("Crime data not loaded")
+        delta = dataset.delta
+        if len(delta) and len(delta) + len(batch) > incidents.INCIDENT_MAX_DELTA:
+            return None
+        incidents.append_log(records)
+        delta.append(batch)
+        return len(batch), len(delta)
+
+def compact_incidents():
+    """Merge the current delta into the ingested layer and swap the dataset in.
+
+    Returns the number of incidents merged. Incidents appended while the
+    new layer is built stay in the delta (see set_dataset).
+    """
+    current = DATASET
+    if current is None or not len(current.delta):
+        return 0
+    batch = current.delta.batch()
+    merged = batch if current.ingested is None else IncidentBatch.concat([current.ingested.batch, batch])
+    dataset = CrimeDataset(current.store, current.index, current.raster, current.source_path, current.load_ms,
+                           current.assets, IncidentLayer(merged), current.incident_seq + len(batch))
+    set_dataset(dataset, compacted=batch)
+    return len(batch)
+
+def add_reload_listener(fn):
+    # Called after every dataset swap as fn(compacted): None when the base data
+    # may have changed, else the IncidentBatch an incident compaction merged
+    _RELOAD_LISTENERS.append(fn)
+
+def compaction_reach(compacted: IncidentBatch, radius_meters: float = 500):
+    """(lats, lons, distance) around which a compaction can change untimed scores."""
+    if SCORING_MODE == "kde":
+        # Severities are rescaled over the whole merged layer
+        batch = DATASET.ingested.batch
+        return batch.lats, batch.lons, kde.support_m(kde.KDE_KERNEL, kde.KDE_BANDWIDTH_M)
+    return compacted.lats, compacted.lons, radius_meters
+
+def read_crime_csv(csv_path: str):
+    import pandas as pd # Only needed without a snapshot
+    df = pd.read_csv(csv_path)
+    # Ensure we have lat/lon
+    if 'Latitude' not in df.columns or 'Longitude' not in df.columns:
+        print("CSV missing Latitude/Longitude columns.")
+        return None
+    # Drop invalid rows
+    df = df.dropna(subset=['Latitude', 'Longitude'])
+    return CrimeStore.from_dataframe(df)
+
+def load_safety_raster(path: str, store: CrimeStore):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        raster = SafetyRaster.load(path)
+    except Exception as e:
+        print(f"Error loading safety raster: {e}")
+        return None
+    if raster.fingerprint != store.fingerprint():
+        print(f"Ignoring stale safety raster {path} (crime data changed, rebuild it).")
+        return None
+    kernel = kde.KDE_KERNEL if SCORING_MODE == "kde" else None
+    if not raster.matches(raster.radius_m, kernel, kde.KDE_BANDWIDTH_M):
+        print(f"Ignoring safety raster {path} (built for {raster.kernel or 'radius'} scoring, "
+              f"SCORING_MODE={SCORING_MODE}; rebuild it).")
+        return None
+    print(f"Loaded safety raster {path} ({raster.shape[0]}x{raster.shape[1]} cells).")
+    return raster
 
 # Simple Haversine distance
 def haversine_distance(lat1, lon1, lat2, lon2):
@@ -31,49 +237,155 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     return R * c
 
-async def calculate_safety_score(lat: float, lon: float, radius_meters: float = 500) -> dict:
-    # 1. Spatial Search (Linear scan is fine for < 10k points)
-    # A real implementation would use a KDTree or RTree
-    crimes = []
-    
-    for c in CRIME_DATA:
-        dist = haversine_distance(lat, lon, c['Latitude'], c['Longitude'])
-        if dist <= radius_meters:
-            crimes.append(c)
-            
+# Points per vectorized join; bounds the size of the candidate pair arrays
+SCORE_CHUNK_POINTS = 1024
+
+def score_points(lats, lons, radius_meters: float = 500, time_bucket: int = None) -> List[dict]:
+    """Score many locations in one vectorized pass.
+
+    Returns one `calculate_safety_score`-style dict per input point.
+    `time_bucket` (see backend/temporal.py) weights incidents by time of day.
+    """
+    dataset = DATASET # One bundle for the whole call, even if a reload swaps it meanwhile
+    penalties, counts, types = _score_components(dataset, lats, lons, radius_meters, time_bucket, with_types=True)
+    lighting, lights, police, nearest = _asset_components(dataset, lats, lons)
+    return [
+        _score_result(penalties[i], counts[i], types[i], lighting[i], lights[i], police[i], nearest[i])
+        for i in range(len(penalties))
+    ]
+
+def score_values(lats, lons, radius_meters: float = 500, time_bucket: int = None,
+                 with_assets: bool = True) -> np.ndarray:
+    # Scores only, as an array: for bulk callers that don't need details.
+    # with_assets=False leaves out the lighting and police bonuses (crime only)
+    dataset = DATASET
+    penalties, _, _ = _score_components(dataset, lats, lons, radius_meters, time_bucket, with_types=False)
+    if not with_assets:
+        return np.clip(100.0 - penalties, 0.0, 100.0)
+    lighting, _, police, _ = _asset_components(dataset, lats, lons)
+    return np.clip(100.0 - penalties + lighting + police, 0.0, 100.0)
+
+def _asset_components(dataset, lats, lons):
+    """Lighting bonus, lights nearby, police bonus and nearest station distance per point.
+
+    Same chunking as the crime join: one batched query per layer per chunk.
+    """
+    lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+    lons = np.asarray(lons, dtype=np.float64).reshape(-1)
+    n = len(lats)
+    lighting, police = np.zeros(n), np.zeros(n)
+    lights, nearest = np.zeros(n, dtype=np.int64), np.full(n, np.inf)
+    assets = dataset.assets if dataset is not None else None
+    if assets is None:
+        return lighting, lights, police, nearest
+    for start in range(0, n, SCORE_CHUNK_POINTS):
+        end = min(start + SCORE_CHUNK_POINTS, n)
+        lighting[start:end], lights[start:end] = assets.lighting(lats[start:end], lons[start:end])
+        police[start:end], nearest[start:end] = assets.police(lats[start:end], lons[start:end])
+    return lighting, lights, police, nearest
+
+def _score_components(dataset, lats, lons, radius_meters, time_bucket, with_types):
+    lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+    lons = np.asarray(lons, dtype=np.float64).reshape(-1)
+    n = len(lats)
+    counts = np.zeros(n, dtype=np.int64)
+    penalties = np.zeros(n, dtype=np.float64)
+    types = [[] for _ in range(n)] if with_types else None
+    if dataset is None:
+        return penalties, counts, types
+    store, index, raster = dataset.store, dataset.index, dataset.raster
+    # Nothing to weight in an untimed base: same as untimed (ingested layers check their own times)
+    base_bucket = time_bucket if store.has_times else None
+
+    kernel = kde.KDE_KERNEL if SCORING_MODE == "kde" else None
+
+    if (raster is not None and raster.matches(radius_meters, kernel, kde.KDE_BANDWIDTH_M)
+            and (base_bucket is None or raster.has_time_layers)):
+        # Kernel-density grids are always interpolated, or cell steps would undo the smoothing
+        penalties, counts, masks = raster.lookup(
+            lats, lons, interpolate=RASTER_INTERPOLATE or kernel is not None, time_bucket=base_bucket
+        )
+        metrics.inc("score_queries_total", path="raster")
+        if with_types:
+            types = [raster.type_names(m) if m else [] for m in masks.tolist()]
+    elif len(store):
+        metrics.inc("score_queries_total", path="kde" if kernel else "radius")
+        _add_layer(store, index, lats, lons, radius_meters, kernel, base_bucket, penalties, counts, types)
+
+    # Ingested incidents: the compacted layer, then the pending delta
+    for layer in (dataset.ingested, dataset.delta.layer()):
+        if layer is not None:
+            _add_layer(layer.store, layer.index, lats, lons, radius_meters, kernel, time_bucket, penalties, counts, types)
+
+    return penalties, counts, types
+
+def _add_layer(store, index, lats, lons, radius_meters, kernel, time_bucket, penalties, counts, types):
+    # Adds one incident layer's penalties, counts and crime types to the per-point arrays
+    n = len(lats)
+    ntypes = len(store.crime_types)
+    for start in range(0, n, SCORE_CHUNK_POINTS):
+        end = min(start + SCORE_CHUNK_POINTS, n)
+        if kernel is None:
+            pts, inc = index.query_radius_batch(lats[start:end], lons[start:end], radius_meters)
+            weights = store.penalties(inc, time_bucket)
+        else:
+            pts, inc, weights = kde.kernel_pairs(
+                store, index, lats[start:end], lons[start:end], radius_meters, kernel, kde.KDE_BANDWIDTH_M, time_bucket
+            )
+        if len(pts) == 0:
+            continue
+        metrics.inc("incidents_scanned_total", len(pts))
+        counts[start:end] += np.bincount(pts, minlength=end - start).astype(counts.dtype) # Raster counts are uint32
+        penalties[start:end] += np.bincount(pts, weights=weights, minlength=end - start)
+        if types is not None:
+            # Distinct (point, crime type) pairs
+            pairs = np.unique(pts * ntypes + store.type_codes[inc])
+            for p, code in zip((pairs // ntypes).tolist(), (pairs % ntypes).tolist()):
+                name = store.crime_types[code]
+                if name not in types[start + p]:
+                    types[start + p].append(name)
+
+def _score_result(crime_penalty: float, crimes_nearby: int, crime_types: list,
+                  lighting_bonus: float = 0.0, lights_nearby: int = 0,
+                  police_bonus: float = 0.0, nearest_police_m: float = math.inf) -> dict:
     # Calculate Score
     base_score = 100.0
-    
-    # Heuristics
-    # Severity Score handling (map crime types to severity if column missing)
-    crime_penalty = 0
-    crime_types = []
-    
-    for c in crimes:
-        c_type = c.get('Crime Type', 'Unknown')
-        crime_types.append(c_type)
-        
-        # Determine severity
-        severity = 2.0 # Default
-        if c_type in ['Murder', 'Rape', 'Kidnapping', 'Robbery']:
-            severity = 5.0
-        elif c_type in ['Theft', 'Burglary']:
-            severity = 3.0
-            
-        crime_penalty += severity
-
-    # Lighting (Mocked since we removed DB)
-    lighting_bonus = 0 
-    
-    final_score = max(0.0, min(100.0, base_score - crime_penalty + lighting_bonus))
+    crime_penalty = float(crime_penalty)
+
+    # Lighting and police proximity (backend/assets.py); 0 without asset layers
+    lighting_bonus = float(lighting_bonus)
+    police_bonus = float(police_bonus)
+
+    final_score = max(0.0, min(100.0, base_score - crime_penalty + lighting_bonus + police_bonus))
     
     return {
         "score": final_score,
         "details": {
-            "crimes_nearby": len(crimes),
-            "lights_nearby": 0, # Mocked
+            "crimes_nearby": int(crimes_nearby),
+            "lights_nearby": int(lights_nearby),
             "crime_penalty": crime_penalty,
             "lighting_bonus": lighting_bonus,
-            "crime_types": list(set(crime_types))
+            "police_bonus": police_bonus,
+            # None when no station within POLICE_RANGE_M
+            "nearest_police_m": round(float(nearest_police_m), 1) if math.isfinite(nearest_police_m) else None,
+            "crime_types": crime_types
         }
     }
+
+async def ascore_points(lats, lons, radius_meters: float = 500, when=None) -> List[dict]:
+    # score_points on the configured SCORING_BACKEND; `when` is a datetime or None
+    metrics.inc("points_scored_total", len(lats), backend=SCORING_BACKEND)
+    if SCORING_BACKEND == "postgis":
+        from backend import postgis_scoring
+        return await postgis_scoring.score_points(lats, lons, radius_meters, time_bucket=temporal.time_bucket(when))
+    return await executor.run(score_points, lats, lons, radius_meters, temporal.time_bucket(when))
+
+async def ascore_values(lats, lons, radius_meters: float = 500, when=None) -> np.ndarray:
+    if SCORING_BACKEND == "postgis":
+        results = await ascore_points(lats, lons, radius_meters, when)
+        return np.array([r["score"] for r in results], dtype=np.float64)
+    metrics.inc("points_scored_total", len(lats), backend=SCORING_BACKEND)
+    return await executor.run(score_values, lats, lons, radius_meters, temporal.time_bucket(when))
+
+async def calculate_safety_score(lat: float, lon: float, radius_meters: float = 500, when=None) -> dict:
+    return (await ascore_points([lat], [lon], radius_meters, when))[0]
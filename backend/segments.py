@@ -0,0 +1,86 @@
+import json
+import os
+import numpy as np
+
+# Score components stored per segment, in RoadSegmentScore column order
+SCORE_FIELDS = ("crime_score", "lighting_score", "police_score", "final_safety_score")
+
+
+class SegmentScores:
+    """Precomputed safety scores per road segment (OSM way).
+
+    Built offline by `etl/score_road_segments.py` and stored next to the
+    road graph. `final` is the 0-100 score `/route` aggregates per metre of
+    road when `"scoring": "segments"` is requested.
+    """
+
+    def __init__(self, way_ids, crime_score, lighting_score, police_score, final_safety_score,
+                 fingerprint: str = "", radius_m: float = 500):
+        way_ids = np.asarray(way_ids, dtype=np.int64)
+        order = np.argsort(way_ids, kind="stable")
+        self.way_ids = way_ids[order]
+        self.crime = np.asarray(crime_score, dtype=np.float32)[order]
+        self.lighting = np.asarray(lighting_score, dtype=np.float32)[order]
+        self.police = np.asarray(police_score, dtype=np.float32)[order]
+        self.final = np.asarray(final_safety_score, dtype=np.float32)[order]
+        self.fingerprint = fingerprint
+        self.radius_m = float(radius_m)
+
+    def __len__(self):
+        return len(self.way_ids)
+
+    def save(self, path: str):
+        meta = {"fingerprint": self.fingerprint, "radius_m": self.radius_m}
+        np.savez(
+            path,
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            way_ids=self.way_ids, crime_score=self.crime, lighting_score=self.lighting,
+            police_score=self.police, final_safety_score=self.final,
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as f:
+            meta = json.loads(f["meta"].tobytes().decode())
+            return cls(f["way_ids"], *(f[name] for name in SCORE_FIELDS), **meta)
+
+    def lookup(self, way_ids) -> np.ndarray:
+        # Final score per way id; NaN for ways that were never scored
+        way_ids = np.asarray(way_ids, dtype=np.int64)
+        if len(self.way_ids) == 0:
+            return np.full(len(way_ids), np.nan)
+        pos = np.minimum(np.searchsorted(self.way_ids, way_ids), len(self.way_ids) - 1)
+        return np.where(self.way_ids[pos] == way_ids, self.final[pos], np.nan)
+
+    def score_edges(self, graph, edges) -> tuple:
+        """Length-weighted score of a path of graph edge ids.
+
+        Returns `(score, scored_length_m, way_scores)` where `way_scores`
+        maps each distinct scored way on the path to its score; `score` is
+        None when none of the edges belongs to a scored segment.
+        """
+        edges = np.asarray(edges, dtype=np.int64)
+        ways = graph.edge_way[edges]
+        scores = self.lookup(ways)
+        lengths = graph.edge_length[edges].astype(np.float64)
+        ok = ~np.isnan(scores)
+        way_scores = dict(zip(ways[ok].tolist(), scores[ok].tolist()))
+        scored_length = float(lengths[ok].sum())
+        if scored_length <= 0:
+            return None, 0.0, way_scores
+        return float(np.dot(scores[ok], lengths[ok]) / scored_length), scored_length, way_scores
+
+
+def load_segment_scores(path: str, store):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        segments = SegmentScores.load(path)
+    except Exception as e:
+        print(f"Error loading segment scores: {e}")
+        return None
+    if store is None or segments.fingerprint != store.fingerprint():
+        print(f"Ignoring stale segment scores {path} (crime data changed, rerun etl/score_road_segments.py).")
+        return None
+    print(f"Loaded {len(segments)} road segment scores from {path}.")
+    return segments
@@ -0,0 +1,26 @@
+import json
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError: # Optional speed-up; the stdlib encoder gives the same JSON
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded in one pass from plain dicts/lists.
+
+    Skips FastAPI's response_model validation and jsonable_encoder walk;
+    callers are responsible for producing the documented shape.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import numpy as np
+from backend.assets import ASSET_ARRAYS, AssetLayers
+from backend.spatial import INDEX_TYPES
+from backend.store import CrimeStore
+
+# Binary crime snapshot: one uncompressed .npy per array plus meta.json.
+# Arrays are opened with mmap_mode="r", so loading is a few syscalls and the
+# page cache is shared by every worker process reading the same files.
+# Files are replaced, never rewritten in place, so a running server that
+# still maps the previous snapshot keeps reading consistent data.
+#
+# The street light / police station layers (backend/assets.py) are stored
+# alongside, so a cold start from a current snapshot parses no CSV at all.
+# Each source file is checked by content like the crime CSV.
+
+SNAPSHOT_VERSION = 1
+STORE_ARRAYS = ("lats", "lons", "type_codes", "severity", "times")
+
+
+def write_snapshot(path: str, store: CrimeStore, index=None, source_path: str = None,
+                   assets: AssetLayers = None, asset_paths: tuple = None):
+    os.makedirs(path, exist_ok=True)
+    for name in STORE_ARRAYS:
+        _save_array(os.path.join(path, f"{name}.npy"), getattr(store, name))
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "count": len(store),
+        "crime_types": store.crime_types,
+        "fingerprint": store.fingerprint(),
+        "source": _source_stat(source_path),
+        "index": None,
+    }
+    if index is not None:
+        params, arrays = index.state()
+        for name, arr in arrays.items():
+            _save_array(os.path.join(path, f"index_{name}.npy"), arr)
+        meta["index"] = {"kind": index.name, "params": params, "arrays": sorted(arrays)}
+    if asset_paths is not None:
+        # Sources as they were when `assets` was read (None where a file was absent)
+        if assets is not None:
+            for name in ASSET_ARRAYS:
+                _save_array(os.path.join(path, f"assets_{name}.npy"), getattr(assets, name))
+        meta["assets"] = {"sources": [_source_stat(p) for p in asset_paths], "stored": assets is not None}
+
+    # meta.json last: a snapshot without it is incomplete and never loaded
+    meta_path = os.path.join(path, "meta.json")
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _save_array(file_path: str, arr):
+    # New inode via rename: existing memory maps of the old file stay valid
+    with open(file_path + ".tmp", "wb") as f:
+        np.save(f, arr)
+    os.replace(file_path + ".tmp", file_path)
+
+
+def read_meta(path: str):
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("version") != SNAPSHOT_VERSION:
+        return None
+    return meta
+
+
+def _source_stat(source_path: str, size_only: bool = False):
+    # Content, not mtime: a fresh clone or checkout rewrites every mtime
+    if not source_path or not os.path.exists(source_path):
+        return None
+    stat = {"size": os.path.getsize(source_path)}
+    if not size_only:
+        h = hashlib.sha1()
+        with open(source_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        stat["sha1"] = h.hexdigest()
+    return stat
+
+
+def is_current(meta: dict, source_path: str) -> bool:
+    """Whether the snapshot was built from the current contents of `source_path`.
+
+    Hashing the CSV reads it once, still far cheaper than parsing it.
+    """
+    if not source_path or not os.path.exists(source_path):
+        return True
+    source = meta.get("source")
+    if source is None:
+        # Snapshots that only recorded the size can't vouch for the file; without either, nothing to check
+        return "source_size" not in meta or meta["source_size"] is None
+    if "sha1" not in source or _source_stat(source_path, size_only=True)["size"] != source["size"]:
+        return False
+    return _source_stat(source_path) == source
+
+
+def assets_current(meta: dict, asset_paths: tuple) -> bool:
+    saved = meta.get("assets")
+    return saved is not None and saved["sources"] == [_source_stat(p) for p in asset_paths]
+
+
+def load_assets(path: str, meta: dict):
+    """AssetLayers stored with the snapshot, or None when it was built without any."""
+    if not meta["assets"]["stored"]:
+        return None
+    layers = AssetLayers(*(np.load(os.path.join(path, f"assets_{name}.npy")) for name in ASSET_ARRAYS))
+    print(f"Mapped {layers.num_lights} working street lights and {layers.num_stations} police stations from snapshot.")
+    return layers
+
+
+def load_snapshot(path: str, meta: dict = None, index_kind: str = None):
+    """Return (store, index) backed by read-only memory maps.
+
+    `index` is None when the snapshot holds no index or a different kind
+    than `index_kind`; callers then build one from `store`.
+    """
+    meta = meta or read_meta(path)
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        for name in STORE_ARRAYS
+        if os.path.exists(os.path.join(path, f"{name}.npy")) # times.npy is absent in older snapshots
+    }
+    store = CrimeStore(
+        arrays["lats"], arrays["lons"], arrays["type_codes"], meta["crime_types"], arrays["severity"],
+        coord_dtype=arrays["lats"].dtype, times=arrays.get("times"),
+    )
+    store._fingerprint = meta["fingerprint"]
+
+    index = None
+    saved = meta.get("index")
+    if saved and saved["kind"] in INDEX_TYPES and (index_kind is None or saved["kind"] == index_kind):
+        index_arrays = {
+            name: np.load(os.path.join(path, f"index_{name}.npy"), mmap_mode="r")
+            for name in saved["arrays"]
+        }
+        index = INDEX_TYPES[saved["kind"]].from_state(store.lats, store.lons, saved["params"], index_arrays)
+    return store, index
@@ -0,0 +1,327 @@
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0 # Same radius as scoring.haversine_distance
+
+
+# Vectorized Haversine (broadcasts like any NumPy ufunc)
+def haversine_np(lat1, lon1, lat2, lon2):
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lon2) - np.radians(lon1)
+
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_M * c
+
+
+class SpatialIndex:
+    """Static radius-query index over incident coordinates.
+
+    Indexes are built once from lat/lon arrays and answer
+    `query_radius(lat, lon, radius_m)` with the sorted positions of every
+    point within `radius_m` metres (exact Haversine, same cutoff as the
+    original linear scan).
+    """
+
+    name = "base"
+    # Attributes persisted by `state()` (besides lats/lons)
+    state_params = ()
+    state_arrays = ()
+
+    def __init__(self, lats, lons):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.lats)
+
+    def state(self):
+        """Return (params, arrays) needed to rebuild this index without work."""
+        params = {k: getattr(self, k) for k in self.state_params}
+        arrays = {k: getattr(self, k) for k in self.state_arrays}
+        return params, arrays
+
+    @classmethod
+    def from_state(cls, lats, lons, params, arrays):
+        # Arrays may be read-only memory maps; nothing is copied or rebuilt
+        index = cls.__new__(cls)
+        SpatialIndex.__init__(index, lats, lons)
+        for k, v in {**params, **arrays}.items():
+            setattr(index, k, v)
+        return index
+
+    def candidates(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        raise NotImplementedError
+
+    def query_radius(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        cand = self.candidates(lat, lon, radius_m)
+        if len(cand) == 0:
+            return cand
+        dist = haversine_np(lat, lon, self.lats[cand], self.lons[cand])
+        return np.sort(cand[dist <= radius_m])
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_radius_m: float = 50000):
+        """Return (indices, distances) of up to `k` nearest points.
+
+        Searches growing radii (100 m, x4 each step) up to `max_radius_m`,
+        so the cost stays that of a small radius query in dense data.
+        """
+        radius = 100.0
+        while True:
+            radius = min(radius, max_radius_m)
+            idx = self.query_radius(lat, lon, radius)
+            if len(idx) >= k or radius >= max_radius_m:
+                break
+            radius *= 4
+        dist = haversine_np(lat, lon, self.lats[idx], self.lons[idx])
+        order = np.argsort(dist, kind="stable")[:k]
+        return idx[order], dist[order]
+
+    def candidate_pairs(self, lats, lons, radius_m):
+        # Fallback join: one candidate lookup per point
+        parts = [self.candidates(lat, lon, radius_m) for lat, lon in zip(lats, lons)]
+        counts = np.array([len(p) for p in parts], dtype=np.int64)
+        pts = np.repeat(np.arange(len(parts), dtype=np.int64), counts)
+        inc = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        return pts, inc.astype(np.int64, copy=False)
+
+    def query_radius_batch(self, lats, lons, radius_m, return_distance: bool = False):
+        """Radius join for many points at once.
+
+        Returns parallel arrays `(point_idx, incident_idx)`, one entry per
+        (query point, incident) pair within `radius_m`, plus the pair
+        distances in metres with `return_distance`.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        pts, inc = self.candidate_pairs(lats, lons, radius_m)
+        if len(pts) == 0:
+            return (pts, inc, np.empty(0)) if return_distance else (pts, inc)
+        dist = haversine_np(lats[pts], lons[pts], self.lats[inc], self.lons[inc])
+        keep = dist <= radius_m
+        if return_distance:
+            return pts[keep], inc[keep], dist[keep]
+        return pts[keep], inc[keep]
+
+
+class LinearIndex(SpatialIndex):
+    # Brute force over every point; kept as the reference implementation
+    name = "linear"
+
+    def candidates(self, lat, lon, radius_m):
+        return np.arange(len(self.lats), dtype=np.int64)
+
+    def candidate_pairs(self, lats, lons, radius_m):
+        n, m = len(lats), len(self.lats)
+        return np.repeat(np.arange(n, dtype=np.int64), m), np.tile(np.arange(m, dtype=np.int64), n)
+
+
+class GridIndex(SpatialIndex):
+    """Fixed-size lat/lon buckets stored as one sorted key array.
+
+    Each point gets a cell key `row * ncols + col`; points are kept sorted by
+    key so a query row becomes one contiguous slice found by `searchsorted`.
+    """
+
+    name = "grid"
+    state_params = ("cell_deg", "lat0", "lon0", "nrows", "ncols")
+    state_arrays = ("order", "sorted_keys")
+
+    def __init__(self, lats, lons, cell_deg: float = 0.005):
+        super().__init__(lats, lons)
+        self.cell_deg = float(cell_deg)
+        if len(self.lats):
+            self.lat0 = float(self.lats.min())
+            self.lon0 = float(self.lons.min())
+            self.nrows = int((self.lats.max() - self.lat0) // self.cell_deg) + 1
+            self.ncols = int((self.lons.max() - self.lon0) // self.cell_deg) + 1
+        else:
+            self.lat0 = self.lon0 = 0.0
+            self.nrows = self.ncols = 0
+
+        keys = self._cell_keys(self.lats, self.lons)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def _cell_keys(self, lats, lons):
+        rows = ((lats - self.lat0) // self.cell_deg).astype(np.int64)
+        cols = ((lons - self.lon0) // self.cell_deg).astype(np.int64)
+        return rows * self.ncols + cols
+
+    def candidates(self, lat, lon, radius_m):
+        if self.nrows == 0:
+            return np.empty(0, dtype=np.int64)
+
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        # Longitude degrees shrink with latitude; use the widest row in range
+        max_abs_lat = min(abs(lat) + dlat, 89.9)
+        dlon = dlat / math.cos(math.radians(max_abs_lat))
+
+        r0 = max(int((lat - dlat - self.lat0) // self.cell_deg), 0)
+        r1 = min(int((lat + dlat - self.lat0) // self.cell_deg), self.nrows - 1)
+        c0 = max(int((lon - dlon - self.lon0) // self.cell_deg), 0)
+        c1 = min(int((lon + dlon - self.lon0) // self.cell_deg), self.ncols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype=np.int64)
+
+        rows = np.arange(r0, r1 + 1, dtype=np.int64)
+        lo = np.searchsorted(self.sorted_keys, rows * self.ncols + c0, side="left")
+        hi = np.searchsorted(self.sorted_keys, rows * self.ncols + c1, side="right")
+        return np.concatenate([self.order[a:b] for a, b in zip(lo, hi)])
+
+    def candidate_pairs(self, lats, lons, radius_m):
+        # Same cell ranges as `candidates`, expanded for all points with
+        # repeat/cumsum arithmetic instead of a Python loop.
+        empty = np.empty(0, dtype=np.int64)
+        if self.nrows == 0 or len(lats) == 0:
+            return empty, empty
+
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        max_abs_lat = np.minimum(np.abs(lats) + dlat, 89.9)
+        dlon = dlat / np.cos(np.radians(max_abs_lat))
+
+        r0 = np.maximum(((lats - dlat - self.lat0) // self.cell_deg).astype(np.int64), 0)
+        r1 = np.minimum(((lats + dlat - self.lat0) // self.cell_deg).astype(np.int64), self.nrows - 1)
+        c0 = np.maximum(((lons - dlon - self.lon0) // self.cell_deg).astype(np.int64), 0)
+        c1 = np.minimum(((lons + dlon - self.lon0) // self.cell_deg).astype(np.int64), self.ncols - 1)
+        nrow = np.where((r0 <= r1) & (c0 <= c1), r1 - r0 + 1, 0)
+
+        # One entry per (point, grid row)
+        pt = np.repeat(np.arange(len(lats), dtype=np.int64), nrow)
+        row = r0[pt] + _ranges(nrow)
+        lo = np.searchsorted(self.sorted_keys, row * self.ncols + c0[pt], side="left")
+        hi = np.searchsorted(self.sorted_keys, row * self.ncols + c1[pt], side="right")
+
+        # One entry per (point, candidate)
+        cnt = hi - lo
+        pts = np.repeat(pt, cnt)
+        pos = np.repeat(lo, cnt) + _ranges(cnt)
+        return pts, self.order[pos]
+
+
+class KDTreeIndex(SpatialIndex):
+    """KD-tree over Earth-centred (x, y, z) coordinates in metres.
+
+    Straight-line (chord) distance in 3D is monotonic in great-circle
+    distance, so radius pruning is exact everywhere on the globe without a
+    local map projection. Nodes carry bounding boxes; subtrees fully inside
+    the query sphere are taken whole without per-point tests.
+    """
+
+    name = "kdtree"
+    state_params = ("leaf_size",)
+    state_arrays = ("xyz", "perm", "node_start", "node_end", "node_lo", "node_hi", "node_left", "node_right")
+
+    def __init__(self, lats, lons, leaf_size: int = 64):
+        super().__init__(lats, lons)
+        self.leaf_size = int(leaf_size)
+        self.xyz = self._to_xyz(self.lats, self.lons)
+        self.perm = np.arange(len(self.lats), dtype=np.int64)
+
+        starts, ends, lo, hi, left, right = [], [], [], [], [], []
+
+        def build(start, end):
+            node = len(starts)
+            starts.append(start); ends.append(end)
+            idx = self.perm[start:end]
+            p = self.xyz[idx]
+            lo.append(p.min(axis=0)); hi.append(p.max(axis=0))
+            left.append(-1); right.append(-1)
+            if end - start > self.leaf_size:
+                dim = int(np.argmax(hi[node] - lo[node]))
+                mid = (end - start) // 2
+                part = np.argpartition(p[:, dim], mid)
+                self.perm[start:end] = idx[part]
+                left[node] = build(start, start + mid)
+                right[node] = build(start + mid, end)
+            return node
+
+        if len(self.lats):
+            build(0, len(self.lats))
+
+        self.node_start = np.asarray(starts, dtype=np.int64)
+        self.node_end = np.asarray(ends, dtype=np.int64)
+        self.node_lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3)
+        self.node_hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3)
+        self.node_left = np.asarray(left, dtype=np.int64)
+        self.node_right = np.asarray(right, dtype=np.int64)
+
+    @staticmethod
+    def _to_xyz(lats, lons):
+        phi, lam = np.radians(lats), np.radians(lons)
+        cos_phi = np.cos(phi)
+        return EARTH_RADIUS_M * np.column_stack(
+            (cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi))
+        )
+
+    @property
+    def _nodes(self):
+        # Plain Python lists are much faster than NumPy scalars in the walk.
+        # Built on first query so loading a persisted tree stays cheap.
+        nodes = self.__dict__.get("_node_list")
+        if nodes is None:
+            nodes = self.__dict__["_node_list"] = list(zip(
+                self.node_start.tolist(), self.node_end.tolist(),
+                map(tuple, self.node_lo.tolist()), map(tuple, self.node_hi.tolist()),
+                self.node_left.tolist(), self.node_right.tolist(),
+            ))
+        return nodes
+
+    def candidates(self, lat, lon, radius_m):
+        if not self._nodes:
+            return np.empty(0, dtype=np.int64)
+
+        q = self._to_xyz(np.array([lat]), np.array([lon]))[0]
+        qx, qy, qz = float(q[0]), float(q[1]), float(q[2])
+        chord = 2 * EARTH_RADIUS_M * math.sin(min(radius_m / (2 * EARTH_RADIUS_M), math.pi / 2))
+        chord2 = chord * chord
+
+        whole, partial = [], []
+        stack = [0]
+        while stack:
+            start, end, lo, hi, left, right = self._nodes[stack.pop()]
+            # Nearest and farthest box distances
+            near = far = 0.0
+            for qc, l, h in ((qx, lo[0], hi[0]), (qy, lo[1], hi[1]), (qz, lo[2], hi[2])):
+                if qc < l:
+                    near += (l - qc) ** 2
+                elif qc > h:
+                    near += (qc - h) ** 2
+                far += max(qc - l, h - qc) ** 2
+            if near > chord2:
+                continue
+            if far <= chord2:
+                whole.append(self.perm[start:end])
+            elif left < 0:
+                partial.append(self.perm[start:end])
+            else:
+                stack.append(left); stack.append(right)
+
+        if partial:
+            idx = np.concatenate(partial)
+            d2 = ((self.xyz[idx] - q) ** 2).sum(axis=1)
+            whole.append(idx[d2 <= chord2 * (1 + 1e-9)])
+        if not whole:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(whole)
+
+
+def _ranges(counts):
+    # concatenate(arange(c) for c in counts), vectorized
+    total = int(counts.sum())
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total, dtype=np.int64) - starts
+
+
+INDEX_TYPES = {
+    LinearIndex.name: LinearIndex,
+    GridIndex.name: GridIndex,
+    KDTreeIndex.name: KDTreeIndex,
+}
+
+
+def build_index(lats, lons, kind: str = "grid", **params) -> SpatialIndex:
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown spatial index '{kind}'. Choose from {sorted(INDEX_TYPES)}")
+    return INDEX_TYPES[kind](lats, lons, **params)
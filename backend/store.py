@@ -0,0 +1,132 @@
+import hashlib
+import numpy as np
+from backend import temporal
+
+# Penalty per incident inside the scoring radius, by crime type
+HIGH_SEVERITY_TYPES = ['Murder', 'Rape', 'Kidnapping', 'Robbery']
+MEDIUM_SEVERITY_TYPES = ['Theft', 'Burglary']
+DEFAULT_PENALTY = 2.0
+
+
+def crime_type_penalty(c_type: str) -> float:
+    if c_type in HIGH_SEVERITY_TYPES:
+        return 5.0
+    if c_type in MEDIUM_SEVERITY_TYPES:
+        return 3.0
+    return DEFAULT_PENALTY
+
+
+class CrimeStore:
+    """Columnar in-memory crime dataset.
+
+    One NumPy array per field instead of one dict per incident:
+    - `lats`, `lons`: coordinates
+    - `type_codes`: index into `crime_types` (categorical coding)
+    - `severity`: the CSV `Severity` column (NaN when absent)
+    - `times`: epoch seconds, local time (`temporal.NO_TIME` when unknown)
+
+    `type_penalty[type_codes]` gives the per-incident score penalty.
+    """
+
+    def __init__(self, lats, lons, type_codes, crime_types, severity=None, coord_dtype=np.float64, times=None):
+        self.lats = np.ascontiguousarray(lats, dtype=coord_dtype)
+        self.lons = np.ascontiguousarray(lons, dtype=coord_dtype)
+        self.type_codes = np.ascontiguousarray(type_codes, dtype=np.int16)
+        self.crime_types = list(crime_types)
+        if severity is None:
+            severity = np.full(len(self.lats), np.nan)
+        self.severity = np.ascontiguousarray(severity, dtype=np.float32)
+        self.type_penalty = np.array([crime_type_penalty(t) for t in self.crime_types], dtype=np.float64)
+        if times is None:
+            times = np.full(len(self.lats), temporal.NO_TIME, dtype=np.int64)
+        self.times = np.ascontiguousarray(times, dtype=np.int64)
+        self.time_bucket = temporal.incident_buckets(self.times)
+        self.recency = temporal.recency_weights(self.times)
+        self.has_times = bool((self.time_bucket != temporal.NO_BUCKET).any())
+        self._severity_penalty = None # Built on first use (kernel-density scoring)
+        self._fingerprint = None
+
+    @classmethod
+    def from_dataframe(cls, df, coord_dtype=np.float64):
+        if 'Crime Type' in df.columns:
+            types = df['Crime Type'].fillna('Unknown').astype(str)
+        else:
+            types = np.full(len(df), 'Unknown', dtype=object)
+        codes, categories = _factorize(types)
+        severity = df['Severity'].to_numpy(dtype=np.float32) if 'Severity' in df.columns else None
+        time_column = next((c for c in ('Date Time', 'date_time') if c in df.columns), None)
+        times = temporal.parse_times(df[time_column]) if time_column else None
+        return cls(
+            df['Latitude'].to_numpy(),
+            df['Longitude'].to_numpy(),
+            codes,
+            categories,
+            severity,
+            coord_dtype=coord_dtype,
+            times=times,
+        )
+
+    def __len__(self):
+        return len(self.lats)
+
+    @property
+    def nbytes(self) -> int:
+        return (self.lats.nbytes + self.lons.nbytes + self.type_codes.nbytes
+                + self.severity.nbytes + self.type_penalty.nbytes
+                + self.times.nbytes + self.time_bucket.nbytes + self.recency.nbytes)
+
+
+    def fingerprint(self) -> str:
+        # Identifies the dataset contents; derived artifacts store it to detect staleness
+        if self._fingerprint is None:
+            h = hashlib.sha1()
+            for arr in (self.lats, self.lons, self.type_codes):
+                h.update(np.ascontiguousarray(arr).tobytes())
+            if self.has_times: # Untimed datasets keep their earlier fingerprints
+                h.update(self.times.tobytes())
+            h.update("\x00".join(self.crime_types).encode())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    @property
+    def severity_penalty(self) -> np.ndarray:
+        """Per-incident penalty from the `Severity` column.
+
+        Severities are rescaled so they add up to the same total as the
+        per-type penalties; incidents without a severity keep their type
+        penalty.
+        """
+        if self._severity_penalty is None:
+            by_type = self.type_penalty[self.type_codes]
+            known = ~np.isnan(self.severity)
+            penalty = by_type.copy()
+            if known.any() and self.severity[known].sum() > 0:
+                scale = by_type[known].sum() / self.severity[known].astype(np.float64).sum()
+                penalty[known] = self.severity[known] * scale
+            self._severity_penalty = penalty
+        return self._severity_penalty
+
+    def penalties(self, idx, time_bucket: int = None, severity: bool = False) -> np.ndarray:
+        """Penalty per incident in `idx`.
+
+        Weighted for a query time bucket if given; `severity` uses
+        `severity_penalty` instead of the per-type table.
+        """
+        if severity:
+            penalty = self.severity_penalty[idx]
+        else:
+            penalty = self.type_penalty[self.type_codes[idx]]
+        if time_bucket is not None and self.has_times:
+            penalty = penalty * temporal.WEIGHTS[time_bucket][self.time_bucket[idx]] * self.recency[idx]
+        return penalty
+
+    def type_names(self, idx) -> list:
+        return [self.crime_types[c] for c in np.unique(self.type_codes[idx])]
+
+
+def _factorize(values):
+    # Hash-based, and sorted like np.unique; sorting Python strings holds the
+    # GIL for seconds on millions of rows, which stalls reloads in a thread
+    import pandas as pd
+    codes, categories = pd.factorize(pd.Series(values, dtype=object).astype(str), sort=True)
+    return codes, [str(c) for c in categories]
@@ -0,0 +1,122 @@
+import os
+from datetime import datetime, timezone, timedelta
+import numpy as np
+
+# Time-of-day risk: an incident counts more near the hour (and kind of day)
+# it happened at, and recent incidents count more than old ones.
+#
+# Times fall into TIME_BUCKETS buckets: hour of day x (weekday, weekend). A
+# query bucket q weighs an incident from bucket b by WEIGHTS[q, b], a
+# circular Gaussian over the hour difference, damped across day types.
+# Columns are normalized so an incident's weight averages 1 over the week:
+# with incidents spread evenly in time a timed score equals the untimed one.
+# Incidents without a timestamp use the last column, all ones.
+#
+# Scoring multiplies each incident's penalty by WEIGHTS[q, bucket] * recency,
+# two gathers over the incidents already found by the radius query, so a
+# timed query costs the same as an untimed one.
+
+HOURS = 24
+DAY_TYPES = 2 # weekday, weekend
+TIME_BUCKETS = HOURS * DAY_TYPES
+NO_BUCKET = TIME_BUCKETS # Column of WEIGHTS for incidents without a time
+NO_TIME = np.iinfo(np.int64).min # CrimeStore.times value for unknown times
+
+TEMPORAL_HOUR_SIGMA = float(os.getenv("TEMPORAL_HOUR_SIGMA", "2"))
+TEMPORAL_OTHER_DAY_WEIGHT = float(os.getenv("TEMPORAL_OTHER_DAY_WEIGHT", "0.5"))
+TEMPORAL_HALF_LIFE_DAYS = float(os.getenv("TEMPORAL_HALF_LIFE_DAYS", "365"))
+# Naive departure times are local; aware ones are converted to this offset
+TEMPORAL_UTC_OFFSET_HOURS = float(os.getenv("TEMPORAL_UTC_OFFSET_HOURS", "5.5"))
+
+
+def _bucket(hours, weekdays):
+    return (np.asarray(weekdays) >= 5).astype(np.int64) * HOURS + np.asarray(hours)
+
+
+def local_time(when: datetime) -> datetime:
+    # Naive local wall-clock time; aware times are converted to TEMPORAL_UTC_OFFSET_HOURS
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone(timedelta(hours=TEMPORAL_UTC_OFFSET_HOURS))).replace(tzinfo=None)
+    return when
+
+
+def time_bucket(when: datetime):
+    """Bucket of a query time, or None for untimed queries."""
+    if when is None:
+        return None
+    when = local_time(when)
+    return int(_bucket(when.hour, when.weekday()))
+
+
+def incident_buckets(times) -> np.ndarray:
+    """Bucket per incident from epoch seconds (local time); NO_BUCKET when unknown."""
+    times = np.asarray(times, dtype=np.int64)
+    known = times != NO_TIME
+    t = np.where(known, times, 0)
+    hours = (t // 3600) % 24
+    weekdays = (t // 86400 + 3) % 7 # 1970-01-01 was a Thursday
+    return np.where(known, _bucket(hours, weekdays), NO_BUCKET).astype(np.int16)
+
+
+def recency_weights(times, half_life_days: float = TEMPORAL_HALF_LIFE_DAYS) -> np.ndarray:
+    """Exponential decay by age relative to the newest incident.
+
+    Normalized to mean 1 over timed incidents, so decay shifts weight
+    towards recent incidents without changing the overall level. Untimed
+    incidents get 1.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    known = times != NO_TIME
+    weights = np.ones(len(times), dtype=np.float32)
+    if known.any() and half_life_days > 0:
+        age_days = (times[known].max() - times[known]) / 86400.0
+        decay = np.power(0.5, age_days / half_life_days)
+        weights[known] = decay / decay.mean()
+    return weights
+
+
+def bucket_weights(sigma_hours: float = TEMPORAL_HOUR_SIGMA,
+                   other_day_weight: float = TEMPORAL_OTHER_DAY_WEIGHT) -> np.ndarray:
+    # (TIME_BUCKETS, TIME_BUCKETS + 1) float32, see the module comment
+    q = np.arange(TIME_BUCKETS)
+    hour_q, day_q = q % HOURS, q // HOURS
+    diff = np.abs(hour_q[:, None] - hour_q[None, :])
+    diff = np.minimum(diff, HOURS - diff)
+    kernel = np.exp(-0.5 * (diff / sigma_hours) ** 2)
+    kernel *= np.where(day_q[:, None] == day_q[None, :], 1.0, other_day_weight)
+    # Share of the week each query bucket covers: 5 weekdays, 2 weekend days
+    share = np.where(day_q == 0, 5 / 7, 2 / 7) / HOURS
+    kernel /= (share[:, None] * kernel).sum(axis=0, keepdims=True)
+    return np.hstack([kernel, np.ones((TIME_BUCKETS, 1))]).astype(np.float32)
+
+
+WEIGHTS = bucket_weights()
+
+
+def parse_times(values) -> np.ndarray:
+    """Epoch seconds (local wall-clock time) from date strings; NO_TIME where missing."""
+    import pandas as pd
+    values = pd.Series(values)
+    try:
+        parsed = pd.to_datetime(values, errors="coerce")
+        # Aware values in a naive column come back NaT instead of failing
+        failed = values[parsed.isna() & values.notna()].astype(str)
+        mixed = bool(failed.str.contains(r"(?:Z|[+-]\d\d:?\d\d)$").any())
+    except ValueError: # Mixed UTC offsets
+        mixed = True
+    if mixed:
+        parsed = pd.Series([_local_or_nat(v) for v in values], dtype="datetime64[ns]")
+    elif getattr(parsed.dt, "tz", None) is not None:
+        parsed = parsed.dt.tz_convert(timezone(timedelta(hours=TEMPORAL_UTC_OFFSET_HOURS))).dt.tz_localize(None)
+    seconds = parsed.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    return np.where(parsed.isna().to_numpy(), NO_TIME, seconds)
+
+
+def _local_or_nat(value):
+    # One value at a time, for columns that mix offsets (or naive and aware times)
+    import pandas as pd
+    try:
+        when = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return pd.NaT
+    return pd.NaT if pd.isna(when) else local_time(when.to_pydatetime())
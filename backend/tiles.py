@@ -0,0 +1,354 @@
+import hashlib
+import math
+import os
+import shutil
+import struct
+import threading
+import zlib
+import numpy as np
+from backend import kde, scoring
+from backend.cache import InMemoryCache
+from backend.spatial import haversine_np
+
+# Slippy-map heatmap tiles (256 px PNG, Web Mercator) for the Leaflet frontend.
+#
+#   safety   exact scores (scoring.score_values, so the raster when present)
+#            on a TILE_SAMPLES x TILE_SAMPLES grid, upsampled to 256 px
+#   density  incident penalties binned into pixels with np.bincount and
+#            box-blurred over ~the scoring radius; approximate, and its cost
+#            only depends on the incidents the spatial indexes return for
+#            the tile plus the blur margin
+#
+# Both layers include ingested incidents (backend/incidents.py).
+#
+# Tiles are cached in memory (LRU) and on disk under
+# TILE_CACHE_DIR/<version>/<layer>/<z>/<x>/<y>.png. The version is a hash of
+# the dataset version and the scoring settings, and doubles as the ETag,
+# so a reload, a compaction or a SCORING_MODE change starts a fresh cache and
+# revalidating clients get 304s without any work. Pending (uncompacted)
+# incidents are left out of the version, so reports don't invalidate every
+# tile; they show up in tiles rendered after they arrive, and everywhere once
+# compacted. Older version directories of a layer are deleted when a new one
+# is first written, and the disk cache is capped at TILE_DISK_MAX_TILES,
+# least recently used first. scripts/seed_tiles.py fills the disk cache for
+# the data extent ahead of time.
+
+LAYERS = ("safety", "density")
+TILE_SIZE = 256
+TILE_SAMPLES = int(os.getenv("TILE_SAMPLES", "64")) # Scores per tile side (safety layer)
+TILE_MIN_ZOOM = int(os.getenv("TILE_MIN_ZOOM", "9"))
+TILE_MAX_ZOOM = int(os.getenv("TILE_MAX_ZOOM", "18"))
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "2048")) # Tiles kept in memory
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "data/tiles") # Empty disables the disk cache
+TILE_DISK_MAX_TILES = int(os.getenv("TILE_DISK_MAX_TILES", "100000"))
+
+SCORE_RADIUS_M = 500.0 # Radius the tiles show, as /score's default
+RISK_FULL = 50.0 # Penalty drawn fully red
+DENSITY_MAX_BINS = 32 # Blur radius in bins; wider radii bin coarser instead
+EXTENT_MARGIN_DEG = 0.01 # Past the last incident; beyond it tiles are empty
+
+# Green -> yellow -> red over risk 0..RISK_FULL
+_STOPS = np.array([[0, 170, 0], [255, 200, 0], [220, 0, 0]], dtype=np.float64)
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """8-bit RGBA PNG from an (h, w, 4) uint8 array (no filtering, zlib level 6)."""
+    h, w, _ = rgba.shape
+    raw = np.hstack([np.zeros((h, 1), dtype=np.uint8), rgba.reshape(h, w * 4)]).tobytes()
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+EMPTY_TILE = encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+
+def colorize(risk: np.ndarray) -> np.ndarray:
+    # Transparent where there is no risk, more opaque and redder as it grows
+    t = np.clip(np.asarray(risk, dtype=np.float64) / RISK_FULL, 0.0, 1.0)
+    pos = t * (len(_STOPS) - 1)
+    lo = np.minimum(pos.astype(np.int64), len(_STOPS) - 2)
+    frac = (pos - lo)[..., None]
+    rgb = _STOPS[lo] * (1 - frac) + _STOPS[lo + 1] * frac
+    alpha = np.where(risk > 0.5, 60 + 140 * t, 0.0)
+    return np.dstack([rgb, alpha]).round().astype(np.uint8)
+
+
+def tile_lat_lon(z: int, x: int, y: int, samples: int = TILE_SIZE):
+    """Latitudes (rows, north first) and longitudes (columns) of a tile's sample centres."""
+    n = TILE_SIZE * 2 ** z
+    step = TILE_SIZE / samples
+    offsets = (np.arange(samples) + 0.5) * step
+    lons = (x * TILE_SIZE + offsets) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y * TILE_SIZE + offsets) / n))))
+    return lats, lons
+
+
+def tile_bounds(z: int, x: int, y: int):
+    # (south, west, north, east) in degrees
+    n = 2 ** z
+    west, east = x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def tile_range(south: float, west: float, north: float, east: float, z: int):
+    """(x0, x1, y0, y1) inclusive tile indexes covering a lat/lon box at zoom z."""
+    n = 2 ** z
+
+    def tx(lon):
+        return min(n - 1, max(0, int((lon + 180.0) / 360.0 * n)))
+
+    def ty(lat):
+        lat = max(-85.0511, min(85.0511, lat))
+        return min(n - 1, max(0, int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)))
+
+    return tx(west), tx(east), ty(north), ty(south)
+
+
+def incident_layers(dataset) -> list:
+    # (store, index) of the base data, the compacted ingested incidents and the pending delta
+    layers = [(dataset.store, dataset.index)]
+    for layer in (dataset.ingested, dataset.delta.layer()):
+        if layer is not None:
+            layers.append((layer.store, layer.index))
+    return [(store, index) for store, index in layers if len(store)]
+
+
+def _bounds(stores):
+    return (min(float(s.lats.min()) for s in stores) - EXTENT_MARGIN_DEG,
+            min(float(s.lons.min()) for s in stores) - EXTENT_MARGIN_DEG,
+            max(float(s.lats.max()) for s in stores) + EXTENT_MARGIN_DEG,
+            max(float(s.lons.max()) for s in stores) + EXTENT_MARGIN_DEG)
+
+
+_extent_cache = {}
+
+
+def data_extent(dataset):
+    """(south, west, north, east) of the incidents plus a margin, or None."""
+    if dataset is None:
+        return None
+    cached = _extent_cache.get("extent")
+    if cached is None or cached[0] is not dataset:
+        # Base and ingested layers are immutable: once per dataset
+        stores = [s for s in (dataset.store, dataset.ingested.store if dataset.ingested else None) if s is not None and len(s)]
+        cached = _extent_cache["extent"] = (dataset, _bounds(stores) if stores else None)
+    extent = cached[1]
+    delta = dataset.delta.layer()
+    if delta is not None:
+        pending = _bounds([delta.store])
+        extent = pending if extent is None else (min(extent[0], pending[0]), min(extent[1], pending[1]),
+                                                 max(extent[2], pending[2]), max(extent[3], pending[3]))
+    return extent
+
+
+def render_safety(z: int, x: int, y: int) -> np.ndarray:
+    lats, lons = tile_lat_lon(z, x, y, TILE_SAMPLES)
+    grid_lats, grid_lons = np.meshgrid(lats, lons, indexing="ij")
+    scores = scoring.score_values(grid_lats.ravel(), grid_lons.ravel(), SCORE_RADIUS_M)
+    risk = (100.0 - scores).reshape(TILE_SAMPLES, TILE_SAMPLES)
+    repeat = TILE_SIZE // TILE_SAMPLES
+    return np.repeat(np.repeat(risk, repeat, axis=0), repeat, axis=1)
+
+
+def _pixel_lat_lon(z: int, x: int, y: int, px: float, py: float):
+    # Lat/lon of a pixel position relative to the tile's top-left corner (may lie outside it)
+    n = TILE_SIZE * 2 ** z
+    lon = (x * TILE_SIZE + px) / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y * TILE_SIZE + py) / n))))
+    return lat, lon
+
+
+def window_incidents(index, z: int, x: int, y: int, pad_px: float) -> np.ndarray:
+    """Incidents within the tile grown by `pad_px` on every side (plus the corners
+    of the enclosing circle), from one radius query on the layer's index."""
+    lat_c, lon_c = _pixel_lat_lon(z, x, y, TILE_SIZE / 2, TILE_SIZE / 2)
+    corners = [_pixel_lat_lon(z, x, y, px, py) for px in (-pad_px, TILE_SIZE + pad_px)
+               for py in (-pad_px, TILE_SIZE + pad_px)]
+    radius = max(float(haversine_np(lat_c, lon_c, lat, lon)) for lat, lon in corners)
+    return index.query_radius(lat_c, lon_c, radius)
+
+
+def render_density(z: int, x: int, y: int, dataset) -> np.ndarray:
+    n = TILE_SIZE * 2 ** z
+    lat_c = tile_bounds(z, x, y)[0]
+    m_per_px = 156543.03392 * math.cos(math.radians(lat_c)) / 2 ** z
+    radius_px = max(1.0, SCORE_RADIUS_M / m_per_px)
+    # Bins of `b` pixels, so the blur stays within DENSITY_MAX_BINS bins at any zoom
+    b = 1
+    while radius_px / b > DENSITY_MAX_BINS and b < TILE_SIZE:
+        b *= 2
+    size, r = TILE_SIZE // b, max(1, int(round(radius_px / b)))
+
+    padded = size + 2 * r
+    grid = np.zeros(padded * padded)
+    for store, index in incident_layers(dataset):
+        # Only the incidents near the tile, in Web Mercator pixels
+        idx = window_incidents(index, z, x, y, r * b)
+        if len(idx) == 0:
+            continue
+        px = (store.lons[idx] + 180.0) / 360.0 * n - x * TILE_SIZE
+        py = (1 - np.arcsinh(np.tan(np.radians(store.lats[idx]))) / np.pi) / 2 * n - y * TILE_SIZE
+        col = np.floor(px / b).astype(np.int64) + r
+        row = np.floor(py / b).astype(np.int64) + r
+        inside = (col >= 0) & (col < padded) & (row >= 0) & (row < padded)
+        weights = store.type_penalty[store.type_codes[idx[inside]]]
+        grid += np.bincount(row[inside] * padded + col[inside], weights=weights, minlength=padded * padded)
+    if not grid.any():
+        return np.zeros((TILE_SIZE, TILE_SIZE))
+    grid = grid.reshape(padded, padded)
+
+    # Box sum over (2r+1)^2 bins with cumulative sums, then scale the square to the circle's area
+    c = np.zeros((padded + 1, padded + 1))
+    c[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+    k = 2 * r + 1
+    box = c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]
+    risk = box * (math.pi * r * r) / (k * k)
+    return np.repeat(np.repeat(risk, b, axis=0), b, axis=1)
+
+
+def render_tile(layer: str, z: int, x: int, y: int, dataset=None) -> bytes:
+    dataset = dataset or scoring.DATASET
+    extent = data_extent(dataset)
+    if extent is None:
+        return EMPTY_TILE
+    south, west, north, east = tile_bounds(z, x, y)
+    if south > extent[2] or north < extent[0] or west > extent[3] or east < extent[1]:
+        return EMPTY_TILE # Nothing to draw: no scoring work
+    risk = render_safety(z, x, y) if layer == "safety" else render_density(z, x, y, dataset)
+    if not (risk > 0.5).any():
+        return EMPTY_TILE
+    return encode_png(colorize(risk))
+
+
+def tile_version(layer: str) -> str:
+    # Dataset version (without pending incidents) plus everything that changes the pixels
+    dataset = scoring.DATASET
+    parts = [dataset.version if dataset is not None else None, layer, TILE_SAMPLES, RISK_FULL]
+    if layer == "safety":
+        parts += [scoring.SCORING_MODE, kde.KDE_KERNEL, kde.KDE_BANDWIDTH_M]
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+def etag(version: str) -> str:
+    return f'"{version}"'
+
+
+class TileCache:
+    """In-memory LRU in front of an optional on-disk tile directory."""
+
+    def __init__(self, maxsize: int = TILE_CACHE_SIZE, directory: str = TILE_CACHE_DIR,
+                 max_disk_tiles: int = TILE_DISK_MAX_TILES):
+        self.memory = InMemoryCache(maxsize=maxsize, ttl=math.inf)
+        self.directory = directory
+        self.max_disk_tiles = max_disk_tiles
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._disk_tiles = None # Counted on the first write
+        self._written = set() # (version, layer) written by this process; others get pruned
+
+    def _path(self, version, layer, z, x, y):
+        return os.path.join(self.directory, version, layer, str(z), str(x), f"{y}.png")
+
+    def get(self, version, layer, z, x, y):
+        key = f"{version}/{layer}/{z}/{x}/{y}"
+        png = self.memory.get(key)
+        if png is None and self.directory:
+            path = self._path(version, layer, z, x, y)
+            try:
+                with open(path, "rb") as f:
+                    png = f.read()
+                os.utime(path) # mtime is the LRU clock
+            except FileNotFoundError:
+                return None
+            except OSError:
+                pass
+            self.memory.set(key, png)
+        return png
+
+    def put(self, version, layer, z, x, y, png: bytes):
+        self.memory.set(f"{version}/{layer}/{z}/{x}/{y}", png)
+        if self.directory:
+            path = self._path(version, layer, z, x, y)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                if (version, layer) not in self._written:
+                    self._prune_versions(version, layer)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                existed = os.path.exists(path)
+                with open(tmp, "wb") as f:
+                    f.write(png)
+                os.replace(tmp, path)
+            except OSError as e:
+                # e.g. a read-only deployment: keep serving from memory
+                print(f"Tile disk cache disabled ({e}).")
+                self.directory = None
+                return
+            if not existed:
+                self._count_write()
+
+    def _disk_files(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".png"):
+                    yield os.path.join(root, name)
+
+    def _prune_versions(self, version, layer):
+        # A new version of a layer replaces the others: delete their tiles
+        with self._lock:
+            self._written.add((version, layer))
+            for other in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+                if other != version and os.path.isdir(os.path.join(self.directory, other, layer)):
+                    shutil.rmtree(os.path.join(self.directory, other, layer), ignore_errors=True)
+                    try:
+                        os.rmdir(os.path.join(self.directory, other)) # Once no layer is left
+                    except OSError:
+                        pass
+            self._disk_tiles = None # Recount
+
+    def _count_write(self):
+        # Past max_disk_tiles, drop the least recently used tiles down to 90% of it
+        with self._lock:
+            if self._disk_tiles is None:
+                self._disk_tiles = sum(1 for _ in self._disk_files())
+            else:
+                self._disk_tiles += 1
+            if self._disk_tiles <= self.max_disk_tiles:
+                return
+            tiles = []
+            for path in self._disk_files():
+                try:
+                    tiles.append((os.stat(path).st_mtime_ns, path))
+                except OSError:
+                    pass
+            tiles.sort()
+            excess = len(tiles) - int(self.max_disk_tiles * 0.9)
+            for _, path in tiles[:max(excess, 0)]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._disk_tiles = len(tiles) - max(excess, 0)
+
+    def tile(self, layer: str, z: int, x: int, y: int, version: str = None) -> bytes:
+        """Cached tile, rendering (and caching) it on a miss."""
+        version = version or tile_version(layer)
+        png = self.get(version, layer, z, x, y)
+        if png is None:
+            png = render_tile(layer, z, x, y)
+            with self._lock:
+                self.renders += 1
+            self.put(version, layer, z, x, y, png)
+        return png
+
+    def clear_memory(self):
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "renders": self.renders, "directory": self.directory or None,
+                "disk_tiles": self._disk_tiles}
@@ -0,0 +1,77 @@
+"""Cold-start time of the API with and without the binary crime snapshot.
+
+Each run is a fresh interpreter that imports backend.main and loads the
+crime data, like a new serverless instance.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --incidents 1000000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = (
+    "import time; t0 = time.perf_counter(); "
+    "import backend.main; from backend import scoring; "
+    "scoring.load_crime_data({csv!r}); "
+    "print(time.perf_counter() - t0)"
+)
+
+
+def run_once(csv_path, snapshot_path):
+    env = dict(os.environ, CRIME_SNAPSHOT_PATH=snapshot_path, SAFETY_RASTER_PATH="")
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(csv=csv_path)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    wall = time.perf_counter() - t0
+    return float(out.strip().splitlines()[-1]), wall
+
+
+def write_synthetic_csv(n, path):
+    import pandas as pd
+    from benchmarks.synthetic import synthetic_incidents
+    lats, lons = synthetic_incidents(n)
+    pd.DataFrame({
+        "Crime Type": "Theft",
+        "Severity": 3.0,
+        "Latitude": lats,
+        "Longitude": lons,
+        "District": "Central",
+    }).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--csv", default="data/processed_crime.csv")
+    parser.add_argument("--incidents", type=int, help="Benchmark a synthetic CSV of this size instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if args.incidents:
+            csv_path = os.path.join(tmp, "crime.csv")
+            write_synthetic_csv(args.incidents, csv_path)
+        snapshot_path = os.path.join(tmp, "snapshot")
+        subprocess.run(
+            [sys.executable, "-m", "scripts.build_snapshot", "--csv", csv_path, "--out", snapshot_path],
+            check=True, capture_output=True,
+        )
+
+        print(f"{'mode':>10} {'import+load_ms':>15} {'process_ms':>11}")
+        for mode, snap in (("csv", ""), ("snapshot", snapshot_path)):
+            results = [run_once(csv_path, snap) for _ in range(args.runs)]
+            load = statistics.median(r[0] for r in results) * 1000
+            wall = statistics.median(r[1] for r in results) * 1000
+            print(f"{mode:>10} {load:>15.1f} {wall:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
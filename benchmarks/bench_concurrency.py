@@ -0,0 +1,113 @@
+"""Load test of the scoring endpoints per SCORING_EXECUTOR.
+
+Starts the API with uvicorn once per executor and fires a mix of heavy
+`/score/batch` and single-point `/score` requests at a fixed concurrency.
+Inline scoring serializes everything on the event loop, so single points
+wait behind batches; the pools let them overlap and, with more cores,
+run in parallel.
+
+The safety raster is disabled so every request runs the radius query.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_concurrency --incidents 1000000 --concurrency 32 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import numpy as np
+from benchmarks.bench_cold_start import write_synthetic_csv
+from benchmarks.synthetic import synthetic_queries
+
+
+def start_server(port, executor, workers, csv_path, snapshot_path, **extra_env):
+    env = dict(
+        os.environ, SCORING_EXECUTOR=executor, SCORING_WORKERS=str(workers),
+        CRIME_DATA_PATH=csv_path, CRIME_SNAPSHOT_PATH=snapshot_path, SAFETY_RASTER_PATH="", **extra_env,
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/score", params={"lat": 28.6, "lon": 77.2}, timeout=5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def load(base_url, requests, concurrency, batch_points, batch_share):
+    lats, lons = synthetic_queries(max(batch_points, 1000), seed=5)
+    batch = [{"lat": float(a), "lon": float(b)} for a, b in zip(lats[:batch_points], lons[:batch_points])]
+    rng = random.Random(1)
+    kinds = ["batch" if rng.random() < batch_share else "single" for _ in range(requests)]
+    latencies = {"batch": [], "single": []}
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(i, kind):
+            async with sem:
+                t0 = time.perf_counter()
+                if kind == "batch":
+                    r = await client.post("/score/batch", json={"points": batch})
+                else:
+                    r = await client.get("/score", params={"lat": float(lats[i % len(lats)]), "lon": float(lons[i % len(lons)])})
+                r.raise_for_status()
+                latencies[kind].append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i, k) for i, k in enumerate(kinds)))
+        elapsed = time.perf_counter() - t0
+    return requests / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--executors", nargs="+", default=["inline", "thread", "process"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--incidents", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-points", type=int, default=500)
+    parser.add_argument("--batch-share", type=float, default=0.2, help="Fraction of requests that are batches")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "crime.csv")
+        snapshot_path = os.path.join(tmp, "snapshot")
+        write_synthetic_csv(args.incidents, csv_path)
+        subprocess.run(
+            [sys.executable, "-m", "scripts.build_snapshot", "--csv", csv_path, "--out", snapshot_path],
+            check=True, capture_output=True,
+        )
+
+        print(f"{args.incidents} incidents, {args.workers} workers, {os.cpu_count()} CPUs, "
+              f"concurrency {args.concurrency}, {args.batch_share:.0%} batches of {args.batch_points} points")
+        print(f"{'executor':>9} {'req/s':>7} {'single p50':>11} {'single p99':>11} {'batch p50':>10} {'batch p99':>10}")
+        for executor in args.executors:
+            proc = start_server(args.port, executor, args.workers, csv_path, snapshot_path)
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                asyncio.run(load(base_url, 50, args.concurrency, args.batch_points, args.batch_share)) # warm-up
+                rate, lat = asyncio.run(load(base_url, args.requests, args.concurrency, args.batch_points, args.batch_share))
+            finally:
+                proc.terminate()
+                proc.wait()
+            single, batch = np.array(lat["single"]), np.array(lat["batch"])
+            print(f"{executor:>9} {rate:>7.0f} {np.percentile(single, 50):>11.1f} {np.percentile(single, 99):>11.1f} "
+                  f"{np.percentile(batch, 50):>10.1f} {np.percentile(batch, 99):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
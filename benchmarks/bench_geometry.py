@@ -0,0 +1,68 @@
+"""Payload size and serialization time of /route geometry formats.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_geometry --points 5000
+"""
+import argparse
+import time
+from typing import List
+from pydantic import TypeAdapter
+from backend import schemas
+from backend.geometry import encode_geometry
+from backend.serialization import dumps
+from benchmarks.fake_osrm import canned_routes
+
+FORMATS = [
+    ("geojson", None),
+    ("geojson", 15),
+    ("geojson", 12),
+    ("polyline6", None),
+    ("polyline5", None),
+    ("polyline5", 15),
+    ("polyline5", 12),
+]
+
+
+def build(routes, fmt, zoom):
+    return [{
+        "geometry": encode_geometry(r["geometry"], fmt, zoom),
+        "safety_score": 90.0,
+        "duration_seconds": r["duration"],
+        "distance_meters": r["distance"],
+        "warnings": [],
+        "description": "Safety Score: 90.0/100. ",
+        "analysis": [],
+    } for r in routes]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=5000, help="Coordinates per route")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    routes = canned_routes(77.05, 28.50, 77.30, 28.80, args.points)
+    adapter = TypeAdapter(List[schemas.RouteResponse])
+
+    print(f"{'format':>10} {'zoom':>5} {'bytes':>9} {'encode_ms':>10} {'pydantic_ms':>12} {'fast_ms':>8}")
+    for fmt, zoom in FORMATS:
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            built = build(routes, fmt, zoom)
+        encode_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+
+        # Legacy path: pydantic models, validated and re-encoded by FastAPI
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            adapter.dump_json(adapter.validate_python(built))
+        pydantic_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+
+        # Opt-in path: plain dicts, one encoder pass
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            body = dumps(built)
+        fast_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+        print(f"{fmt:>10} {str(zoom):>5} {len(body):>9} {encode_ms:>10.2f} {pydantic_ms:>12.3f} {fast_ms:>8.3f}")
+
+if __name__ == "__main__":
+    main()
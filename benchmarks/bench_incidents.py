@@ -0,0 +1,82 @@
+"""Cost of incremental incident ingestion (backend/incidents.py).
+
+Loads a synthetic base dataset, then grows the pending delta step by step
+and reports, per delta size: batch and single-point scoring time, the
+delta index rebuild that the first read after a write pays, and the time
+to append 1000 incidents (log write included). Ends with the compaction
+time and the scoring time once the delta is merged.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_incidents --incidents 1000000 --deltas 0 1000 5000 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from backend import assets, incidents, scoring
+from benchmarks.synthetic import synthetic_crime_frame, synthetic_queries
+
+
+def per_call_ms(fn, number: int) -> float:
+    fn() # warm-up
+    t0 = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - t0) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incidents", type=int, default=200_000)
+    parser.add_argument("--deltas", type=int, nargs="+", default=[0, 1000, 5000, 20000])
+    parser.add_argument("--points", type=int, default=1000, help="Points per batch scoring call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "crime.csv")
+        synthetic_crime_frame(args.incidents, seed=42).to_csv(csv_path, index=False)
+        scoring.SNAPSHOT_PATH = scoring.RASTER_PATH = None
+        assets.LIGHTS_PATH = assets.POLICE_STATIONS_PATH = ""
+        incidents.INCIDENT_LOG_PATH = os.path.join(tmp, "incidents.ndjson")
+        incidents.INCIDENT_MAX_DELTA = max(args.deltas) + 1000
+        scoring.load_crime_data(csv_path)
+
+        lats, lons = synthetic_queries(args.points, seed=5)
+        new_lats, new_lons = synthetic_queries(max(args.deltas) + 1000, seed=7)
+        records = [
+            incidents.validate({"lat": float(a), "lon": float(b), "crime_type": "Theft",
+                                "date_time": "2024-01-01T21:00:00"})
+            for a, b in zip(new_lats, new_lons)
+        ]
+
+        print(f"{args.incidents} base incidents, {args.points}-point batches")
+        print(f"{'pending':>8} {'batch ms':>9} {'1 pt us':>8} {'rebuild ms':>11} {'append 1000 ms':>15}")
+        added = 0
+        for size in sorted(args.deltas):
+            if size > added:
+                scoring.add_incidents(records[added:size])
+                added = size
+            delta = scoring.DATASET.delta
+
+            def rebuild():
+                delta._layer = None
+                delta.layer()
+
+            batch_ms = per_call_ms(lambda: scoring.score_values(lats, lons), 10)
+            point_us = per_call_ms(lambda: scoring.score_points([lats[0]], [lons[0]]), 200) * 1000
+            rebuild_ms = per_call_ms(rebuild, 5)
+            pending = len(delta)
+            t0 = time.perf_counter()
+            scoring.add_incidents(records[added:added + 1000])
+            append_ms = (time.perf_counter() - t0) * 1000
+            added += 1000
+            print(f"{pending:>8} {batch_ms:>9.1f} {point_us:>8.0f} {rebuild_ms:>11.1f} {append_ms:>15.1f}")
+
+        t0 = time.perf_counter()
+        merged = scoring.compact_incidents()
+        print(f"Compacted {merged} incidents in {(time.perf_counter() - t0) * 1000:.0f} ms; "
+              f"batch scoring now {per_call_ms(lambda: scoring.score_values(lats, lons), 10):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
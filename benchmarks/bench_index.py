@@ -0,0 +1,68 @@
+"""Radius-query latency of the spatial index backends.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_index --sizes 10000 1000000 10000000
+"""
+import argparse
+import time
+import numpy as np
+from backend.scoring import haversine_distance
+from backend.spatial import build_index, INDEX_TYPES
+from benchmarks.synthetic import synthetic_incidents, synthetic_queries
+
+
+def time_queries(index, q_lats, q_lons, radius):
+    samples = []
+    found = 0
+    for lat, lon in zip(q_lats, q_lons):
+        t0 = time.perf_counter()
+        found += len(index.query_radius(lat, lon, radius))
+        samples.append(time.perf_counter() - t0)
+    samples = np.array(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+        "avg_hits": found / len(q_lats),
+    }
+
+
+def time_python_scan(lats, lons, q_lats, q_lons, radius):
+    # The original dict-list scan from calculate_safety_score
+    rows = [{"Latitude": a, "Longitude": b} for a, b in zip(lats.tolist(), lons.tolist())]
+    t0 = time.perf_counter()
+    for lat, lon in zip(q_lats, q_lons):
+        [c for c in rows if haversine_distance(lat, lon, c["Latitude"], c["Longitude"]) <= radius]
+    return (time.perf_counter() - t0) * 1000 / len(q_lats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=500)
+    parser.add_argument("--kinds", nargs="+", default=sorted(INDEX_TYPES))
+    args = parser.parse_args()
+
+    q_lats, q_lons = synthetic_queries(args.queries)
+
+    print(f"{'incidents':>10} {'index':>8} {'build_s':>8} {'p50_ms':>8} {'p99_ms':>8} {'avg_hits':>9}")
+    for n in args.sizes:
+        lats, lons = synthetic_incidents(n)
+        if n <= 20_000:
+            ms = time_python_scan(lats, lons, q_lats[:20], q_lons[:20], args.radius)
+            print(f"{n:>10} {'python':>8} {0:>8.2f} {ms:>8.3f} {'-':>8} {'-':>9}")
+
+        for kind in args.kinds:
+            t0 = time.perf_counter()
+            index = build_index(lats, lons, kind=kind)
+            build_s = time.perf_counter() - t0
+            # Linear scans get slow at scale, keep their sample small
+            nq = args.queries if kind != "linear" or n <= 100_000 else 10
+            r = time_queries(index, q_lats[:nq], q_lons[:nq], args.radius)
+            print(f"{n:>10} {kind:>8} {build_s:>8.2f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['avg_hits']:>9.1f}")
+            del index
+
+
+if __name__ == "__main__":
+    main()
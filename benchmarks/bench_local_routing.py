@@ -0,0 +1,51 @@
+"""Query latency of the in-process routing engine.
+
+Uses a real graph when given (`--graph data/road_graph.npz`, built by
+scripts/build_road_graph.py from a Delhi extract), otherwise a synthetic
+city-sized grid.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_local_routing --queries 50
+    python -m benchmarks.bench_local_routing --graph data/road_graph.npz
+"""
+import argparse
+import time
+import numpy as np
+from backend import scoring
+from backend.graph import RoadGraph
+from benchmarks.synthetic import synthetic_road_graph
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--graph")
+    parser.add_argument("--size", type=int, default=400, help="Synthetic grid side length")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--weights", type=float, nargs="+", default=[0.0, 2.0, 8.0])
+    args = parser.parse_args()
+
+    scoring.load_crime_data()
+    t0 = time.perf_counter()
+    graph = RoadGraph.load(args.graph) if args.graph else synthetic_road_graph(args.size, args.size)
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    graph.set_edge_risk(scoring.score_values)
+    risk_s = time.perf_counter() - t0
+    print(f"Graph: {graph.num_nodes} nodes, {graph.num_edges} edges "
+          f"(load {load_s:.2f}s, edge safety {risk_s:.2f}s)")
+
+    rng = np.random.default_rng(5)
+    pairs = rng.integers(0, graph.num_nodes, size=(args.queries, 2))
+    for weight in args.weights:
+        graph.edge_costs(weight) # warm the per-weight cost list
+        samples = []
+        for a, b in pairs:
+            t0 = time.perf_counter()
+            graph.shortest_path(int(a), int(b), weight)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"safety_weight={weight:<4} p50 {np.percentile(samples, 50):8.1f} ms   "
+              f"p95 {np.percentile(samples, 95):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Throughput of per-request httpx clients vs. the pooled OSRMClient.
+
+Runs against the local OSRM stand-in (benchmarks/fake_osrm.py), so numbers
+reflect client overhead and coalescing rather than the public server.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_osrm_client --requests 500 --concurrency 50 --distinct 20
+"""
+import argparse
+import asyncio
+import random
+import time
+import httpx
+from backend.routing import OSRMClient
+from benchmarks.fake_osrm import serve_in_thread
+
+
+def make_trips(n, distinct, seed=3):
+    rng = random.Random(seed)
+    pool = [
+        (28.55 + rng.random() * 0.15, 77.10 + rng.random() * 0.2, 28.55 + rng.random() * 0.15, 77.10 + rng.random() * 0.2)
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(n)]
+
+
+async def per_request_client(base_url, trip):
+    # The original get_safe_route pattern: a new client per call
+    a_lat, a_lon, b_lat, b_lon = trip
+    url = f"{base_url}/route/v1/driving/{a_lon},{a_lat};{b_lon},{b_lat}?alternatives=true&steps=false&geometries=geojson&overview=full"
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url)
+        return response.json()
+
+
+async def run(trips, concurrency, fetch):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(trip):
+        async with sem:
+            await fetch(trip)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in trips))
+    return time.perf_counter() - t0
+
+
+async def main_async(args):
+    server, app = serve_in_thread(args.port, args.latency_ms)
+    base_url = f"http://127.0.0.1:{args.port}"
+    trips = make_trips(args.requests, args.distinct)
+
+    try:
+        app.state.calls = 0
+        elapsed = await run(trips, args.concurrency, lambda t: per_request_client(base_url, t))
+        print(f"per-request client : {len(trips) / elapsed:8.1f} req/s  upstream calls={app.state.calls}")
+
+        app.state.calls = 0
+        client = OSRMClient(base_url=base_url, max_concurrency=args.concurrency, max_connections=args.concurrency)
+        elapsed = await run(trips, args.concurrency, lambda t: client.route(*t))
+        await client.aclose()
+        print(f"pooled OSRMClient  : {len(trips) / elapsed:8.1f} req/s  upstream calls={app.state.calls}  stats={client.stats}")
+    finally:
+        server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--distinct", type=int, default=50, help="Distinct origin/destination pairs")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--port", type=int, default=5099)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
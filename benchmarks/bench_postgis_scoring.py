@@ -0,0 +1,62 @@
+"""Batch scoring latency: in-memory engine vs. PostGIS (text and prepared).
+
+Needs the docker-compose PostGIS with crime_incidents loaded from the same
+CSV the in-memory engine reads, e.g.:
+    docker compose up -d db
+    python -m etl.ingest_crime --csv data/processed_crime.csv
+
+Usage (from the repo root):
+    python -m benchmarks.bench_postgis_scoring --batches 1 10 100 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from backend import scoring, postgis_scoring
+from backend.database import get_engine
+from benchmarks.synthetic import synthetic_queries
+
+
+async def timed_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(times))
+
+
+async def main_async(args):
+    scoring.load_crime_data(args.csv)
+    await postgis_scoring.ensure_indexes()
+    lats, lons = synthetic_queries(max(args.batches), seed=3)
+
+    # Same incidents on both sides, otherwise the latency comparison is moot
+    check = min(200, len(lats))
+    memory = scoring.score_points(lats[:check], lons[:check])
+    db = await postgis_scoring.score_points(lats[:check], lons[:check], mode="prepared")
+    mismatches = sum(abs(a["score"] - b["score"]) > 1e-6 for a, b in zip(memory, db))
+    print(f"Agreement on {check} points: {check - mismatches}/{check} identical scores")
+
+    async def memory_batch(n):
+        return scoring.score_points(lats[:n], lons[:n])
+
+    print(f"{'batch':>6} {'memory ms':>10} {'text ms':>9} {'prepared ms':>12}")
+    for n in args.batches:
+        row = [await timed_ms(lambda: memory_batch(n), args.repeat)]
+        for mode in postgis_scoring.QUERY_MODES[::-1]:
+            row.append(await timed_ms(lambda: postgis_scoring.score_points(lats[:n], lons[:n], mode=mode), args.repeat))
+        print(f"{n:>6} {row[0]:>10.2f} {row[1]:>9.2f} {row[2]:>12.2f}")
+    await get_engine().dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="data/processed_crime.csv")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
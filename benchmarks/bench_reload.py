@@ -0,0 +1,56 @@
+"""Hot reload cost: reload time, peak RSS and event-loop stalls while reloading.
+
+A ticker coroutine measures how late the event loop wakes it up during
+`reloader.reload_crime_data`; a request would see at most that extra delay.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_reload --sizes 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import numpy as np
+from backend import scoring, reloader
+from benchmarks.bench_store import make_frame
+
+TICK_S = 0.001
+
+
+async def ticker(lags, stop):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append((time.perf_counter() - t0 - TICK_S) * 1000)
+
+
+async def timed_reload(path):
+    lags, stop = [], asyncio.Event()
+    task = asyncio.create_task(ticker(lags, stop))
+    stats = await reloader.reload_crime_data(path)
+    stop.set()
+    await task
+    return stats, lags
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    # CSV path only: measures the slowest reload
+    scoring.SNAPSHOT_PATH = None
+    scoring.RASTER_PATH = None
+    print(f"{'incidents':>10} {'reload ms':>10} {'max RSS MB':>11} {'loop lag p50 ms':>16} {'max ms':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"crime_{n}.csv")
+            make_frame(n).to_csv(path, index=False)
+            stats, lags = asyncio.run(timed_reload(path))
+            print(f"{n:>10} {stats['reload_ms']:>10.0f} {stats['max_rss_mb']:>11.0f} "
+                  f"{float(np.median(lags)):>16.2f} {max(lags):>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Accuracy vs. latency of route scoring: coordinate sampling vs. continuous.
+
+For random routes of several lengths, compares the original
+`coordinates[::step]` sampling and the continuous (densified, length-weighted)
+score at several intervals against a 5 m reference integral.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_route_scoring --routes 30 --intervals 10 25 50 100 250
+    python -m benchmarks.bench_route_scoring --incidents 200000   # denser synthetic data
+"""
+import argparse
+import time
+import numpy as np
+from backend import scoring
+from backend.geometry import densify
+from backend.main import sample_route_points
+from backend.spatial import build_index
+from backend.store import CrimeStore
+from benchmarks.fake_osrm import canned_routes
+from benchmarks.synthetic import synthetic_queries
+
+REFERENCE_INTERVAL_M = 5
+VERTEX_SPACING_M = 20 # Roughly OSRM's overview=full noding in a city
+
+
+def make_routes(n, length_km, seed=9):
+    # Bowed lines from random Delhi origins, noded like OSRM geometries
+    rng = np.random.default_rng(seed)
+    lats, lons = synthetic_queries(n, seed=seed)
+    bearings = rng.uniform(0, 2 * np.pi, n)
+    dlat = length_km / 111.0
+    routes = []
+    for lat, lon, b in zip(lats, lons, bearings):
+        end_lat = lat + dlat * np.cos(b)
+        end_lon = lon + dlat * np.sin(b) / np.cos(np.radians(lat))
+        points = max(2, int(length_km * 1000 / VERTEX_SPACING_M))
+        route = canned_routes(lon, lat, end_lon, end_lat, points)[1]
+        routes.append(route["geometry"]["coordinates"])
+    return routes
+
+
+def continuous_score(coords, interval, max_points=None):
+    lats, lons, _ = densify(coords, interval, max_points)
+    return float(scoring.score_values(lats, lons).mean())
+
+
+def sampled_score(coords):
+    pts = np.asarray(sample_route_points(coords))
+    return float(scoring.score_values(pts[:, 1], pts[:, 0]).mean())
+
+
+def timed(fn, routes):
+    t0 = time.perf_counter()
+    values = np.array([fn(r) for r in routes])
+    return values, (time.perf_counter() - t0) * 1000 / len(routes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=30, help="Routes per length")
+    parser.add_argument("--lengths-km", type=float, nargs="+", default=[0.4, 4, 40])
+    parser.add_argument("--intervals", type=float, nargs="+", default=[10, 25, 50, 100, 250])
+    parser.add_argument("--max-samples", type=int, default=1000)
+    parser.add_argument("--incidents", type=int, help="Use N synthetic incidents instead of the CSV")
+    args = parser.parse_args()
+
+    if args.incidents:
+        from benchmarks.bench_store import make_frame
+        store = CrimeStore.from_dataframe(make_frame(args.incidents))
+        scoring.set_dataset(scoring.CrimeDataset(store, build_index(store.lats, store.lons, kind=scoring.INDEX_KIND), None))
+    else:
+        scoring.load_crime_data()
+    print(f"{len(scoring.DATASET.store)} incidents, {scoring.INDEX_KIND} index, "
+          f"raster={'on' if scoring.DATASET.raster is not None else 'off'}")
+
+    print(f"{'length':>8} {'method':>18} {'mean |err|':>11} {'max |err|':>10} {'ms/route':>9}")
+    for length in args.lengths_km:
+        routes = make_routes(args.routes, length)
+        reference, _ = timed(lambda c: continuous_score(c, REFERENCE_INTERVAL_M), routes)
+
+        methods = [("sampled [::step]", sampled_score)]
+        methods += [(f"continuous {i:g} m", lambda c, i=i: continuous_score(c, i)) for i in args.intervals]
+        methods += [(f"capped {args.max_samples}", lambda c: continuous_score(c, args.intervals[0], args.max_samples))]
+        for name, fn in methods:
+            values, ms = timed(fn, routes)
+            err = np.abs(values - reference)
+            print(f"{length:>6g}km {name:>18} {err.mean():>11.2f} {err.max():>10.2f} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Time-to-first-route of POST /route/stream vs. POST /route.
+
+/route answers once every alternative is scored and sorted; the stream
+writes each alternative as soon as its own scoring finishes. Both run
+against uvicorn with OSRM replaced by the local stand-in
+(benchmarks/fake_osrm.py) and the route cache off, at a fixed number of
+concurrent clients. Reported per scoring mode: /route latency, the
+stream's first route and its final ranking line (p50 / p95, ms), and how
+many alternatives fell back to the coarse score.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_route_stream --incidents 1000000 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import httpx
+import numpy as np
+from benchmarks.bench_concurrency import start_server
+from benchmarks.fake_osrm import serve_in_thread
+from benchmarks.suite import ROUTE_VERTICES, trip_pool
+from benchmarks.synthetic import synthetic_crime_frame
+
+
+async def run(base_url, trips, scoring_mode, concurrency):
+    timings = {"route": [], "first": [], "ranking": []}
+    coarse = 0
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(trip):
+            nonlocal coarse
+            body = dict(zip(("start_lat", "start_lon", "end_lat", "end_lon"), trip), scoring=scoring_mode)
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.post("/route", json=body)
+                r.raise_for_status()
+                timings["route"].append((time.perf_counter() - t0) * 1000)
+
+                t0 = time.perf_counter()
+                first = None
+                async with client.stream("POST", "/route/stream", json=body) as r:
+                    r.raise_for_status()
+                    async for line in r.aiter_lines():
+                        message = json.loads(line)
+                        if message["type"] == "ranking":
+                            timings["ranking"].append((time.perf_counter() - t0) * 1000)
+                            coarse += len(message["coarse"])
+                        elif first is None:
+                            first = (time.perf_counter() - t0) * 1000
+                timings["first"].append(first)
+
+        await asyncio.gather(*(one(trip) for trip in trips))
+    return timings, coarse
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incidents", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=100, help="Trips per scoring mode")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scoring", nargs="+", choices=["sampled", "continuous"], default=["sampled", "continuous"])
+    parser.add_argument("--executor", default="thread")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--osrm-latency-ms", type=float, default=0)
+    parser.add_argument("--budget-ms", type=float, default=1000, help="ROUTE_STREAM_BUDGET_MS for the server")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--osrm-port", type=int, default=5012)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "crime.csv")
+        synthetic_crime_frame(args.incidents, seed=42).to_csv(csv_path, index=False)
+        osrm_server, _ = serve_in_thread(args.osrm_port, args.osrm_latency_ms, ROUTE_VERTICES)
+        proc = start_server(
+            args.port, args.executor, args.workers, csv_path, "",
+            OSRM_URL=f"http://127.0.0.1:{args.osrm_port}", ROUTE_CACHE_BACKEND="off",
+            LIGHTS_PATH="", POLICE_STATIONS_PATH="", ROUTE_STREAM_BUDGET_MS=str(args.budget_ms),
+        )
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            trips = trip_pool(args.requests)
+            print(f"{args.incidents} incidents, {args.requests} trips, concurrency {args.concurrency}, "
+                  f"executor {args.executor}, budget {args.budget_ms:g} ms")
+            print(f"{'scoring':>10} {'/route p50':>11} {'p95':>7} {'first p50':>10} {'p95':>7} "
+                  f"{'ranking p50':>12} {'p95':>7} {'coarse':>7}")
+            for scoring_mode in args.scoring:
+                asyncio.run(run(base_url, trips[:10], scoring_mode, args.concurrency)) # warm-up
+                timings, coarse = asyncio.run(run(base_url, trips, scoring_mode, args.concurrency))
+                row = [np.percentile(timings[k], q) for k in ("route", "first", "ranking") for q in (50, 95)]
+                print(f"{scoring_mode:>10} {row[0]:>11.1f} {row[1]:>7.1f} {row[2]:>10.1f} {row[3]:>7.1f} "
+                      f"{row[4]:>12.1f} {row[5]:>7.1f} {coarse:>7}")
+        finally:
+            proc.terminate()
+            proc.wait()
+            osrm_server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Memory footprint and per-query cost: list of dicts vs. columnar CrimeStore.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_store --sizes 10000 100000
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from backend.scoring import haversine_distance
+from backend.spatial import build_index, haversine_np
+from backend.store import CrimeStore, crime_type_penalty
+from benchmarks.synthetic import synthetic_incidents, synthetic_queries
+
+CRIME_TYPES = ['Murder', 'Rape', 'Robbery', 'Theft', 'Assault on Women with intent to outrage her Modesty']
+
+
+def make_frame(n):
+    lats, lons = synthetic_incidents(n)
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "Crime Type": rng.choice(CRIME_TYPES, size=n),
+        "Severity": rng.choice([3.0, 7.0, 8.0, 10.0], size=n),
+        "Latitude": lats,
+        "Longitude": lons,
+        "District": rng.choice(["Central", "South", "East"], size=n),
+    })
+
+
+def measure(build):
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def dict_score(records, lat, lon, radius):
+    # Original calculate_safety_score body
+    penalty = 0
+    for c in records:
+        if haversine_distance(lat, lon, c['Latitude'], c['Longitude']) <= radius:
+            penalty += crime_type_penalty(c.get('Crime Type', 'Unknown'))
+    return penalty
+
+
+def store_score(store, index, lat, lon, radius):
+    idx = index.query_radius(lat, lon, radius)
+    return float(store.penalties(idx).sum())
+
+
+def store_scan_score(store, lat, lon, radius):
+    # Columnar data without an index: one vectorized pass
+    mask = haversine_np(lat, lon, store.lats, store.lons) <= radius
+    return float(store.type_penalty[store.type_codes[mask]].sum())
+
+
+def per_query_ms(fn, q_lats, q_lons):
+    t0 = time.perf_counter()
+    for lat, lon in zip(q_lats, q_lons):
+        fn(lat, lon)
+    return (time.perf_counter() - t0) * 1000 / len(q_lats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--radius", type=float, default=500)
+    args = parser.parse_args()
+    q_lats, q_lons = synthetic_queries(args.queries)
+
+    for n in args.sizes:
+        df = make_frame(n)
+        records, dict_bytes = measure(lambda: df.to_dict('records'))
+        store, store_bytes = measure(lambda: CrimeStore.from_dataframe(df))
+        index = build_index(store.lats, store.lons, kind="grid")
+
+        print(f"\n{n} incidents")
+        print(f"  dict records : {dict_bytes / n:8.1f} B/incident  ({dict_bytes / 1e6:.1f} MB)")
+        print(f"  CrimeStore   : {store.nbytes / n:8.1f} B/incident  ({store_bytes / 1e6:.1f} MB traced)")
+
+        ms = per_query_ms(lambda a, b: dict_score(records, a, b, args.radius), q_lats[:5], q_lons[:5])
+        print(f"  dict scan    : {ms:8.3f} ms/query")
+        ms = per_query_ms(lambda a, b: store_scan_score(store, a, b, args.radius), q_lats, q_lons)
+        print(f"  store scan   : {ms:8.3f} ms/query")
+        ms = per_query_ms(lambda a, b: store_score(store, index, a, b, args.radius), q_lats, q_lons)
+        print(f"  store + grid : {ms:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
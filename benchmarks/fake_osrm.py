@@ -0,0 +1,79 @@
+"""Local stand-in for the OSRM HTTP API.
+
+Serves `/route/v1/{profile}/{lon,lat;lon,lat}` with canned alternatives
+(a straight line and two bowed detours) after a configurable delay, so
+routing can be benchmarked without the public demo server.
+
+Usage (from the repo root):
+    python -m benchmarks.fake_osrm --port 5001 --latency-ms 30
+    OSRM_URL=http://127.0.0.1:5001 uvicorn backend.main:app
+"""
+import argparse
+import asyncio
+import threading
+import time
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from backend.spatial import haversine_np
+
+# Perpendicular offset of each alternative's midpoint, as a fraction of its length
+ALTERNATIVE_BOWS = (0.0, 0.15, -0.25)
+SPEED_M_S = 8.0
+
+
+def canned_routes(start_lon, start_lat, end_lon, end_lat, points: int = 200):
+    t = np.linspace(0.0, 1.0, points)
+    dlon, dlat = end_lon - start_lon, end_lat - start_lat
+    routes = []
+    for bow in ALTERNATIVE_BOWS:
+        offset = bow * np.sin(np.pi * t)
+        lons = start_lon + dlon * t - dlat * offset
+        lats = start_lat + dlat * t + dlon * offset
+        distance = float(haversine_np(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+        routes.append({
+            "geometry": {"type": "LineString", "coordinates": np.column_stack((lons, lats)).round(6).tolist()},
+            "distance": distance,
+            "duration": distance / SPEED_M_S,
+        })
+    return routes
+
+
+def create_app(latency_ms: float = 0.0, points: int = 200):
+    async def route(request):
+        app.state.calls += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        try:
+            (a_lon, a_lat), (b_lon, b_lat) = [
+                map(float, pair.split(",")) for pair in request.path_params["coords"].split(";")
+            ]
+        except ValueError:
+            return JSONResponse({"code": "InvalidQuery", "message": "Bad coordinates"}, status_code=400)
+        return JSONResponse({"code": "Ok", "routes": canned_routes(a_lon, a_lat, b_lon, b_lat, points)})
+
+    app = Starlette(routes=[Route("/route/v1/{profile}/{coords}", route)])
+    app.state.calls = 0
+    return app
+
+
+def serve_in_thread(port: int, latency_ms: float = 0.0, points: int = 200):
+    """Start the stand-in on 127.0.0.1:`port`; returns (server, app)."""
+    import uvicorn
+    app = create_app(latency_ms, points)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--points", type=int, default=200)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.points), host="127.0.0.1", port=args.port, log_level="warning")
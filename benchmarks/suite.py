@@ -0,0 +1,279 @@
+"""Reproducible benchmark and load-test suite.
+
+Generates a synthetic city-scale crime CSV (district scatter, crime type mix
+and timestamps; fixed seeds), then:
+
+  micro   per-call time of haversine_distance, calculate_safety_score,
+          score_points on a 1000-point batch, and sampled / continuous
+          scoring of three 5 km route alternatives (in-process, exact
+          radius queries: no raster, snapshot or asset layers)
+  load    req/s and p50/p95/p99 of GET /score and POST /route against
+          uvicorn, with OSRM replaced by the local stand-in
+          (benchmarks/fake_osrm.py) and the route cache off
+
+Results are written as JSON (metadata + one entry per benchmark) so runs
+can be compared; `--compare` prints the change per metric and exits 1
+when any metric regressed by more than `--threshold`.
+
+Usage (from the repo root):
+    python -m benchmarks.suite --incidents 1000000
+    python -m benchmarks.suite --quick --out /tmp/head.json
+    python -m benchmarks.suite --compare benchmarks/results/base.json /tmp/head.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import httpx
+import numpy as np
+from benchmarks.bench_concurrency import start_server
+from benchmarks.fake_osrm import canned_routes, serve_in_thread
+from benchmarks.synthetic import synthetic_crime_frame, synthetic_queries
+
+RESULTS_DIR = "benchmarks/results"
+ROUTE_LENGTH_KM = 5.0
+ROUTE_VERTICES = 250 # ~20 m noding, like OSRM overview=full
+
+
+def time_calls(fn, number: int, repeat: int = 5) -> dict:
+    # Per-call time over `repeat` rounds of `number` calls; the median round is the headline
+    fn() # warm-up
+    rounds = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - t0) / number * 1e6)
+    return {"median_us": round(float(np.median(rounds)), 3), "min_us": round(float(np.min(rounds)), 3),
+            "calls": number * repeat}
+
+
+def latency_stats(latencies_ms: list, elapsed_s: float, errors: int) -> dict:
+    lat = np.array(latencies_ms)
+    return {
+        "rps": round(len(lat) / elapsed_s, 1),
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        "requests": len(lat),
+        "errors": errors,
+    }
+
+
+def trip_pool(n: int, seed: int = 3):
+    # (start_lat, start_lon, end_lat, end_lon) pairs ROUTE_LENGTH_KM apart
+    rng = np.random.default_rng(seed)
+    lats, lons = synthetic_queries(n, seed=seed)
+    bearings = rng.uniform(0, 2 * np.pi, n)
+    dlat = ROUTE_LENGTH_KM / 111.0
+    return [
+        (float(a), float(b), float(a + dlat * np.cos(t)), float(b + dlat * np.sin(t) / np.cos(np.radians(a))))
+        for a, b, t in zip(lats, lons, bearings)
+    ]
+
+
+def run_micro(args) -> dict:
+    from backend import scoring
+    from backend.main import continuous_route_scores, sample_route_points
+
+    loop = asyncio.new_event_loop()
+    try:
+        lats, lons = synthetic_queries(1000, seed=5)
+        a_lat, a_lon, b_lat, b_lon = trip_pool(1)[0]
+        routes = canned_routes(a_lon, a_lat, b_lon, b_lat, ROUTE_VERTICES)
+        i = iter(range(10 ** 9))
+
+        def one_point():
+            k = next(i) % len(lats)
+            loop.run_until_complete(scoring.calculate_safety_score(float(lats[k]), float(lons[k])))
+
+        def sampled_route():
+            samples = [sample_route_points(r["geometry"]["coordinates"]) for r in routes]
+            flat = [pt for pts in samples for pt in pts]
+            loop.run_until_complete(scoring.ascore_points([p[1] for p in flat], [p[0] for p in flat]))
+
+        n = args.micro_number
+        return {
+            "micro.haversine_distance": time_calls(
+                lambda: scoring.haversine_distance(28.6139, 77.2090, 28.6453, 77.2373), n * 10),
+            "micro.calculate_safety_score": time_calls(one_point, n),
+            "micro.score_points_1000": time_calls(lambda: scoring.score_points(lats, lons), max(1, n // 100)),
+            "micro.route_sampled": time_calls(sampled_route, max(1, n // 10)),
+            "micro.route_continuous": time_calls(
+                lambda: loop.run_until_complete(continuous_route_scores(routes)), max(1, n // 100)),
+        }
+    finally:
+        loop.close()
+
+
+async def load(base_url: str, make_request, requests: int, concurrency: int):
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(k):
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    r = await make_request(client, k)
+                    r.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    return
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(k) for k in range(requests)))
+    return latency_stats(latencies, time.perf_counter() - t0, errors)
+
+
+def run_load(args, csv_path: str) -> dict:
+    osrm_server, _ = serve_in_thread(args.osrm_port, args.osrm_latency_ms, ROUTE_VERTICES)
+    proc = start_server(
+        args.port, args.executor, args.workers, csv_path, "",
+        OSRM_URL=f"http://127.0.0.1:{args.osrm_port}", ROUTE_CACHE_BACKEND="off",
+        LIGHTS_PATH="", POLICE_STATIONS_PATH="",
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    lats, lons = synthetic_queries(1000, seed=5)
+    trips = trip_pool(args.distinct_trips)
+    rng = random.Random(1)
+    order = [rng.randrange(len(trips)) for _ in range(args.requests)]
+
+    def score(client, k):
+        return client.get("/score", params={"lat": float(lats[k % len(lats)]), "lon": float(lons[k % len(lons)])})
+
+    def route(client, k):
+        a_lat, a_lon, b_lat, b_lon = trips[order[k % len(order)]]
+        return client.post("/route", json={"start_lat": a_lat, "start_lon": a_lon, "end_lat": b_lat,
+                                           "end_lon": b_lon, "scoring": args.route_scoring})
+
+    try:
+        results = {}
+        for name, make_request in (("load.score", score), ("load.route", route)):
+            asyncio.run(load(base_url, make_request, min(50, args.requests), args.concurrency)) # warm-up
+            results[name] = asyncio.run(load(base_url, make_request, args.requests, args.concurrency))
+        return results
+    finally:
+        proc.terminate()
+        proc.wait()
+        osrm_server.should_exit = True
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(args) -> dict:
+    from backend import scoring
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "crime.csv")
+        t0 = time.perf_counter()
+        synthetic_crime_frame(args.incidents, seed=args.seed).to_csv(csv_path, index=False)
+        print(f"Generated {args.incidents} synthetic incidents in {time.perf_counter() - t0:.1f}s")
+
+        if "micro" in args.only:
+            scoring.RASTER_PATH = scoring.SNAPSHOT_PATH = None
+            from backend import assets
+            assets.LIGHTS_PATH = assets.POLICE_STATIONS_PATH = ""
+            t0 = time.perf_counter()
+            scoring.load_crime_data(csv_path)
+            results["load.dataset"] = {"load_ms": round((time.perf_counter() - t0) * 1000, 1)}
+            results.update(run_micro(args))
+        if "load" in args.only:
+            results.update(run_load(args, csv_path))
+    return {"meta": meta, "results": results}
+
+
+def print_results(report: dict):
+    for name, metrics in report["results"].items():
+        print(f"{name:<32} " + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric == "rps"
+
+
+def compare(base: dict, head: dict, threshold: float) -> int:
+    """Print the change of every shared metric; returns the number of regressions."""
+    regressions = 0
+    print(f"base {base['meta'].get('git')} ({base['meta']['timestamp']}) -> "
+          f"head {head['meta'].get('git')} ({head['meta']['timestamp']})")
+    print(f"{'benchmark':<32} {'metric':<10} {'base':>10} {'head':>10} {'change':>8}")
+    for name, metrics in head["results"].items():
+        for metric, value in metrics.items():
+            old = base["results"].get(name, {}).get(metric)
+            # Counts and the (noisy) best round are informational
+            if metric in ("calls", "requests", "errors", "min_us") or not old or not isinstance(value, (int, float)):
+                continue
+            change = value / old - 1
+            worse = -change if higher_is_better(metric) else change
+            flag = " REGRESSION" if worse > threshold else ""
+            regressions += bool(flag)
+            print(f"{name:<32} {metric:<10} {old:>10} {value:>10} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incidents", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", choices=["micro", "load"], default=["micro", "load"])
+    parser.add_argument("--micro-number", type=int, default=1000, help="Calls per round for the fastest micro benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint in the load test")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--executor", default="thread")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--route-scoring", choices=["sampled", "continuous"], default="sampled")
+    parser.add_argument("--distinct-trips", type=int, default=50)
+    parser.add_argument("--osrm-latency-ms", type=float, default=0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--osrm-port", type=int, default=5011)
+    parser.add_argument("--quick", action="store_true", help="Small dataset and few requests, for a smoke run")
+    parser.add_argument("--out", help=f"Results JSON (default {RESULTS_DIR}/suite-<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="Compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            head = json.load(f)
+        sys.exit(1 if compare(base, head, args.threshold) else 0)
+
+    if args.quick:
+        args.incidents, args.micro_number, args.requests = 20_000, 100, 100
+    report = run_suite(args)
+    print_results(report)
+    out = args.out or os.path.join(RESULTS_DIR, f"suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import numpy as np
+from scripts.generate_processed_csv import CRIME_CATEGORIES, DEFAULT_YEAR, DISTRICT_COORDS, incident_times
+
+# Same scatter as generate_processed_csv (+/- 0.03 deg around district centroids)
+SCATTER_DEG = 0.03
+
+
+def synthetic_incidents(n: int, seed: int = 42):
+    """Return (lats, lons) for `n` incidents scattered around Delhi districts."""
+    rng = np.random.default_rng(seed)
+    centroids = np.array(list(DISTRICT_COORDS.values()))
+    pick = rng.integers(0, len(centroids), size=n)
+    lats = centroids[pick, 0] + rng.uniform(-SCATTER_DEG, SCATTER_DEG, size=n)
+    lons = centroids[pick, 1] + rng.uniform(-SCATTER_DEG, SCATTER_DEG, size=n)
+    return lats, lons
+
+
+# Share of each CRIME_CATEGORIES type in synthetic_crime_frame (theft dominates, as in NCRB totals)
+CATEGORY_SHARES = {
+    "Murder": 0.01,
+    "Rape": 0.03,
+    "Robbery": 0.12,
+    "Theft": 0.74,
+    "Assault on Women with intent to outrage her Modesty": 0.10,
+}
+
+
+def synthetic_crime_frame(n: int, seed: int = 42, times: bool = True):
+    """`n` incidents in the processed CSV format (generate_processed_csv columns).
+
+    Same district scatter as synthetic_incidents, a realistic crime type
+    mix and, with `times`, timestamps over DEFAULT_YEAR.
+    """
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    names = list(DISTRICT_COORDS)
+    centroids = np.array(list(DISTRICT_COORDS.values()))
+    pick = rng.integers(0, len(centroids), size=n)
+    types = list(CATEGORY_SHARES)
+    crime = rng.choice(len(types), size=n, p=list(CATEGORY_SHARES.values()))
+    frame = pd.DataFrame({
+        "Crime Type": np.array(types, dtype=object)[crime],
+        "Severity": np.array([CRIME_CATEGORIES[t] for t in types])[crime],
+        "Latitude": centroids[pick, 0] + rng.uniform(-SCATTER_DEG, SCATTER_DEG, size=n),
+        "Longitude": centroids[pick, 1] + rng.uniform(-SCATTER_DEG, SCATTER_DEG, size=n),
+        "District": np.array(names, dtype=object)[pick],
+    })
+    if times:
+        frame["Date Time"] = incident_times(rng, n, [DEFAULT_YEAR] * n)
+    return frame
+
+
+def synthetic_queries(n: int, seed: int = 7):
+    """Return (lats, lons) for `n` query points spread over the Delhi extent."""
+    rng = np.random.default_rng(seed)
+    centroids = np.array(list(DISTRICT_COORDS.values()))
+    lat_lo, lon_lo = centroids.min(axis=0) - SCATTER_DEG
+    lat_hi, lon_hi = centroids.max(axis=0) + SCATTER_DEG
+    return rng.uniform(lat_lo, lat_hi, size=n), rng.uniform(lon_lo, lon_hi, size=n)
+
+
+def synthetic_road_graph(rows: int = 400, cols: int = 400, spacing_m: float = 100.0, seed: int = 11):
+    """City-sized grid street network centred on New Delhi.
+
+    Every 10th street is an arterial (50 km/h), the rest residential
+    (25 km/h); all streets are two-way. 400x400 is ~160k nodes and
+    ~640k directed edges, comparable to a Delhi driving graph.
+    """
+    from backend.graph import RoadGraph
+    from backend.spatial import EARTH_RADIUS_M
+
+    lat_c, lon_c = DISTRICT_COORDS["New Delhi"]
+    dlat = np.degrees(spacing_m / EARTH_RADIUS_M)
+    dlon = dlat / np.cos(np.radians(lat_c))
+    rng = np.random.default_rng(seed)
+
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    # Small jitter so the grid is not perfectly regular
+    lats = lat_c + (r - rows / 2) * dlat + rng.normal(0, dlat * 0.05, rows * cols)
+    lons = lon_c + (c - cols / 2) * dlon + rng.normal(0, dlon * 0.05, rows * cols)
+
+    node = np.arange(rows * cols).reshape(rows, cols)
+    horiz = (node[:, :-1].ravel(), node[:, 1:].ravel(), np.repeat(np.arange(rows), cols - 1))
+    vert = (node[:-1, :].ravel(), node[1:, :].ravel(), np.tile(np.arange(cols), rows - 1) + rows)
+    a = np.concatenate([horiz[0], vert[0]])
+    b = np.concatenate([horiz[1], vert[1]])
+    street = np.concatenate([horiz[2], vert[2]])
+    speed = np.where(street % 10 == 0, 50.0, 25.0) / 3.6
+
+    src = np.concatenate([a, b])
+    dst = np.concatenate([b, a])
+    way = np.concatenate([street, street])
+    length = np.hypot((lats[src] - lats[dst]) / dlat, (lons[src] - lons[dst]) / dlon) * spacing_m
+    edge_time = length / np.concatenate([speed, speed])
+    return RoadGraph.from_edges(np.arange(rows * cols), lats, lons, src, dst, edge_time, way)
@@ -0,0 +1,162 @@
+import os
+import time
+import numpy as np
+
+# Shared bulk-load path for the ETL scripts: stream rows in DataFrame
+# chunks, build point geometries from lat/lon columns in SQL, and upsert
+# on each table's `source_id` so re-running a loader updates rows in place.
+#
+#   copy   - COPY each batch into a temp staging table (asyncpg
+#            copy_records_to_table), then INSERT ... SELECT ... ON CONFLICT
+#   insert - multi-row INSERT ... ON CONFLICT per batch (any driver)
+
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "5000"))
+ETL_METHOD = os.getenv("ETL_METHOD", "copy") # copy or insert
+METHODS = ("copy", "insert")
+KEY_COLUMN = "source_id"
+MAX_BIND_PARAMS = 32000 # asyncpg/PostgreSQL limit is 32767 per statement
+
+
+def read_csv_chunks(path: str, chunksize: int = ETL_BATCH_SIZE, **kwargs):
+    """Stream a CSV as DataFrames of at most `chunksize` rows."""
+    import pandas as pd
+    with pd.read_csv(path, chunksize=chunksize, **kwargs) as reader:
+        for chunk in reader:
+            chunk.columns = [c.strip() for c in chunk.columns]
+            yield chunk
+
+
+def content_ids(df, columns, prefix: str):
+    # Stable per-row ids from row content, for sources without their own keys
+    import pandas as pd
+    hashes = pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+    return np.char.add(prefix, np.char.mod("%016x", hashes))
+
+
+def point_ewkt(lats, lons) -> np.ndarray:
+    """`SRID=4326;POINT(lon lat)` strings for the `insert` method, built per column, not per row."""
+    lons = np.char.mod("%.8f", np.asarray(lons, dtype=np.float64))
+    lats = np.char.mod("%.8f", np.asarray(lats, dtype=np.float64))
+    return np.char.add(np.char.add(np.char.add("SRID=4326;POINT(", lons), np.char.add(" ", lats)), ")")
+
+
+def _records(df) -> list:
+    # NaN/NaT -> NULL, numpy scalars -> Python values
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+async def prepare_table(model):
+    """Create the table if needed and make sure it has a unique `source_id`.
+
+    Tables created before `source_id` existed get the column and index added.
+    """
+    from sqlalchemy import text
+    from backend.database import get_engine, Base
+
+    table = model.__tablename__
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {KEY_COLUMN} VARCHAR"))
+        await conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{table}_{KEY_COLUMN} ON {table} ({KEY_COLUMN})"
+        ))
+
+
+async def bulk_upsert(model, frames, geom_column: str = "location",
+                      batch_size: int = ETL_BATCH_SIZE, method: str = ETL_METHOD) -> int:
+    """Upsert DataFrames into `model`'s table; returns the number of rows written.
+
+    Each frame holds the table's columns (including `source_id`) plus
+    `latitude` / `longitude`, which become the point in `geom_column`.
+    Frames are split into batches of `batch_size`; each batch commits on
+    its own, so an interrupted load can simply be re-run.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown ETL method '{method}'. Choose from {METHODS}")
+    from backend.database import get_engine
+
+    await prepare_table(model)
+    table = model.__tablename__
+    total = 0
+    t0 = time.perf_counter()
+
+    async with get_engine().connect() as conn:
+        if method == "copy":
+            raw = await conn.get_raw_connection()
+            upsert = _CopyUpsert(raw.driver_connection, table, geom_column)
+        else:
+            upsert = _InsertUpsert(conn, model, geom_column)
+
+        for frame in frames:
+            # A batch may not touch the same key twice in one ON CONFLICT
+            frame = frame.drop_duplicates(subset=KEY_COLUMN, keep="last")
+            for start in range(0, len(frame), batch_size):
+                batch = frame.iloc[start:start + batch_size]
+                await upsert(batch)
+                total += len(batch)
+                elapsed = time.perf_counter() - t0
+                print(f"  {table}: {total} rows ({total / max(elapsed, 1e-9):.0f} rows/s)")
+    return total
+
+
+class _CopyUpsert:
+    def __init__(self, apg, table: str, geom_column: str):
+        self.apg = apg
+        self.table = table
+        self.geom_column = geom_column
+        self.staging = f"_stage_{table}"
+        self.columns = None
+
+    async def _create_staging(self, columns):
+        # Same column types as the target, with lon/lat in place of the geometry
+        cols = ", ".join(columns)
+        await self.apg.execute(f"DROP TABLE IF EXISTS pg_temp.{self.staging}")
+        await self.apg.execute(
+            f"CREATE TEMP TABLE {self.staging} AS SELECT {cols} FROM {self.table} WITH NO DATA"
+        )
+        await self.apg.execute(f"ALTER TABLE {self.staging} ADD COLUMN _lon float8, ADD COLUMN _lat float8")
+        self.columns = columns
+
+    async def __call__(self, batch):
+        columns = [c for c in batch.columns if c not in ("latitude", "longitude")]
+        if columns != self.columns:
+            await self._create_staging(columns)
+        cols = ", ".join(columns)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns + [self.geom_column] if c != KEY_COLUMN)
+
+        async with self.apg.transaction():
+            await self.apg.copy_records_to_table(
+                self.staging,
+                records=_records(batch[columns + ["longitude", "latitude"]]),
+                columns=columns + ["_lon", "_lat"],
+            )
+            await self.apg.execute(
+                f"INSERT INTO {self.table} ({cols}, {self.geom_column}) "
+                f"SELECT {cols}, ST_SetSRID(ST_MakePoint(_lon, _lat), 4326) FROM {self.staging} "
+                f"ON CONFLICT ({KEY_COLUMN}) DO UPDATE SET {updates}"
+            )
+            await self.apg.execute(f"TRUNCATE {self.staging}")
+
+
+class _InsertUpsert:
+    def __init__(self, conn, model, geom_column: str):
+        self.conn = conn
+        self.model = model
+        self.geom_column = geom_column
+
+    async def __call__(self, batch):
+        from sqlalchemy.dialects.postgresql import insert
+
+        columns = [c for c in batch.columns if c not in ("latitude", "longitude")]
+        rows = batch[columns].copy()
+        rows[self.geom_column] = point_ewkt(batch["latitude"], batch["longitude"])
+        records = [dict(zip(rows.columns, r)) for r in _records(rows)]
+        per_statement = max(1, MAX_BIND_PARAMS // len(rows.columns))
+        for start in range(0, len(records), per_statement):
+            stmt = insert(self.model).values(records[start:start + per_statement])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[KEY_COLUMN],
+                set_={c: stmt.excluded[c] for c in rows.columns if c != KEY_COLUMN},
+            )
+            await self.conn.execute(stmt)
+        await self.conn.commit()
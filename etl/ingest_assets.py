@@ -1,9 +1,10 @@
+import argparse
 import asyncio
-import random
-from sqlalchemy.ext.asyncio import AsyncSession
-from geoalchemy2.elements import WKTElement
+import os
+import numpy as np
+import pandas as pd
 from backend.models import StreetLight, PoliceStation
-from backend.database import AsyncSessionLocal, engine, Base
+from etl.bulk import ETL_BATCH_SIZE, ETL_METHOD, METHODS, bulk_upsert
 
 # Mock Data Generation Config
 NUM_LIGHTS = 50
@@ -11,45 +12,60 @@ NUM_STATIONS = 5
 CENTER_LAT = 28.6139
 CENTER_LON = 77.2090
 VARIANCE = 0.01
+SEED = 7 # Fixed, so re-runs upsert the same mock assets
 
-async def ingest_assets():
+def mock_lights(n: int, rng) -> pd.DataFrame:
+    return pd.DataFrame({
+        "source_id": np.char.add("mock-light:", np.arange(n).astype(str)),
+        "is_working": rng.random(n) < 0.75, # 75% working
+        "brightness_level": rng.integers(3, 6, n),
+        "latitude": CENTER_LAT + rng.uniform(-VARIANCE, VARIANCE, n),
+        "longitude": CENTER_LON + rng.uniform(-VARIANCE, VARIANCE, n),
+    })
+
+def mock_stations(n: int, rng) -> pd.DataFrame:
+    ids = np.arange(1, n + 1).astype(str)
+    return pd.DataFrame({
+        "source_id": np.char.add("mock-police:", ids),
+        "name": np.char.add("Police Station ", ids),
+        "address": np.char.add(np.char.add("Sector ", rng.integers(1, 21, n).astype(str)), ", New Delhi"),
+        "latitude": CENTER_LAT + rng.uniform(-VARIANCE, VARIANCE, n),
+        "longitude": CENTER_LON + rng.uniform(-VARIANCE, VARIANCE, n),
+    })
+
+async def ingest_assets(num_lights: int = NUM_LIGHTS, num_stations: int = NUM_STATIONS,
+                        batch_size: int = ETL_BATCH_SIZE, method: str = ETL_METHOD):
     print("Starting Asset Ingestion...")
-    
-    # Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async with AsyncSessionLocal() as session:
-        # Ingest Street Lights
-        print(f"Generating {NUM_LIGHTS} street lights...")
-        for _ in range(NUM_LIGHTS):
-            lat = CENTER_LAT + random.uniform(-VARIANCE, VARIANCE)
-            lon = CENTER_LON + random.uniform(-VARIANCE, VARIANCE)
-            point = WKTElement(f"POINT({lon} {lat})", srid=4326)
-            
-            light = StreetLight(
-                location=point,
-                is_working=random.choice([True, True, True, False]), # 75% working
-                brightness_level=random.randint(3, 5)
-            )
-            session.add(light)
-        
-        # Ingest Police Stations
-        print(f"Generating {NUM_STATIONS} police stations...")
-        for i in range(NUM_STATIONS):
-            lat = CENTER_LAT + random.uniform(-VARIANCE, VARIANCE)
-            lon = CENTER_LON + random.uniform(-VARIANCE, VARIANCE)
-            point = WKTElement(f"POINT({lon} {lat})", srid=4326)
-            
-            station = PoliceStation(
-                name=f"Police Station {i+1}",
-                address=f"Sector {random.randint(1, 20)}, New Delhi",
-                location=point
-            )
-            session.add(station)
-
-        await session.commit()
-        print("Asset ingestion complete.")
+    rng = np.random.default_rng(SEED)
+
+    # Ingest Street Lights
+    print(f"Generating {num_lights} street lights...")
+    await bulk_upsert(StreetLight, [mock_lights(num_lights, rng)], batch_size=batch_size, method=method)
+
+    # Ingest Police Stations
+    print(f"Generating {num_stations} police stations...")
+    await bulk_upsert(PoliceStation, [mock_stations(num_stations, rng)], batch_size=batch_size, method=method)
+    print("Asset ingestion complete.")
+
+def export_assets_csv(out_dir: str, num_lights: int = NUM_LIGHTS, num_stations: int = NUM_STATIONS):
+    # Same mock assets as the DB ingest, as the CSVs point scoring loads (backend/assets.py)
+    rng = np.random.default_rng(SEED)
+    os.makedirs(out_dir, exist_ok=True)
+    lights_path = os.path.join(out_dir, "street_lights.csv")
+    stations_path = os.path.join(out_dir, "police_stations.csv")
+    mock_lights(num_lights, rng).to_csv(lights_path, index=False)
+    mock_stations(num_stations, rng).to_csv(stations_path, index=False)
+    print(f"Wrote {num_lights} street lights to {lights_path} and {num_stations} police stations to {stations_path}.")
 
 if __name__ == "__main__":
-    asyncio.run(ingest_assets())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lights", type=int, default=NUM_LIGHTS)
+    parser.add_argument("--stations", type=int, default=NUM_STATIONS)
+    parser.add_argument("--batch-size", type=int, default=ETL_BATCH_SIZE)
+    parser.add_argument("--method", choices=METHODS, default=ETL_METHOD)
+    parser.add_argument("--csv-out", help="Write street_lights.csv / police_stations.csv to this directory instead of the DB")
+    args = parser.parse_args()
+    if args.csv_out:
+        export_assets_csv(args.csv_out, args.lights, args.stations)
+    else:
+        asyncio.run(ingest_assets(args.lights, args.stations, args.batch_size, args.method))
@@ -1,48 +1,58 @@
-import pandas as pd
+import argparse
 import os
 import asyncio
-from datetime import datetime
-from sqlalchemy.ext.asyncio import AsyncSession
-from geoalchemy2.elements import WKTElement
+import pandas as pd
 from backend.models import CrimeIncident
-from backend.database import AsyncSessionLocal, engine, Base
+from backend.postgis_scoring import ensure_indexes
+from etl.bulk import ETL_BATCH_SIZE, ETL_METHOD, METHODS, bulk_upsert, content_ids, read_csv_chunks
 
 DATA_PATH = "data/crime_data.csv"
+# data/processed_crime.csv (what the API loads in memory) -> crime_data.csv names
+PROCESSED_COLUMNS = {
+    "Crime Type": "crime_type",
+    "Severity": "severity_score",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+    "District": "description",
+    "Date Time": "date_time", # generate_processed_csv.py --times
+}
 
-async def ingest_crime_data():
-    if not os.path.exists(DATA_PATH):
-        print(f"File {DATA_PATH} not found.")
-        return
+def crime_frames(path: str, batch_size: int):
+    # CSV chunks -> crime_incidents rows; the row content is the upsert key
+    for chunk in read_csv_chunks(path, batch_size):
+        chunk = chunk.rename(columns=PROCESSED_COLUMNS)
+        for column in ('description', 'date_time'):
+            if column not in chunk.columns:
+                chunk[column] = None
+        chunk = chunk.dropna(subset=['latitude', 'longitude'])
+        yield pd.DataFrame({
+            "source_id": content_ids(
+                chunk, ['crime_type', 'description', 'date_time', 'latitude', 'longitude'], "csv:"
+            ),
+            "crime_type": chunk['crime_type'],
+            "description": chunk['description'],
+            "date_time": pd.to_datetime(chunk['date_time'], errors="coerce"),
+            "severity_score": chunk['severity_score'].astype(float),
+            "latitude": chunk['latitude'].astype(float),
+            "longitude": chunk['longitude'].astype(float),
+        })
 
-    # Create tables if they don't exist (ensure DB is ready)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def ingest_crime_data(path: str = DATA_PATH, batch_size: int = ETL_BATCH_SIZE, method: str = ETL_METHOD):
+    if not os.path.exists(path):
+        print(f"File {path} not found.")
+        return
 
-    print(f"Reading {DATA_PATH}...")
-    df = pd.read_csv(DATA_PATH)
-    
-    async with AsyncSessionLocal() as session:
-        count = 0
-        for index, row in df.iterrows():
-            try:
-                # Create Point Geometry
-                point = WKTElement(f"POINT({row['longitude']} {row['latitude']})", srid=4326)
-                
-                incident = CrimeIncident(
-                    crime_type=row['crime_type'],
-                    description=row['description'],
-                    date_time=pd.to_datetime(row['date_time']),
-                    location=point,
-                    severity_score=row['severity_score']
-                )
-                session.add(incident)
-                count += 1
-            except Exception as e:
-                print(f"Error processing row {index}: {e}")
-        
-        await session.commit()
-        print(f"Successfully ingested {count} crime incidents.")
+    print(f"Streaming {path} in chunks of {batch_size} ({method})...")
+    count = await bulk_upsert(CrimeIncident, crime_frames(path, batch_size), batch_size=batch_size, method=method)
+    print(f"Successfully ingested {count} crime incidents.")
+    # Lets SCORING_BACKEND=postgis answer radius queries from an index
+    await ensure_indexes()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--batch-size", type=int, default=ETL_BATCH_SIZE)
+    parser.add_argument("--method", choices=METHODS, default=ETL_METHOD)
+    args = parser.parse_args()
     print("Starting Crime Data ETL...")
-    asyncio.run(ingest_crime_data())
+    asyncio.run(ingest_crime_data(args.csv, args.batch_size, args.method))
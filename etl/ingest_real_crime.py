@@ -1,11 +1,12 @@
+import argparse
 import pandas as pd
+import numpy as np
 import os
 import asyncio
 from datetime import datetime
-from sqlalchemy.ext.asyncio import AsyncSession
-from geoalchemy2.elements import WKTElement
 from backend.models import CrimeIncident
-from backend.database import AsyncSessionLocal, engine, Base
+from backend.postgis_scoring import ensure_indexes
+from etl.bulk import ETL_BATCH_SIZE, ETL_METHOD, METHODS, bulk_upsert, read_csv_chunks
 
 # EXPECTED FILE: Download form data.gov.in / NCRB
 DATA_PATH = "data/crime_2022.csv"
@@ -29,105 +30,90 @@ DISTRICT_COORDS = {
     "Dwarka": (28.5921, 77.0460)
 }
 
-async def ingest_real_crime_data():
-    if not os.path.exists(DATA_PATH):
-        print(f"File {DATA_PATH} not found. Please download NCRB 2022 data and place it here.")
-        return
+# Key crimes to visualize and their severity
+CRIME_CATEGORIES = {
+    'Murder': 10.0,
+    'Rape': 10.0,
+    'Robbery': 8.0,
+    'Theft': 3.0,
+    'Assault on Women with intent to outrage her Modesty': 7.0
+}
+POINTS_PER_CATEGORY = 20 # Representative points per category per district
+SCATTER_DEG = 0.03 # ~2-3km around the district centroid
+SEED = 2022 # Fixed, so re-runs regenerate (and upsert) the same points
 
-    print(f"Reading {DATA_PATH}...")
-    try:
-        df = pd.read_csv(DATA_PATH)
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        return
+def district_coords(district: str):
+    # flexible matching
+    for d_name, coords in DISTRICT_COORDS.items():
+        if d_name.lower().replace(" ", "") in district.lower().replace(" ", ""):
+            return coords
+    # Try manual fallback for common mismatch
+    for key, d_name in (("Shahdara", "Shahdara"), ("Outer", "Outer North"), ("Rohini", "Rohini"), ("Dwarka", "Dwarka")):
+        if key in district:
+            return DISTRICT_COORDS[d_name]
+    return None
+
+def incident_frames(path: str, batch_size: int):
+    """NCRB district aggregates -> representative incident points, chunk by chunk.
 
-    # Normalize columns
-    df.columns = [c.strip() for c in df.columns]
-    
-    # Filter for Delhi
-    # The CSV has 'States/UTs' column
-    if 'States/UTs' in df.columns:
-         df = df[df['States/UTs'].str.contains('Delhi', case=False, na=False)]
-    
-    print(f"Found {len(df)} records for Delhi.")
+    We have aggregate counts (e.g., Murder: 5, Theft: 100); up to
+    POINTS_PER_CATEGORY points per category are scattered around the
+    district centroid (a real app would use exact locations). Points are
+    keyed by year/district/category/ordinal, so loading twice upserts.
+    """
+    rng = np.random.default_rng(SEED)
+    for df in read_csv_chunks(path, batch_size):
+        # Filter for Delhi
+        if 'States/UTs' in df.columns:
+            df = df[df['States/UTs'].str.contains('Delhi', case=False, na=False)]
 
-    async with AsyncSessionLocal() as session:
-        count = 0
-        for index, row in df.iterrows():
-            try:
-                district = row.get('District', '')
-                if not district or district == 'Total' or district == 'ZZ TOTAL':
+        parts = []
+        for row in df.to_dict("records"):
+            district = row.get('District', '')
+            if not isinstance(district, str) or not district or district in ('Total', 'ZZ TOTAL'):
+                continue
+            coords = district_coords(district)
+            if coords is None:
+                print(f"Skipping unknown district: {district}")
+                continue
+            lat, lon = coords
+
+            for crime, severity in CRIME_CATEGORIES.items():
+                value = row.get(crime)
+                n = min(int(value) if pd.notna(value) else 0, POINTS_PER_CATEGORY)
+                if n <= 0:
                     continue
-                
-                # Check Mapping
-                lat, lon = None, None
-                
-                # Clean district name for matching
-                d_clean = district.replace('West', ' West').replace('East', ' East').replace('North', ' North').replace('South', ' South').strip()
-                
-                for d_name, coords in DISTRICT_COORDS.items():
-                    # flexible matching
-                    if d_name.lower().replace(" ", "") in district.lower().replace(" ", ""):
-                        lat, lon = coords
-                        break
-                
-                if not lat:
-                    # Try manual fallback for common mismatch
-                    if "Shahdara" in district: lat, lon = DISTRICT_COORDS["Shahdara"]
-                    elif "Outer" in district: lat, lon = DISTRICT_COORDS["Outer North"]
-                    elif "Rohini" in district: lat, lon = DISTRICT_COORDS["Rohini"]
-                    elif "Dwarka" in district: lat, lon = DISTRICT_COORDS["Dwarka"]
-                    else:
-                        print(f"Skipping unknown district: {district}")
-                        continue
+                year = int(row['Year'])
+                ordinal = np.arange(n).astype(str)
+                parts.append(pd.DataFrame({
+                    "source_id": np.char.add(f"ncrb:{year}:{district}:{crime}:", ordinal),
+                    "crime_type": crime,
+                    "description": f"{crime} in {district} ({year})",
+                    "date_time": datetime(year, 1, 1),
+                    "severity_score": severity,
+                    "latitude": lat + rng.uniform(-SCATTER_DEG, SCATTER_DEG, n),
+                    "longitude": lon + rng.uniform(-SCATTER_DEG, SCATTER_DEG, n),
+                }))
+        if parts:
+            yield pd.concat(parts, ignore_index=True)
+
+async def ingest_real_crime_data(path: str = DATA_PATH, batch_size: int = ETL_BATCH_SIZE, method: str = ETL_METHOD):
+    if not os.path.exists(path):
+        print(f"File {path} not found. Please download NCRB 2022 data and place it here.")
+        return
 
-                # We have aggregate counts (e.g., Murder: 5, Theft: 100).
-                # We need to turn these into individual Incident points for our Heatmap logic.
-                # To avoid exploding the DB with 10k points, we will create weighted points
-                # OR create a few representative points per category.
-                
-                # Let's pick a few key crimes to visualize
-                crime_categories = {
-                    'Murder': 10.0,
-                    'Rape': 10.0,
-                    'Robbery': 8.0, 
-                    'Theft': 3.0, 
-                    'Assault on Women with intent to outrage her Modesty': 7.0
-                }
-                
-                import random
-                for crime, severity in crime_categories.items():
-                    if crime in row and row[crime] > 0:
-                        # Ingest up to 20 points per category per district to represent the cluster
-                        # (Real app would use exact locations or a heatmap density layer directly)
-                        num_incidents = int(row[crime])
-                        display_count = min(num_incidents, 20) 
-                        
-                        for _ in range(display_count):
-                            # Scatter around district centroid (~2-3km radius)
-                            r_lat = lat + random.uniform(-0.03, 0.03)
-                            r_lon = lon + random.uniform(-0.03, 0.03)
-                            
-                            point = WKTElement(f"POINT({r_lon} {r_lat})", srid=4326)
-                            
-                            incident = CrimeIncident(
-                                crime_type=crime,
-                                description=f"{crime} in {district} ({row['Year']})",
-                                date_time=datetime(int(row['Year']), 1, 1),
-                                location=point,
-                                severity_score=severity
-                            )
-                            session.add(incident)
-                            count += 1
-                
-            except Exception as e:
-                print(f"Error processing row {index}: {e}")
-        
-        await session.commit()
-        print(f"Successfully ingested {count} real crime incidents.")
+    print(f"Streaming {path} in chunks of {batch_size} ({method})...")
+    count = await bulk_upsert(CrimeIncident, incident_frames(path, batch_size), batch_size=batch_size, method=method)
+    print(f"Successfully ingested {count} real crime incidents.")
+    # Lets SCORING_BACKEND=postgis answer radius queries from an index
+    await ensure_indexes()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--batch-size", type=int, default=ETL_BATCH_SIZE)
+    parser.add_argument("--method", choices=METHODS, default=ETL_METHOD)
+    args = parser.parse_args()
     print("Starting Real Crime Data ETL...")
-    # Clean up mock crime data first?
-    # In V1, maybe append.
-    asyncio.run(ingest_real_crime_data())
+    # Re-running updates the same incidents instead of appending duplicates
+    asyncio.run(ingest_real_crime_data(args.csv, args.batch_size, args.method))
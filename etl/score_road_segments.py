@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import math
+import time
+from datetime import datetime
+import numpy as np
+from backend import scoring
+from backend.graph import RoadGraph
+from backend.segments import SegmentScores
+from backend.spatial import build_index, haversine_np
+
+# Score every road segment (OSM way) of the routing graph once, offline:
+# crime along the linestring, working street lights and police proximity.
+# Results go to the RoadSegmentScore table and to data/segment_scores.npz,
+# which /route reads for `"scoring": "segments"`.
+
+SAMPLE_SPACING_M = 50 # Crime/lighting samples along each segment
+LIGHT_RADIUS_M = 30 # A sample is lit if a working light is this close
+POLICE_RANGE_M = 2000 # Police score falls linearly to 0 at this distance
+# Bonuses on top of the crime score, mirroring `lighting_bonus` in point scoring
+LIGHTING_WEIGHT = 0.10 # Fully lit segment: +10
+POLICE_WEIGHT = 0.05 # Station on the segment: +5
+UPSERT_BATCH = 1000
+
+
+def undirected_edges(graph: RoadGraph) -> np.ndarray:
+    # One edge id per (node pair, way): two-way streets are stored twice
+    src = graph.edge_sources()
+    lo = np.minimum(src, graph.targets)
+    hi = np.maximum(src, graph.targets)
+    keys = np.column_stack((lo, hi, graph.edge_way))
+    _, first = np.unique(keys, axis=0, return_index=True)
+    return np.sort(first)
+
+
+def sample_edges(graph: RoadGraph, edges: np.ndarray, spacing_m: float):
+    """Evenly spaced samples along each edge.
+
+    Returns sample lats, lons, the position in `edges` each sample belongs
+    to, and the metres of road each sample stands for.
+    """
+    src = graph.edge_sources()[edges]
+    dst = graph.targets[edges].astype(np.int64)
+    lengths = graph.edge_length[edges].astype(np.float64)
+    n = np.maximum(1, np.ceil(lengths / spacing_m)).astype(np.int64)
+
+    owner = np.repeat(np.arange(len(edges)), n)
+    starts = np.cumsum(n) - n
+    t = (np.arange(len(owner)) - starts[owner] + 0.5) / n[owner]
+    lats = graph.node_lats[src[owner]] + t * (graph.node_lats[dst[owner]] - graph.node_lats[src[owner]])
+    lons = graph.node_lons[src[owner]] + t * (graph.node_lons[dst[owner]] - graph.node_lons[src[owner]])
+    return lats, lons, owner, (lengths / n)[owner]
+
+
+def lit_samples(lats, lons, light_lats, light_lons, radius_m: float = LIGHT_RADIUS_M) -> np.ndarray:
+    lit = np.zeros(len(lats), dtype=bool)
+    if len(light_lats) == 0:
+        return lit
+    index = build_index(light_lats, light_lons, kind="grid")
+    for start in range(0, len(lats), scoring.SCORE_CHUNK_POINTS):
+        end = min(start + scoring.SCORE_CHUNK_POINTS, len(lats))
+        pts, _ = index.query_radius_batch(lats[start:end], lons[start:end], radius_m)
+        lit[start + pts] = True
+    return lit
+
+
+def nearest_distance(lats, lons, asset_lats, asset_lons, chunk_pairs: int = 4_000_000) -> np.ndarray:
+    # Brute force: police stations number in the hundreds at most
+    dist = np.full(len(lats), np.inf)
+    if len(asset_lats) == 0:
+        return dist
+    step = max(1, chunk_pairs // len(asset_lats))
+    for start in range(0, len(lats), step):
+        end = min(start + step, len(lats))
+        d = haversine_np(lats[start:end, None], lons[start:end, None], asset_lats[None, :], asset_lons[None, :])
+        dist[start:end] = d.min(axis=1)
+    return dist
+
+
+def score_segments(graph: RoadGraph, lights=None, stations=None,
+                   spacing_m: float = SAMPLE_SPACING_M, radius_m: float = 500):
+    """Score every way of `graph` against the loaded crime data.
+
+    `lights` / `stations` are `(lats, lons)` arrays or None. Returns the
+    SegmentScores, the undirected edge ids that were scored and, for each
+    of those edges, the position of its way in `segments.way_ids`.
+    """
+    edges = undirected_edges(graph)
+    ways, way_pos = np.unique(graph.edge_way[edges], return_inverse=True)
+    lats, lons, owner, weight = sample_edges(graph, edges, spacing_m)
+    sample_way = way_pos[owner]
+    way_length = np.bincount(sample_way, weights=weight, minlength=len(ways))
+
+    def per_way(values):
+        # Length-weighted mean over each way's samples
+        return np.bincount(sample_way, weights=values * weight, minlength=len(ways)) / way_length
+
+    # Crime only: the lighting and police terms below are this script's own
+    crime = per_way(scoring.score_values(lats, lons, radius_m, with_assets=False))
+    lighting = np.zeros(len(ways))
+    police = np.zeros(len(ways))
+    if lights is not None:
+        lighting = per_way(lit_samples(lats, lons, *lights) * 100.0)
+    if stations is not None:
+        dist = nearest_distance(lats, lons, *stations)
+        police = per_way(np.clip(1.0 - dist / POLICE_RANGE_M, 0.0, 1.0) * 100.0)
+
+    final = np.clip(crime + LIGHTING_WEIGHT * lighting + POLICE_WEIGHT * police, 0.0, 100.0)
+    segments = SegmentScores(ways, crime, lighting, police, final,
+                             fingerprint=scoring.DATASET.store.fingerprint(), radius_m=radius_m)
+    return segments, edges, way_pos
+
+
+def way_linestrings(graph: RoadGraph, edges: np.ndarray, way_pos: np.ndarray, num_ways: int) -> list:
+    """WKT LINESTRING per way, chaining its undirected edges end to end.
+
+    Ways whose nodes are only partly in the graph can fall apart into
+    several pieces; the longest chain is kept.
+    """
+    src = graph.edge_sources()[edges].tolist()
+    dst = graph.targets[edges].tolist()
+    pieces = [[] for _ in range(num_ways)]
+    for w, a, b in zip(way_pos.tolist(), src, dst):
+        pieces[w].append((a, b))
+
+    lats, lons = graph.node_lats, graph.node_lons
+    out = []
+    for pairs in pieces:
+        adjacent = {}
+        for a, b in pairs:
+            adjacent.setdefault(a, []).append(b)
+            adjacent.setdefault(b, []).append(a)
+        unvisited = set(map(frozenset, pairs))
+        best = []
+        while unvisited:
+            # Start from a dead end when there is one (closed ways have none)
+            nodes = {n for pair in unvisited for n in pair}
+            start = next((n for n in nodes if len(adjacent[n]) == 1), next(iter(nodes)))
+            chain = [start]
+            while True:
+                step = next((n for n in adjacent[chain[-1]] if frozenset((chain[-1], n)) in unvisited), None)
+                if step is None:
+                    break
+                unvisited.discard(frozenset((chain[-1], step)))
+                chain.append(step)
+            if len(chain) > len(best):
+                best = chain
+        out.append("LINESTRING(" + ", ".join(f"{lons[n]} {lats[n]}" for n in best) + ")")
+    return out
+
+
+async def load_assets():
+    # Working street lights and police stations from PostGIS, as (lats, lons)
+    from sqlalchemy import select, func
+    from backend.database import AsyncSessionLocal
+    from backend.models import StreetLight, PoliceStation
+
+    async with AsyncSessionLocal() as session:
+        lights = (await session.execute(
+            select(func.ST_Y(StreetLight.location), func.ST_X(StreetLight.location))
+            .where(StreetLight.is_working.is_(True))
+        )).all()
+        stations = (await session.execute(
+            select(func.ST_Y(PoliceStation.location), func.ST_X(PoliceStation.location))
+        )).all()
+
+    def columns(rows):
+        arr = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        return arr[:, 0], arr[:, 1]
+
+    return columns(lights), columns(stations)
+
+
+async def write_segment_scores(segments: SegmentScores, linestrings: list, batch_size: int = UPSERT_BATCH):
+    """Bulk upsert into road_segment_scores, keyed on segment_id (way id)."""
+    from geoalchemy2.elements import WKTElement
+    from sqlalchemy.dialects.postgresql import insert
+    from backend.database import AsyncSessionLocal, engine, Base
+    from backend.models import RoadSegmentScore
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime.utcnow()
+    columns = ("geometry", "crime_score", "lighting_score", "police_score", "final_safety_score", "last_updated")
+    way_ids = segments.way_ids.tolist()
+    scores = [a.tolist() for a in (segments.crime, segments.lighting, segments.police, segments.final)]
+    total = len(way_ids)
+
+    async with AsyncSessionLocal() as session:
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            rows = [
+                {
+                    "segment_id": str(way_ids[i]),
+                    "geometry": WKTElement(linestrings[i], srid=4326),
+                    "crime_score": scores[0][i],
+                    "lighting_score": scores[1][i],
+                    "police_score": scores[2][i],
+                    "final_safety_score": scores[3][i],
+                    "last_updated": now,
+                }
+                for i in range(start, end)
+            ]
+            stmt = insert(RoadSegmentScore).values(rows)
+            # traffic_score has no source yet and is left untouched
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["segment_id"], set_={c: stmt.excluded[c] for c in columns}
+            )
+            await session.execute(stmt)
+            print(f"  upserted {end}/{total} segments")
+        await session.commit()
+
+
+async def run(args):
+    t0 = time.perf_counter()
+    if scoring.load_crime_data(args.csv) is None:
+        return
+    graph = RoadGraph.load(args.graph)
+    print(f"Scoring {graph.num_edges} edges of {args.graph}...")
+
+    lights = stations = None
+    if not args.no_db:
+        lights, stations = await load_assets()
+        print(f"Loaded {len(lights[0])} working street lights and {len(stations[0])} police stations.")
+    elif scoring.DATASET.assets is not None:
+        # Same layers point scoring uses (LIGHTS_PATH / POLICE_STATIONS_PATH CSVs)
+        assets = scoring.DATASET.assets
+        if assets.num_lights:
+            lights = (assets.light_lats, assets.light_lons)
+        if assets.num_stations:
+            stations = (assets.station_lats, assets.station_lons)
+
+    segments, edges, way_pos = score_segments(graph, lights, stations, args.spacing, args.radius)
+    segments.save(args.out)
+    print(f"Wrote {len(segments)} segment scores to {args.out} in {time.perf_counter() - t0:.1f}s "
+          f"(mean score {float(segments.final.mean()) if len(segments) else math.nan:.1f}).")
+
+    if not args.no_db:
+        linestrings = way_linestrings(graph, edges, way_pos, len(segments))
+        await write_segment_scores(segments, linestrings, args.batch_size)
+        print(f"Segment scores written to road_segment_scores in {time.perf_counter() - t0:.1f}s.")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--graph", default="data/road_graph.npz")
+    parser.add_argument("--csv", default="data/processed_crime.csv")
+    parser.add_argument("--out", default="data/segment_scores.npz")
+    parser.add_argument("--spacing", type=float, default=SAMPLE_SPACING_M, help="Sample spacing in metres")
+    parser.add_argument("--radius", type=float, default=500, help="Crime radius in metres")
+    parser.add_argument("--batch-size", type=int, default=UPSERT_BATCH)
+    parser.add_argument("--no-db", action="store_true",
+                        help="Skip PostGIS: lighting/police from the LIGHTS_PATH / POLICE_STATIONS_PATH CSVs, write only the .npz")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
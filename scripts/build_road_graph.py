@@ -0,0 +1,22 @@
+import argparse
+import time
+from backend.graph import RoadGraph, PROFILES
+
+# Convert an OSM extract (e.g. a Delhi .osm / .osm.pbf from Geofabrik or BBBike)
+# into the compact CSR graph used by `"engine": "local"` routing.
+
+def build_graph():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("osm", help="Path to a .osm (XML) or .osm.pbf extract")
+    parser.add_argument("--out", default="data/road_graph.npz")
+    parser.add_argument("--profile", choices=PROFILES, default="driving")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    graph = RoadGraph.from_osm(args.osm, profile=args.profile)
+    graph.save(args.out)
+    print(f"Built {args.out}: {graph.num_nodes} nodes, {graph.num_edges} edges "
+          f"({args.profile}) in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    build_graph()
@@ -0,0 +1,42 @@
+import argparse
+import os
+import time
+from backend import scoring, kde
+from backend.raster import SafetyRaster, DEFAULT_CELL_DEG
+
+# Precompute the radius score onto a grid so /score and /route become array lookups.
+# Rerun after scripts/generate_processed_csv.py; a stale raster is ignored at startup.
+
+def build_raster():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="data/processed_crime.csv")
+    parser.add_argument("--out", default=scoring.RASTER_PATH)
+    parser.add_argument("--radius", type=float, default=500)
+    parser.add_argument("--cell-deg", type=float, default=DEFAULT_CELL_DEG)
+    parser.add_argument("--kernel", choices=kde.KERNELS,
+                        help="Kernel-density grid for SCORING_MODE=kde (default: hard radius)")
+    parser.add_argument("--bandwidth", type=float,
+                        help="Kernel bandwidth in metres; must match KDE_BANDWIDTH_M at serve time")
+    parser.add_argument("--time-layers", action="store_true",
+                        help="Also store one time-weighted penalty layer per time bucket (needs timestamped data)")
+    args = parser.parse_args()
+    if args.kernel and not args.bandwidth:
+        args.bandwidth = kde.KDE_BANDWIDTH_M if args.kernel == kde.KDE_KERNEL else kde.DEFAULT_BANDWIDTH_M[args.kernel]
+
+    # Build from raw incidents, never from an existing raster
+    scoring.RASTER_PATH = None
+    dataset = scoring.load_crime_data(args.csv)
+    if dataset is None:
+        return
+
+    t0 = time.perf_counter()
+    raster = SafetyRaster.build(dataset.store, dataset.index, args.radius, args.cell_deg, args.time_layers,
+                                args.kernel, args.bandwidth)
+    raster.save(args.out)
+    elapsed = time.perf_counter() - t0
+    rows, cols = raster.shape
+    layers = f", {len(raster.time_penalty)} time layers" if raster.has_time_layers else ""
+    print(f"Built {args.out}: {rows}x{cols} cells{layers}, {os.path.getsize(args.out) / 1e3:.0f} KB in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    build_raster()
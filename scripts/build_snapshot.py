@@ -0,0 +1,30 @@
+import argparse
+import time
+from backend import scoring
+from backend.assets import asset_paths
+from backend.snapshot import write_snapshot
+
+# Convert the crime CSV (its spatial index, and the street light / police
+# station CSVs when present) into a memory-mappable snapshot.
+# Rerun after scripts/generate_processed_csv.py; a stale snapshot is ignored at startup.
+
+def build_snapshot():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="data/processed_crime.csv")
+    parser.add_argument("--out", default=scoring.SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    # Always start from the CSV, never from an existing snapshot
+    scoring.SNAPSHOT_PATH = None
+    scoring.RASTER_PATH = None
+    dataset = scoring.load_crime_data(args.csv)
+    if dataset is None:
+        return
+
+    t0 = time.perf_counter()
+    write_snapshot(args.out, dataset.store, dataset.index, source_path=args.csv,
+                   assets=dataset.assets, asset_paths=asset_paths())
+    print(f"Wrote snapshot {args.out} ({scoring.INDEX_KIND} index) in {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    build_snapshot()
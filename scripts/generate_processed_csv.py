@@ -1,6 +1,8 @@
-import pandas as pd
-import random
+import argparse
+import re
 import os
+import numpy as np
+import pandas as pd
 
 # Source and Dest
 SOURCE_PATH = "data/crime_2022.csv"
@@ -19,79 +21,170 @@ DISTRICT_COORDS = {
     "East": (28.6277, 77.2925),
     "North East": (28.7004, 77.2764),
     "Shahdara": (28.6792, 77.2995),
-    "Outer North": (28.8093, 77.1264), 
-    "Rohini": (28.7391, 77.1070), 
+    "Outer North": (28.8093, 77.1264),
+    "Rohini": (28.7391, 77.1070),
     "Dwarka": (28.5921, 77.0460)
 }
+# Fallbacks for names that contain none of the districts above
+DISTRICT_ALIASES = {"outer": "Outer North"}
+SKIP_DISTRICTS = {"total", "zztotal"}
+
+# Key crimes to track
+CRIME_CATEGORIES = {
+    'Murder': 10.0,
+    'Rape': 10.0,
+    'Robbery': 8.0,
+    'Theft': 3.0,
+    'Assault on Women with intent to outrage her Modesty': 7.0
+}
+CRIME_CAP = 15 # Points per crime per district; keeps the file small for lambda
+SCATTER_DEG = 0.03
+SEED = 42
+CHUNK_ROWS = 10_000 # Source rows per chunk
+OUTPUT_BLOCK = 100_000 # Max incidents generated (and held) at once
+
+COLUMNS = ["Crime Type", "Severity", "Latitude", "Longitude", "District"]
+
+# --times: relative incident frequency per hour of day (evening and night heavy).
+# NCRB reports yearly totals, so timestamps are synthetic, spread over the year.
+HOUR_PROFILE = np.array([4, 3, 3, 2, 2, 2, 2, 3, 4, 4, 4, 4,
+                         5, 5, 5, 5, 6, 7, 8, 9, 9, 8, 7, 5], dtype=np.float64)
+DEFAULT_YEAR = 2022
+
+
+def incident_times(rng, n, years):
+    # "YYYY-MM-DD HH:MM:SS" strings, hour drawn from HOUR_PROFILE. Three uniform
+    # draws per incident, so the output doesn't depend on how `n` is split up
+    u = rng.random((n, 3))
+    days = (u[:, 0] * 365).astype(np.int64).astype("timedelta64[D]")
+    cdf = np.cumsum(HOUR_PROFILE) / HOUR_PROFILE.sum()
+    hours = np.minimum(np.searchsorted(cdf, u[:, 1], side="right"), 23).astype("timedelta64[h]")
+    minutes = (u[:, 2] * 60).astype(np.int64).astype("timedelta64[m]")
+    starts = np.array([f"{y}-01-01" for y in years], dtype="datetime64[D]")
+    stamps = (starts + days).astype("datetime64[m]") + hours + minutes
+    return np.char.replace(np.datetime_as_string(stamps.astype("datetime64[s]")), "T", " ").astype(object)
+
+
+def normalize_district(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+# Normalized names, longest first, so "North West" wins over "North" and "West"
+_NORMALIZED = sorted(((normalize_district(d), d) for d in DISTRICT_COORDS), key=lambda kv: -len(kv[0]))
+
 
-def generate_csv():
-    if not os.path.exists(SOURCE_PATH):
-        print(f"Source file {SOURCE_PATH} not found.")
+def resolve_district(name: str):
+    """Centroid district for a raw NCRB district name, or None to skip the row."""
+    key = normalize_district(name)
+    if not key or key in SKIP_DISTRICTS:
+        return None
+    for norm, district in _NORMALIZED:
+        if norm in key:
+            return district
+    for alias, district in DISTRICT_ALIASES.items():
+        if alias in key:
+            return district
+    return None
+
+
+def read_chunks(path: str, chunksize: int):
+    with pd.read_csv(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk.columns = [c.strip() for c in chunk.columns]
+            if 'States/UTs' in chunk.columns:
+                chunk = chunk[chunk['States/UTs'].str.contains('Delhi', case=False, na=False)]
+            yield chunk
+
+
+def incident_blocks(chunks, rng, cap=CRIME_CAP, block=OUTPUT_BLOCK, times=False, time_rng=None):
+    """Expand district/crime counts into scattered incident points.
+
+    Yields DataFrames of at most `block` rows, in source row then crime
+    order. `cap=None` emits one point per reported incident; `times` adds
+    a synthetic "Date Time" column in the source row's year, drawn from
+    `time_rng` so positions and times are separate streams and neither
+    depends on how the source is chunked.
+    """
+    crimes = list(CRIME_CATEGORIES)
+    severities = np.array(list(CRIME_CATEGORIES.values()))
+    lookup = {} # raw district name -> centroid district (resolved once per name)
+    if times and time_rng is None:
+        time_rng = np.random.default_rng(rng.integers(2**63))
+
+    for chunk in chunks:
+        if 'District' not in chunk.columns:
+            continue
+        names = chunk['District'].fillna("").astype(str)
+        for name in names.unique():
+            if name not in lookup:
+                lookup[name] = resolve_district(name)
+        resolved = names.map(lookup)
+        keep = resolved.notna().to_numpy()
+        if not keep.any():
+            continue
+
+        # Counts per (row, crime), capped; missing crime columns count as 0
+        counts = np.column_stack([
+            pd.to_numeric(chunk[c], errors="coerce").fillna(0).to_numpy() if c in chunk.columns
+            else np.zeros(len(chunk))
+            for c in crimes
+        ])[keep]
+        counts = np.maximum(counts, 0).astype(np.int64)
+        if cap is not None:
+            counts = np.minimum(counts, cap)
+        counts = counts.ravel()
+
+        districts = names.to_numpy()[keep]
+        if 'Year' in chunk.columns:
+            years = pd.to_numeric(chunk['Year'], errors="coerce").fillna(DEFAULT_YEAR).astype(int).to_numpy()[keep]
+        else:
+            years = np.full(int(keep.sum()), DEFAULT_YEAR)
+        centroids = np.array([DISTRICT_COORDS[d] for d in resolved[keep]]).reshape(-1, 2)
+        ends = np.cumsum(counts)
+        total = int(ends[-1]) if len(ends) else 0
+
+        for start in range(0, total, block):
+            stop = min(start + block, total)
+            pair = np.searchsorted(ends, np.arange(start, stop), side="right")
+            row, crime = np.divmod(pair, len(crimes))
+            scatter = rng.uniform(-SCATTER_DEG, SCATTER_DEG, size=(stop - start, 2))
+            frame = pd.DataFrame({
+                "Crime Type": np.array(crimes, dtype=object)[crime],
+                "Severity": severities[crime],
+                "Latitude": centroids[row, 0] + scatter[:, 0],
+                "Longitude": centroids[row, 1] + scatter[:, 1],
+                "District": districts[row],
+            }, columns=COLUMNS)
+            if times:
+                frame["Date Time"] = incident_times(time_rng, stop - start, years[row])
+            yield frame
+
+
+def generate_csv(source=SOURCE_PATH, dest=DEST_PATH, cap=CRIME_CAP, seed=SEED, chunksize=CHUNK_ROWS, times=False):
+    if not os.path.exists(source):
+        print(f"Source file {source} not found.")
         return
 
-    print("Reading raw data...")
-    df = pd.read_csv(SOURCE_PATH)
-    df.columns = [c.strip() for c in df.columns]
-    
-    if 'States/UTs' in df.columns:
-         df = df[df['States/UTs'].str.contains('Delhi', case=False, na=False)]
-    
-    processed_rows = []
-    
-    # Key crimes to track
-    crime_categories = {
-        'Murder': 10.0,
-        'Rape': 10.0,
-        'Robbery': 8.0, 
-        'Theft': 3.0, 
-        'Assault on Women with intent to outrage her Modesty': 7.0
-    }
-
-    for index, row in df.iterrows():
-        try:
-            district = row.get('District', '')
-            if not district or district in ['Total', 'ZZ TOTAL']: continue
-            
-            lat, lon = None, None
-            for d_name, coords in DISTRICT_COORDS.items():
-                if d_name.lower().replace(" ", "") in district.lower().replace(" ", ""):
-                    lat, lon = coords
-                    break
-            
-            # Fallbacks
-            if not lat:
-                if "Shahdara" in district: lat, lon = DISTRICT_COORDS["Shahdara"]
-                elif "Outer" in district: lat, lon = DISTRICT_COORDS["Outer North"]
-                elif "Rohini" in district: lat, lon = DISTRICT_COORDS["Rohini"]
-                elif "Dwarka" in district: lat, lon = DISTRICT_COORDS["Dwarka"]
-                else: continue
-
-            for crime, severity in crime_categories.items():
-                if crime in row and row[crime] > 0:
-                    num_incidents = int(row[crime])
-                    # Cap points to keep file size small for lambda
-                    display_count = min(num_incidents, 15) 
-                    
-                    for _ in range(display_count):
-                        # Scatter
-                        r_lat = lat + random.uniform(-0.03, 0.03)
-                        r_lon = lon + random.uniform(-0.03, 0.03)
-                        
-                        processed_rows.append({
-                            "Crime Type": crime,
-                            "Severity": severity,
-                            "Latitude": r_lat,
-                            "Longitude": r_lon,
-                            "District": district
-                        })
-
-        except Exception as e:
-            print(f"Skipping row {index}: {e}")
-
-    # Write to CSV
-    out_df = pd.DataFrame(processed_rows)
-    out_df.to_csv(DEST_PATH, index=False)
-    print(f"Generated {DEST_PATH} with {len(out_df)} records.")
+    print(f"Streaming {source} (cap={cap}, seed={seed})...")
+    rng = np.random.default_rng(seed)
+    time_rng = np.random.default_rng(seed + 1)
+    # Header first, then blocks appended as they are generated
+    written = 0
+    pd.DataFrame(columns=COLUMNS + (["Date Time"] if times else [])).to_csv(dest, index=False)
+    for block in incident_blocks(read_chunks(source, chunksize), rng, cap, times=times, time_rng=time_rng):
+        block.to_csv(dest, mode="a", header=False, index=False)
+        written += len(block)
+    print(f"Generated {dest} with {written} records.")
+
 
 if __name__ == "__main__":
-    generate_csv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default=SOURCE_PATH)
+    parser.add_argument("--dest", default=DEST_PATH)
+    parser.add_argument("--cap", type=int, default=CRIME_CAP, help="Points per crime per district")
+    parser.add_argument("--no-cap", action="store_true", help="One point per reported incident (full volume)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--times", action="store_true", help="Add synthetic incident timestamps for time-aware scoring")
+    args = parser.parse_args()
+    generate_csv(args.source, args.dest, None if args.no_cap else args.cap, args.seed, args.chunksize, args.times)
@@ -0,0 +1,73 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+import httpx
+
+# Cold-start profile of the API:
+#   1. import-time breakdown of `import backend.main` (python -X importtime)
+#   2. time from spawning uvicorn to the first successful response
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def import_breakdown(top: int):
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+
+    rows = []
+    for line in out.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            rows.append((int(m.group(1)), int(m.group(2)), len(m.group(3)), m.group(4)))
+
+    # Self time grouped by top-level package
+    by_package = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+
+    print(f"Import backend.main: {total / 1000:.1f} ms self time across {len(rows)} modules")
+    print(f"\nTop {top} packages by self time:")
+    for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    print(f"\nTop {top} modules by cumulative time:")
+    for _, cum_us, _, name in sorted(rows, key=lambda r: -r[1])[:top]:
+        print(f"  {cum_us / 1000:8.1f} ms  {name}")
+
+def time_to_first_response(port: int, path: str, timeout: float):
+    env = dict(os.environ, STARTUP_PROFILE="1")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}{path}", timeout=1.0).status_code == 200:
+                    print(f"\nTime to first response ({path}): {(time.perf_counter() - t0) * 1000:.0f} ms")
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        print(f"\nNo response from {path} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/score?lat=28.6139&lon=77.2090")
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    import_breakdown(args.top)
+    time_to_first_response(args.port, args.path, args.timeout)
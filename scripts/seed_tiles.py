@@ -0,0 +1,40 @@
+import argparse
+import time
+from backend import scoring, tiles
+
+# Pre-render heatmap tiles over the crime data extent into TILE_CACHE_DIR, so
+# the first pan over the city is served from disk. Tiles are keyed by the data
+# version, so rerun after the crime data (or SCORING_MODE) changes.
+
+def seed_tiles():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="data/processed_crime.csv")
+    parser.add_argument("--layers", nargs="+", choices=tiles.LAYERS, default=list(tiles.LAYERS))
+    parser.add_argument("--min-zoom", type=int, default=10)
+    parser.add_argument("--max-zoom", type=int, default=14)
+    parser.add_argument("--out", default=tiles.TILE_CACHE_DIR)
+    args = parser.parse_args()
+
+    dataset = scoring.load_crime_data(args.csv)
+    extent = tiles.data_extent(dataset)
+    if extent is None:
+        return
+    cache = tiles.TileCache(maxsize=1, directory=args.out)
+
+    for layer in args.layers:
+        version = tiles.tile_version(layer)
+        for z in range(args.min_zoom, args.max_zoom + 1):
+            t0 = time.perf_counter()
+            x0, x1, y0, y1 = tiles.tile_range(*extent, z)
+            rendered = 0
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    if cache.get(version, layer, z, x, y) is None:
+                        cache.put(version, layer, z, x, y, tiles.render_tile(layer, z, x, y, dataset))
+                        rendered += 1
+            count = (x1 - x0 + 1) * (y1 - y0 + 1)
+            print(f"{layer} z{z}: {count} tiles ({rendered} rendered) in {time.perf_counter() - t0:.1f}s")
+    print(f"Tiles written to {args.out}")
+
+if __name__ == "__main__":
+    seed_tiles()
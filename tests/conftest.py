@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from backend import main
+from benchmarks.fake_osrm import canned_routes
+
+# Where write_crime_csv puts every incident (the Central district centroid)
+HOTSPOT = (28.6453, 77.2373)
+
+
+@pytest.fixture
+def hotspot():
+    return HOTSPOT
+
+
+@pytest.fixture
+def write_crime_csv():
+    """write_crime_csv(path, n): a crime CSV of `n` thefts at HOTSPOT."""
+    def write(path, n):
+        pd.DataFrame({
+            "Crime Type": ["Theft"] * n,
+            "Severity": [3.0] * n,
+            "Latitude": [HOTSPOT[0]] * n,
+            "Longitude": [HOTSPOT[1]] * n,
+        }).to_csv(path, index=False)
+    return write
+
+
+class StubOSRM:
+    # Canned alternatives instead of the OSRM server
+    stats = {"upstream_calls": 0}
+
+    async def route(self, start_lat, start_lon, end_lat, end_lon, annotations=False):
+        return {"code": "Ok", "routes": canned_routes(start_lon, start_lat, end_lon, end_lat, 50)}
+
+
+@pytest.fixture
+def stub_osrm(monkeypatch):
+    """Serve routes from StubOSRM for the duration of the test."""
+    stub = StubOSRM()
+    monkeypatch.setattr(main, "get_osrm_client", lambda: stub)
+    return stub
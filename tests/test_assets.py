@@ -0,0 +1,103 @@
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from backend import assets, scoring, snapshot
+from backend.assets import AssetLayers, read_asset_csvs
+from backend.spatial import haversine_np
+
+CENTER = (28.6139, 77.2090)
+
+
+def setup_module(module):
+    if scoring.DATASET is None:
+        scoring.load_crime_data("data/processed_crime.csv")
+
+
+def random_points(rng, n, spread=0.02):
+    return CENTER[0] + rng.uniform(-spread, spread, n), CENTER[1] + rng.uniform(-spread, spread, n)
+
+
+def test_batched_lookups_match_brute_force():
+    rng = np.random.default_rng(1)
+    light_lats, light_lons = random_points(rng, 3000)
+    brightness = rng.integers(3, 6, 3000)
+    station_lats, station_lons = random_points(rng, 40)
+    layers = AssetLayers(light_lats, light_lons, brightness, station_lats, station_lons)
+    lats, lons = random_points(rng, 300, spread=0.03)
+
+    lighting, counts = layers.lighting(lats, lons)
+    police, nearest = layers.police(lats, lons)
+    for i in range(len(lats)):
+        d = haversine_np(lats[i], lons[i], light_lats, light_lons)
+        inside = d <= assets.LIGHT_RADIUS_M
+        assert counts[i] == inside.sum()
+        assert lighting[i] == pytest.approx(min(assets.LIGHT_BONUS_PER_LEVEL * brightness[inside].sum(), assets.MAX_LIGHTING_BONUS))
+
+        d = np.sort(haversine_np(lats[i], lons[i], station_lats, station_lons))
+        k_nearest = d[:assets.POLICE_K][d[:assets.POLICE_K] <= assets.POLICE_RANGE_M]
+        expected = assets.MAX_POLICE_BONUS * np.sum(1 - k_nearest / assets.POLICE_RANGE_M) / assets.POLICE_K
+        assert police[i] == pytest.approx(expected)
+        assert nearest[i] == (pytest.approx(d[0]) if d[0] <= assets.POLICE_RANGE_M else np.inf)
+
+
+def test_csv_layers_raise_scores_and_change_version(tmp_path):
+    lights = pd.DataFrame({
+        "latitude": [CENTER[0], CENTER[0], CENTER[0] + 0.0001],
+        "longitude": [CENTER[1], CENTER[1] + 0.0001, CENTER[1]],
+        "is_working": [True, True, False],
+        "brightness_level": [5, 3, 5],
+    })
+    stations = pd.DataFrame({"name": ["PS 1"], "latitude": [CENTER[0] + 0.005], "longitude": [CENTER[1]]})
+    lights.to_csv(tmp_path / "lights.csv", index=False)
+    stations.to_csv(tmp_path / "stations.csv", index=False)
+    layers = read_asset_csvs(str(tmp_path / "lights.csv"), str(tmp_path / "stations.csv"))
+    assert layers.num_lights == 2 # Broken light skipped
+    assert read_asset_csvs(str(tmp_path / "none.csv"), str(tmp_path / "none.csv")) is None
+
+    saved = scoring.DATASET
+    if saved is None:
+        pytest.skip("needs data/processed_crime.csv loaded")
+    try:
+        plain = scoring.score_points([CENTER[0]], [CENTER[1]])[0]
+        scoring.DATASET = scoring.CrimeDataset(saved.store, saved.index, saved.raster, assets=layers)
+        lit = scoring.score_points([CENTER[0]], [CENTER[1]])[0]
+        assert scoring.DATASET.version != saved.version
+    finally:
+        scoring.DATASET = saved
+    assert lit["details"]["lights_nearby"] == 2
+    assert lit["details"]["lighting_bonus"] == pytest.approx(4.0)
+    assert 0 < lit["details"]["police_bonus"] < assets.MAX_POLICE_BONUS / assets.POLICE_K
+    assert lit["details"]["nearest_police_m"] == pytest.approx(556, abs=2)
+    assert lit["score"] == pytest.approx(min(100.0, plain["score"] + 4.0 + lit["details"]["police_bonus"]))
+
+
+def test_snapshot_carries_asset_layers(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    light_lats, light_lons = random_points(rng, 50)
+    pd.DataFrame({"latitude": light_lats, "longitude": light_lons, "brightness_level": 4}).to_csv(
+        tmp_path / "lights.csv", index=False)
+    station_lats, station_lons = random_points(rng, 3)
+    pd.DataFrame({"latitude": station_lats, "longitude": station_lons}).to_csv(tmp_path / "stations.csv", index=False)
+    monkeypatch.setattr(assets, "LIGHTS_PATH", str(tmp_path / "lights.csv"))
+    monkeypatch.setattr(assets, "POLICE_STATIONS_PATH", str(tmp_path / "stations.csv"))
+    csv = tmp_path / "crime.csv"
+    shutil.copyfile("data/processed_crime.csv", csv)
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", None)
+    monkeypatch.setattr(scoring, "RASTER_PATH", None)
+    built = scoring.build_dataset(str(csv))
+    snapshot.write_snapshot(str(tmp_path / "snapshot"), built.store, built.index, source_path=str(csv),
+                            assets=built.assets, asset_paths=assets.asset_paths())
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", str(tmp_path / "snapshot"))
+
+    # A current snapshot parses no asset CSV
+    read = []
+    monkeypatch.setattr(scoring, "read_asset_csvs", lambda: read.append(1) or assets.read_asset_csvs())
+    mapped = scoring.build_dataset(str(csv))
+    assert read == [] and mapped.version == built.version
+
+    # An edited layer is read from its CSV again
+    pd.DataFrame({"latitude": station_lats[:1], "longitude": station_lons[:1]}).to_csv(
+        tmp_path / "stations.csv", index=False)
+    reread = scoring.build_dataset(str(csv))
+    assert read == [1] and reread.assets.num_stations == 1
@@ -0,0 +1,36 @@
+import time
+from backend.cache import InMemoryCache, RouteCache
+from backend.schemas import RouteRequest
+
+
+def test_lru_eviction_and_counters():
+    cache = InMemoryCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1 # "a" is now most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_ttl_expiry():
+    cache = InMemoryCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_route_keys_snap_coordinates_and_track_data_version():
+    cache = RouteCache(InMemoryCache(), InMemoryCache(), precision=4)
+    near = RouteRequest(start_lat=28.61391, start_lon=77.20901, end_lat=28.62, end_lon=77.21)
+    same = RouteRequest(start_lat=28.61394, start_lon=77.20899, end_lat=28.62, end_lon=77.21)
+    bike = RouteRequest(start_lat=28.61391, start_lon=77.20901, end_lat=28.62, end_lon=77.21, mode="bike")
+
+    cache.set_routes(near, "v1", [{"safety_score": 90}])
+    assert cache.get_routes(same, "v1") == [{"safety_score": 90}]
+    assert cache.get_routes(bike, "v1") is None
+    assert cache.get_routes(same, "v2") is None
+
+    cache.invalidate_routes()
+    assert cache.get_routes(same, "v1") is None
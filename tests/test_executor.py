@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from backend import executor, scoring
+from benchmarks.synthetic import synthetic_queries
+
+
+def setup_module(module):
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+def teardown_module(module):
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_pool_scores_match_inline(kind, monkeypatch):
+    monkeypatch.setattr(executor, "SCORING_WORKERS", 1)
+    lats, lons = synthetic_queries(300)
+    inline = scoring.score_points(lats, lons)
+
+    async def run():
+        pooled = await executor.run(scoring.score_points, lats, lons, 500, kind=kind)
+        values = await executor.run(scoring.score_values, lats, lons, 500, kind=kind)
+        return pooled, values
+
+    pooled, values = asyncio.run(run())
+    assert pooled == inline
+    assert values.tolist() == [r["score"] for r in inline]
+
+
+def test_unknown_executor_is_rejected():
+    with pytest.raises(ValueError):
+        executor.get_pool("fibers")
@@ -0,0 +1,41 @@
+import pandas as pd
+from scripts.generate_processed_csv import generate_csv, resolve_district
+
+NCRB_CSV = """States/UTs,District,Year,Murder,Rape,Robbery,Theft,Assault on Women with intent to outrage her Modesty
+Delhi,Central,2022,3,1,25,400,0
+Delhi,ZZ TOTAL,2022,100,100,100,100,100
+Delhi,North-West,2022,2,0,0,30,0
+Goa,North Goa,2022,5,5,5,5,5
+Delhi,Outer District,2022,0,0,2,0,1
+Delhi,Nowhere,2022,1,1,1,1,1
+"""
+
+
+def test_resolves_districts_by_longest_normalized_name():
+    assert resolve_district("North-West") == "North West"
+    assert resolve_district("SOUTH EAST DISTRICT") == "South East"
+    assert resolve_district("Outer District") == "Outer North"
+    assert resolve_district("ZZ Total") is None
+    assert resolve_district("Nowhere") is None
+
+
+def test_output_is_reproducible_and_independent_of_chunking(tmp_path):
+    source = tmp_path / "crime_2022.csv"
+    source.write_text(NCRB_CSV)
+    generate_csv(str(source), str(tmp_path / "a.csv"), cap=15, seed=1, chunksize=1, times=True)
+    generate_csv(str(source), str(tmp_path / "b.csv"), cap=15, seed=1, chunksize=100, times=True)
+    a = pd.read_csv(tmp_path / "a.csv")
+    b = pd.read_csv(tmp_path / "b.csv")
+    assert a.equals(b)
+    # Central 3+1+15+15, North-West 2+15, Outer 2+1
+    assert len(a) == 34 + 17 + 3
+    assert a["District"].value_counts()["North-West"] == 17
+
+
+def test_no_cap_emits_full_volume(tmp_path):
+    source = tmp_path / "crime_2022.csv"
+    source.write_text(NCRB_CSV)
+    generate_csv(str(source), str(tmp_path / "full.csv"), cap=None)
+    full = pd.read_csv(tmp_path / "full.csv")
+    assert len(full) == 3 + 1 + 25 + 400 + 2 + 30 + 2 + 1
+    assert (full["Crime Type"] == "Theft").sum() == 430
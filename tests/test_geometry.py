@@ -0,0 +1,50 @@
+import json
+import numpy as np
+from backend.geometry import encode_geometry, encode_polyline, decode_polyline, simplify, densify
+from backend.serialization import dumps
+from backend.spatial import haversine_np
+
+# Reference example from Google's polyline algorithm documentation ([lon, lat])
+GOOGLE_EXAMPLE = [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+
+
+def test_encode_matches_reference():
+    assert encode_polyline(GOOGLE_EXAMPLE, 5) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+def test_roundtrip_precision6():
+    coords = [[77.209012, 28.613901], [77.210023, 28.614555], [77.2, 28.6]]
+    assert decode_polyline(encode_polyline(coords, 6), 6) == coords
+
+
+def test_simplify_keeps_endpoints_and_drops_collinear_points():
+    line = [[77.2 + i * 0.001, 28.6] for i in range(50)]
+    assert simplify(line, 1.0) == [line[0], line[-1]]
+
+    bent = line + [[77.249, 28.61]]
+    assert len(simplify(bent, 1.0)) == 3
+
+
+
+def test_geojson_is_an_object_encoded_once():
+    line = {"type": "LineString", "coordinates": [[77.2, 28.6], [77.21, 28.6], [77.22, 28.6], [77.22, 28.61]]}
+    assert encode_geometry(line) == line
+    assert isinstance(encode_geometry(line, "polyline5"), str)
+    simplified = encode_geometry(line, simplify_zoom=15)
+    assert simplified == {"type": "LineString", "coordinates": [[77.2, 28.6], [77.22, 28.6], [77.22, 28.61]]}
+    assert json.loads(dumps({"geometry": simplified}))["geometry"] == simplified
+
+def test_densify_spacing_is_independent_of_vertex_count():
+    sparse = [[77.2, 28.6], [77.3, 28.6]]
+    dense = [[77.2 + i * 0.0001, 28.6] for i in range(1001)]
+    length = float(haversine_np(28.6, 77.2, 28.6, 77.3))
+    for coords in (sparse, dense):
+        lats, lons, step = densify(coords, 50)
+        assert len(lats) == int(np.ceil(length / 50))
+        assert abs(step * len(lats) - length) < 1e-3
+        gaps = haversine_np(lats[:-1], lons[:-1], lats[1:], lons[1:])
+        assert np.allclose(gaps, step, rtol=1e-3)
+
+    # The point cap widens the step instead of truncating the route
+    lats, _, step = densify(sparse, 50, max_points=10)
+    assert len(lats) == 10 and abs(step * 10 - length) < 1e-3
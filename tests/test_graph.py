@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import numpy as np
+from backend import main, scoring
+from backend.graph import RoadGraph
+
+# Square A-B-C-D around central Delhi; A-B-C is the short way, A-D-C the detour.
+# B-C is oneway towards C.
+OSM_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="28.6000" lon="77.2000"/>
+  <node id="2" lat="28.6000" lon="77.2050"/>
+  <node id="3" lat="28.6050" lon="77.2050"/>
+  <node id="4" lat="28.6070" lon="77.1980"/>
+  <node id="5" lat="28.7000" lon="77.3000"/>
+  <way id="10"><nd ref="1"/><nd ref="2"/><tag k="highway" v="residential"/></way>
+  <way id="11"><nd ref="2"/><nd ref="3"/><tag k="highway" v="residential"/><tag k="oneway" v="yes"/></way>
+  <way id="12"><nd ref="1"/><nd ref="4"/><nd ref="3"/><tag k="highway" v="residential"/></way>
+  <way id="13"><nd ref="3"/><nd ref="5"/><tag k="waterway" v="river"/></way>
+</osm>
+"""
+
+
+def load_graph(tmp_path):
+    path = tmp_path / "tiny.osm"
+    path.write_text(OSM_XML)
+    return RoadGraph.from_osm(str(path))
+
+
+def route_nodes(graph, route):
+    return [graph.node_ids[graph.nearest_node(lat, lon)] for lon, lat in route["geometry"]["coordinates"]]
+
+
+def test_parses_routable_ways_only(tmp_path):
+    graph = load_graph(tmp_path)
+    assert sorted(graph.node_ids.tolist()) == [1, 2, 3, 4] # node 5 is only on a river
+    # 1-2 both ways, 2->3 oneway, 1-4 and 4-3 both ways
+    assert graph.num_edges == 2 + 1 + 4
+
+
+def test_fastest_path_respects_oneway(tmp_path):
+    graph = load_graph(tmp_path)
+    forward = graph.routes(28.6000, 77.2000, 28.6050, 77.2050, safety_weights=(0.0,))
+    backward = graph.routes(28.6050, 77.2050, 28.6000, 77.2000, safety_weights=(0.0,))
+    assert route_nodes(graph, forward[0]) == [1, 2, 3]
+    assert route_nodes(graph, backward[0]) == [3, 4, 1]
+
+
+def test_safety_weight_avoids_risky_edges(tmp_path):
+    graph = load_graph(tmp_path)
+    # Everything around node 2 is dangerous
+    graph.set_edge_risk(lambda lats, lons: np.where(lons > 77.2030, 0.0, 100.0))
+    fastest, safest = graph.routes(28.6000, 77.2000, 28.6050, 77.2050, safety_weights=(0.0, 8.0))
+    assert route_nodes(graph, fastest) == [1, 2, 3]
+    assert route_nodes(graph, safest) == [1, 4, 3]
+    assert safest["duration"] > fastest["duration"]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    graph = load_graph(tmp_path)
+    graph.save(str(tmp_path / "graph.npz"))
+    loaded = RoadGraph.load(str(tmp_path / "graph.npz"))
+    assert np.array_equal(loaded.indptr, graph.indptr)
+    assert np.array_equal(loaded.edge_way, graph.edge_way)
+    assert loaded.profile == "driving"
+
+
+def test_road_graph_loads_once_off_the_event_loop(tmp_path, monkeypatch):
+    if scoring.DATASET is None:
+        scoring.load_crime_data("data/processed_crime.csv")
+    path = tmp_path / "graph.npz"
+    RoadGraph.from_edges([1, 2], [28.63, 28.63], [77.20, 77.21], [0, 1], [1, 0], [60.0, 60.0], [7, 7]).save(str(path))
+    monkeypatch.setattr(main, "ROAD_GRAPH_PATH", str(path))
+    monkeypatch.setattr(main, "_road_graph", None)
+    loads = []
+    real_load = RoadGraph.load
+
+    def load(path):
+        loads.append(threading.current_thread() is threading.main_thread())
+        return real_load(path)
+
+    monkeypatch.setattr(RoadGraph, "load", load)
+
+    async def first_requests():
+        return await asyncio.gather(*(main.get_road_graph() for _ in range(5)))
+
+    graphs = asyncio.run(first_requests())
+    assert loads == [False] and all(g is graphs[0] for g in graphs)
+    assert graphs[0].edge_risk is not None
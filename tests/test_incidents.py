@@ -0,0 +1,128 @@
+import json
+import time
+from fastapi.testclient import TestClient
+from backend import incidents, main, reloader, schemas, scoring
+from backend.cache import InMemoryCache, RouteCache
+from backend.graph import RoadGraph
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+def setup_data(tmp_path, monkeypatch, write_crime_csv, threshold=1000):
+    csv = tmp_path / "crime.csv"
+    write_crime_csv(csv, 2)
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", None)
+    monkeypatch.setattr(scoring, "RASTER_PATH", None)
+    monkeypatch.setattr(reloader, "DATA_PATH", str(csv))
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(incidents, "INCIDENT_LOG_PATH", str(tmp_path / "incidents.ndjson"))
+    monkeypatch.setattr(incidents, "INCIDENT_COMPACT_THRESHOLD", threshold)
+    # Start without a dataset, so pending incidents don't carry over into other tests
+    monkeypatch.setattr(scoring, "DATASET", None)
+    return csv
+
+
+def hotspot_score(client, hotspot):
+    return client.get("/score", params={"lat": hotspot[0], "lon": hotspot[1]}).json()
+
+
+def test_ingested_incidents_count_immediately(tmp_path, monkeypatch, hotspot, write_crime_csv):
+    setup_data(tmp_path, monkeypatch, write_crime_csv, threshold=3)
+    report = {"lat": hotspot[0], "lon": hotspot[1], "crime_type": "Robbery"}
+    with TestClient(main.app) as client:
+        before = hotspot_score(client, hotspot)
+        assert before["score"] == 94.0
+
+        assert client.post("/incidents", json=report).status_code == 403 # No token
+        added = client.post("/incidents", json=report, headers=TOKEN).json()
+        assert added["accepted"] == 1 and added["pending"] == 1
+        after = hotspot_score(client, hotspot)
+        assert after["score"] == 89.0 and "Robbery" in after["details"]["crime_types"]
+        assert after["details"]["data_version"] == added["data_version"] != before["details"]["data_version"]
+
+        body = "\n".join([json.dumps(report), '{"lat": 200, "lon": 0}', json.dumps(report), json.dumps(report)])
+        bulk = client.post("/incidents/bulk", content=body, headers=TOKEN).json()
+        assert bulk["accepted"] == 3 and bulk["rejected"] == 1 and bulk["errors"][0].startswith("line 2: lat")
+        assert hotspot_score(client, hotspot)["score"] == 74.0
+
+        # Four pending reached the threshold: the background compaction folds them in
+        for _ in range(100):
+            status = client.get("/admin/data", headers=TOKEN).json()
+            if status["pending_incidents"] == 0:
+                break
+            time.sleep(0.02)
+        assert status["ingested_incidents"] == 4 and status["records"] == 2
+        assert hotspot_score(client, hotspot)["score"] == 74.0
+
+        # A reload replays the log
+        assert client.post("/admin/reload", headers=TOKEN).json()["reloaded"]
+        assert hotspot_score(client, hotspot)["score"] == 74.0
+
+
+def test_mixed_utc_offsets_replay(tmp_path, monkeypatch, hotspot, write_crime_csv):
+    setup_data(tmp_path, monkeypatch, write_crime_csv)
+    report = {"lat": hotspot[0], "lon": hotspot[1], "crime_type": "Robbery"}
+    with TestClient(main.app) as client:
+        for when in ("2024-05-01T16:00:00Z", "2024-05-01T21:30:00+05:30"):
+            assert client.post("/incidents", json={**report, "date_time": when}, headers=TOKEN).status_code == 200
+        body = "\n".join(json.dumps({**report, "date_time": when})
+                         for when in ("2024-05-01T16:00:00Z", "2024-05-01T21:30:00", "2024-05-01T21:30:00+05:30"))
+        assert client.post("/incidents/bulk", content=body, headers=TOKEN).json()["accepted"] == 3
+
+        # Logged as one local time, so the log replays on reload
+        assert client.post("/admin/reload", headers=TOKEN).json()["reloaded"]
+        ingested = scoring.DATASET.ingested
+        assert len(ingested) == 5 and len(set(ingested.batch.times.tolist())) == 1
+
+
+def test_compaction_matches_log_replay(tmp_path, monkeypatch, hotspot, write_crime_csv):
+    csv = setup_data(tmp_path, monkeypatch, write_crime_csv)
+    scoring.load_crime_data(str(csv))
+    records = [incidents.validate({"lat": hotspot[0], "lon": hotspot[1], "crime_type": t,
+                                   "date_time": "2024-05-01T21:30:00"}) for t in ("Theft", "Arson", "Murder")]
+    scoring.add_incidents(records[:2])
+    assert scoring.compact_incidents() == 2
+    scoring.add_incidents(records[2:])
+    pending = scoring.score_points([hotspot[0]], [hotspot[1]])[0]
+    assert pending["details"]["crimes_nearby"] == 5
+
+    # Worker processes rebuild a compacted dataset from the file and the log prefix
+    compacted = scoring.DATASET
+    rebuilt = scoring.build_dataset(str(csv), incident_limit=compacted.incident_seq)
+    assert rebuilt.version == compacted.version and len(rebuilt.ingested) == 2
+
+    # A swap keeps delta incidents the new dataset doesn't contain
+    scoring.set_dataset(rebuilt)
+    assert len(scoring.DATASET.delta) == 1
+    assert scoring.score_points([hotspot[0]], [hotspot[1]])[0] == pending
+
+
+def test_compaction_rescores_only_nearby_edges_and_keeps_routes(tmp_path, monkeypatch, hotspot, write_crime_csv):
+    csv = setup_data(tmp_path, monkeypatch, write_crime_csv)
+    scoring.load_crime_data(str(csv))
+    # One edge through the hotspot, one ~10 km away
+    graph = RoadGraph.from_edges([1, 2, 3, 4], [hotspot[0], hotspot[0], 28.70, 28.70],
+                                 [hotspot[1], hotspot[1] + 0.001, 77.30, 77.301],
+                                 [0, 2], [1, 3], [60.0, 60.0], [7, 8])
+    graph.set_edge_risk(main.score_values)
+    full_rescores = []
+    monkeypatch.setattr(graph, "set_edge_risk", lambda fn: full_rescores.append(fn))
+    monkeypatch.setattr(main, "_road_graph", graph)
+    monkeypatch.setattr(main, "route_cache", RouteCache(InMemoryCache(), InMemoryCache()))
+    monkeypatch.setattr(main, "_segment_scores", False)
+    before = graph.edge_risk.copy()
+
+    scoring.add_incidents([incidents.validate({"lat": hotspot[0], "lon": hotspot[1], "crime_type": "Robbery"})])
+    request = schemas.RouteRequest(start_lat=hotspot[0], start_lon=hotspot[1], end_lat=28.70, end_lon=77.30)
+    version = main.route_version(request)
+    main.route_cache.set_routes(request, version, ["cached"])
+    assert scoring.compact_incidents() == 1
+    assert main.route_version(request) == version
+    assert main.route_cache.get_routes(request, version) == ["cached"]
+    assert main._segment_scores is False and full_rescores == []
+    assert graph.edge_risk[0] > before[0] and graph.edge_risk[1] == before[1]
+
+    # A reload may change the base data: everything is rebuilt
+    scoring.load_crime_data(str(csv))
+    assert main.route_cache.get_routes(request, version) is None
+    assert main._segment_scores is None and len(full_rescores) == 1
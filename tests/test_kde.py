@@ -0,0 +1,107 @@
+import math
+import numpy as np
+import pytest
+from backend import kde, scoring
+from backend.raster import SafetyRaster
+from backend.spatial import build_index, EARTH_RADIUS_M
+from backend.store import CrimeStore
+
+# Transect across the Central district hotspot, ~6 m steps
+TRANSECT = (np.full(2000, 28.6453), np.linspace(77.18, 77.30, 2000))
+
+
+_raster_path = None
+
+
+def setup_module(module):
+    # Exact scores only; a prebuilt raster would answer for the radius mode
+    global _raster_path
+    _raster_path, scoring.RASTER_PATH = scoring.RASTER_PATH, None
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+def teardown_module(module):
+    scoring.RASTER_PATH = _raster_path
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+def use_kernel(monkeypatch, kernel):
+    monkeypatch.setattr(scoring, "SCORING_MODE", "kde")
+    monkeypatch.setattr(kde, "KDE_KERNEL", kernel)
+    monkeypatch.setattr(kde, "KDE_BANDWIDTH_M", kde.DEFAULT_BANDWIDTH_M[kernel])
+
+
+@pytest.mark.parametrize("kernel", kde.KERNELS)
+def test_kernel_mass_equals_radius_circle(kernel):
+    h = kde.DEFAULT_BANDWIDTH_M[kernel]
+    step = 5.0
+    x = np.arange(-kde.support_m(kernel, h), kde.support_m(kernel, h) + step, step)
+    d = np.hypot(*np.meshgrid(x, x))
+    mass = kde.kernel_scale(kernel, h, 500) * kde.kernel_values(kernel, d, h).sum() * step ** 2
+    assert mass == pytest.approx(math.pi * 500 ** 2, rel=0.01)
+
+
+def test_severity_penalties_keep_the_type_total():
+    store = scoring.DATASET.store
+    assert store.severity_penalty.sum() == pytest.approx(store.type_penalty[store.type_codes].sum())
+    # Higher CSV severity, higher weight
+    murder = store.crime_types.index("Murder")
+    theft = store.crime_types.index("Theft")
+    assert store.severity_penalty[store.type_codes == murder].mean() > store.severity_penalty[store.type_codes == theft].mean()
+
+
+@pytest.mark.parametrize("kernel", kde.KERNELS)
+def test_kde_is_smooth_and_tracks_radius_scores(kernel, monkeypatch):
+    radius = scoring.score_values(*TRANSECT)
+    use_kernel(monkeypatch, kernel)
+    smooth = scoring.score_values(*TRANSECT)
+
+    # Radius scores jump by a whole incident penalty at the circle's edge
+    assert np.abs(np.diff(radius)).max() >= 3
+    assert np.abs(np.diff(smooth)).max() < 1
+    assert np.corrcoef(radius, smooth)[0, 1] > 0.9
+    assert np.abs(radius - smooth).mean() < 4
+
+
+@pytest.mark.parametrize("kernel", kde.KERNELS)
+def test_uniform_density_matches_radius_penalty(kernel, monkeypatch):
+    # Uniform incidents over ~6 x 6 km; compare at the centre, far from edges
+    rng = np.random.default_rng(0)
+    n = 20000
+    half = math.degrees(3000 / EARTH_RADIUS_M)
+    lats = 28.6 + rng.uniform(-half, half, n)
+    lons = 77.2 + rng.uniform(-half, half, n) / math.cos(math.radians(28.6))
+    store = CrimeStore(lats, lons, np.zeros(n), ["Theft"])
+    saved = scoring.DATASET
+    scoring.DATASET = scoring.CrimeDataset(store, build_index(lats, lons), None)
+    try:
+        q_lats, q_lons = 28.6 + rng.uniform(-0.005, 0.005, 50), 77.2 + rng.uniform(-0.005, 0.005, 50)
+        radius = scoring.score_points(q_lats, q_lons)
+        use_kernel(monkeypatch, kernel)
+        smooth = scoring.score_points(q_lats, q_lons)
+    finally:
+        scoring.DATASET = saved
+    radius_mean = np.mean([r["details"]["crime_penalty"] for r in radius])
+    smooth_mean = np.mean([r["details"]["crime_penalty"] for r in smooth])
+    assert smooth_mean == pytest.approx(radius_mean, rel=0.05)
+
+
+def test_kde_raster_matches_exact_scores_at_cell_centres(monkeypatch):
+    use_kernel(monkeypatch, "gaussian")
+    dataset = scoring.DATASET
+    raster = SafetyRaster.build(dataset.store, dataset.index, radius_m=500, cell_deg=0.002,
+                                kernel="gaussian", bandwidth_m=kde.KDE_BANDWIDTH_M)
+    rows, cols = np.meshgrid(np.arange(0, raster.shape[0], 5), np.arange(0, raster.shape[1], 5))
+    lats = raster.lat0 + rows.ravel() * raster.cell_deg
+    lons = raster.lon0 + cols.ravel() * raster.cell_deg
+
+    exact = scoring.score_values(lats, lons)
+    scoring.DATASET = scoring.CrimeDataset(dataset.store, dataset.index, raster)
+    try:
+        looked_up = scoring.score_values(lats, lons)
+        # Built for another scoring mode: not used
+        monkeypatch.setattr(scoring, "SCORING_MODE", "radius")
+        assert not raster.matches(500, None)
+    finally:
+        scoring.DATASET = dataset
+    assert np.allclose(exact, looked_up, atol=1e-3)
@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+from backend import main, metrics
+
+
+def test_render_prometheus_text():
+    metrics.reset()
+    metrics.inc("points_scored_total", 3, backend="memory")
+    metrics.observe("stage_duration_ms", 7.0, stage="osrm")
+    metrics.observe("stage_duration_ms", 700.0, stage="osrm")
+    text = metrics.render()
+    assert 'points_scored_total{backend="memory"} 3' in text
+    assert 'stage_duration_ms_bucket{stage="osrm",le="10"} 1' in text
+    assert 'stage_duration_ms_bucket{stage="osrm",le="+Inf"} 2' in text
+    assert 'stage_duration_ms_count{stage="osrm"} 2' in text
+    assert "# TYPE stage_duration_ms histogram" in text
+
+
+def test_route_stages_and_server_timing(monkeypatch, stub_osrm):
+    monkeypatch.setattr(metrics, "SERVER_TIMING", True)
+    metrics.reset()
+    body = {"start_lat": 28.61, "start_lon": 77.20, "end_lat": 28.65, "end_lon": 77.24}
+    with TestClient(main.app) as client:
+        response = client.post("/route", json=body)
+        assert response.status_code == 200
+        timing = response.headers["Server-Timing"]
+        for stage in ("osrm", "scoring", "analysis", "serialize", "total"):
+            assert f"{stage};dur=" in timing
+
+        text = client.get("/metrics").text
+    assert 'http_requests_total{method="POST",route="/route",status="200"} 1' in text
+    assert 'stage_duration_ms_count{stage="osrm"} 1' in text
+    assert 'route_cache_requests_total{layer="routes",result="miss"}' in text
+    assert 'points_scored_total{backend="memory"}' in text
+    assert "crime_records " in text
+
+
+def test_disabled_metrics_are_noops(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    metrics.reset()
+    with metrics.stage("osrm"):
+        metrics.inc("points_scored_total", 5)
+    assert "points_scored_total" not in metrics.render()
+    assert metrics.stage("osrm") is metrics.stage("scoring")
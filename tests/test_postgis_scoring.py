@@ -0,0 +1,61 @@
+import asyncio
+import os
+import pytest
+from fastapi.testclient import TestClient
+from backend import main, scoring, postgis_scoring
+
+
+def setup_module(module):
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+def test_postgis_backend_is_selectable(monkeypatch):
+    calls = []
+
+    async def fake_score_points(lats, lons, radius_meters=500, mode=None, time_bucket=None):
+        calls.append((list(lats), list(lons), radius_meters))
+        return [scoring._score_result(4.0, 2, ["Theft"]) for _ in lats]
+
+    monkeypatch.setattr(postgis_scoring, "score_points", fake_score_points)
+    monkeypatch.setattr(scoring, "SCORING_BACKEND", "postgis")
+    result = asyncio.run(scoring.calculate_safety_score(28.6, 77.2))
+    values = asyncio.run(scoring.ascore_values([28.6, 28.7], [77.2, 77.3], 300))
+    assert calls[0] == ([28.6], [77.2], 500)
+    assert result["score"] == 96.0 and result["details"]["crime_types"] == ["Theft"]
+    assert values.tolist() == [96.0, 96.0] and calls[1][2] == 300
+
+
+
+def test_postgis_backend_refuses_kde_at_startup(monkeypatch):
+    postgis_scoring.check_config("radius")
+    monkeypatch.setattr(scoring, "SCORING_BACKEND", "postgis")
+    monkeypatch.setattr(scoring, "SCORING_MODE", "kde")
+    with pytest.raises(ValueError, match="SCORING_MODE=kde"):
+        with TestClient(main.app):
+            pass
+
+@pytest.mark.skipif(os.getenv("ETL_TEST_POSTGIS") != "1",
+                    reason="set ETL_TEST_POSTGIS=1 with PostGIS loaded via "
+                           "python -m etl.ingest_crime --csv data/processed_crime.csv")
+@pytest.mark.parametrize("mode", postgis_scoring.QUERY_MODES)
+def test_postgis_matches_in_memory_scores(mode):
+    from backend.database import get_engine
+    from benchmarks.synthetic import synthetic_queries
+
+    lats, lons = synthetic_queries(100)
+
+    async def run():
+        results = await postgis_scoring.score_points(lats, lons, mode=mode)
+        await get_engine().dispose()
+        return results
+
+    saved = scoring.DATASET
+    scoring.DATASET = scoring.CrimeDataset(saved.store, saved.index, None)
+    try:
+        memory = scoring.score_points(lats, lons)
+    finally:
+        scoring.DATASET = saved
+    db = asyncio.run(run())
+    # Spheroid vs. sphere distances can flip incidents right on the radius
+    close = sum(abs(a["score"] - b["score"]) <= 5 for a, b in zip(memory, db))
+    assert close >= 98
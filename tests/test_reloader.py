@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from fastapi.testclient import TestClient
+from backend import main, reloader, scoring
+
+
+def test_admin_reload_swaps_dataset(tmp_path, monkeypatch, hotspot, write_crime_csv):
+    csv = tmp_path / "crime.csv"
+    write_crime_csv(csv, 2)
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", None)
+    monkeypatch.setattr(scoring, "RASTER_PATH", None)
+    monkeypatch.setattr(reloader, "DATA_PATH", str(csv))
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+
+    with TestClient(main.app) as client:
+        before = client.get("/score", params={"lat": hotspot[0], "lon": hotspot[1]}).json()
+        assert before["score"] == 94.0
+
+        write_crime_csv(csv, 5)
+        assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        stats = client.post("/admin/reload", headers={"X-Admin-Token": "secret"}).json()
+        assert stats["reloaded"] and stats["records"] == 5
+        assert stats["previous_version"] == before["details"]["data_version"] != stats["data_version"]
+
+        after = client.get("/score", params={"lat": hotspot[0], "lon": hotspot[1]}).json()
+        assert after["score"] == 85.0 and after["details"]["data_version"] == stats["data_version"]
+
+        # A broken file keeps the current dataset serving
+        csv.write_text("not,a,crime,file\n")
+        assert client.post("/admin/reload", headers={"X-Admin-Token": "secret"}).status_code == 500
+        assert scoring.data_version() == stats["data_version"]
+
+
+def test_scores_stay_consistent_during_reloads(tmp_path, monkeypatch, hotspot, write_crime_csv):
+    small, large = tmp_path / "small.csv", tmp_path / "large.csv"
+    write_crime_csv(small, 2)
+    write_crime_csv(large, 5)
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", None)
+    monkeypatch.setattr(scoring, "RASTER_PATH", None)
+    scoring.load_crime_data(str(small))
+
+    # Every score must come from one whole dataset, never a mix
+    seen, stop = set(), threading.Event()
+
+    def score_loop():
+        while not stop.is_set():
+            seen.add(scoring.score_points([hotspot[0]], [hotspot[1]])[0]["score"])
+
+    thread = threading.Thread(target=score_loop)
+    thread.start()
+    try:
+        for i in range(10):
+            asyncio.run(reloader.reload_crime_data(str(large if i % 2 == 0 else small)))
+    finally:
+        stop.set()
+        thread.join()
+    assert seen <= {94.0, 85.0}
+    scoring.load_crime_data("data/processed_crime.csv")
@@ -1,5 +1,4 @@
 import requests
-import json
 
 BASE_URL = "http://localhost:8000"
 
@@ -23,7 +22,7 @@ def test_route():
         print(f"Score: {first_route['safety_score']}")
         
         # Parse geometry
-        geom = json.loads(first_route['geometry'])
+        geom = first_route['geometry']
         print(f"Geometry Type: {geom['type']}")
         print(f"Coordinates: {geom['coordinates']}")
         
@@ -0,0 +1,39 @@
+import json
+from fastapi.testclient import TestClient
+from backend import main
+from backend.cache import RouteCache
+
+BODY = {"start_lat": 28.61, "start_lon": 77.20, "end_lat": 28.65, "end_lon": 77.24}
+
+
+def stream(client, body=BODY):
+    response = client.post("/route/stream", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_matches_route(monkeypatch, stub_osrm):
+    monkeypatch.setattr(main, "route_cache", RouteCache(None, None))
+    with TestClient(main.app) as client:
+        expected = client.post("/route", json=BODY).json()
+        messages = stream(client)
+
+    routes, ranking = messages[:-1], messages[-1]
+    assert [m["type"] for m in routes] == ["route"] * len(expected)
+    assert ranking["type"] == "ranking" and ranking["coarse"] == []
+    by_index = {m["index"]: m["route"] for m in routes}
+    assert [by_index[i] for i in ranking["order"]] == expected
+
+
+def test_over_budget_routes_are_coarse(monkeypatch, stub_osrm):
+    monkeypatch.setattr(main, "route_cache", RouteCache(None, None))
+    monkeypatch.setattr(main, "ROUTE_STREAM_BUDGET_MS", 0)
+    with TestClient(main.app) as client:
+        messages = stream(client, {**BODY, "scoring": "continuous"})
+
+    ranking = messages[-1]
+    assert all(m["coarse"] for m in messages[:-1])
+    assert ranking["coarse"] == sorted(m["index"] for m in messages[:-1])
+    scores = [messages[i]["route"]["safety_score"] for i in ranking["order"]]
+    assert scores == sorted(scores, reverse=True)
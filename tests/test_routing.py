@@ -0,0 +1,47 @@
+import asyncio
+import httpx
+from backend.routing import OSRMClient, RoutingError
+
+OK_BODY = {"code": "Ok", "routes": []}
+
+
+def test_concurrent_identical_requests_share_one_call():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=OK_BODY)
+
+    async def run():
+        client = OSRMClient(transport=httpx.MockTransport(handler))
+        results = await asyncio.gather(*[client.route(28.61, 77.20, 28.62, 77.21) for _ in range(10)])
+        await client.aclose()
+        return client, results
+
+    client, results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == OK_BODY for r in results)
+    assert client.stats["coalesced"] == 9
+
+
+def test_retries_server_errors_then_gives_up():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(502, text="bad gateway")
+
+    async def run():
+        client = OSRMClient(transport=httpx.MockTransport(handler), retries=2)
+        try:
+            await client.route(28.61, 77.20, 28.62, 77.21)
+        finally:
+            await client.aclose()
+
+    try:
+        asyncio.run(run())
+        assert False, "expected RoutingError"
+    except RoutingError as exc:
+        assert exc.status_code == 500
+    assert len(calls) == 3
@@ -0,0 +1,84 @@
+import asyncio
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from backend import main, scoring
+from backend.raster import SafetyRaster
+from benchmarks.synthetic import synthetic_queries
+
+
+def setup_module(module):
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+# Penalty per crime type as in the original scoring loop (anything else: 2)
+PENALTIES = {"Murder": 5.0, "Rape": 5.0, "Kidnapping": 5.0, "Robbery": 5.0, "Theft": 3.0, "Burglary": 3.0}
+
+
+def brute_force_score(store, lat, lon, radius_m=500):
+    # The original per-incident loop: scalar haversine over every incident
+    penalty, types = 0.0, []
+    for i in range(len(store)):
+        if scoring.haversine_distance(lat, lon, float(store.lats[i]), float(store.lons[i])) <= radius_m:
+            c_type = store.crime_types[store.type_codes[i]]
+            penalty += PENALTIES.get(c_type, 2.0)
+            types.append(c_type)
+    return max(0.0, min(100.0, 100.0 - penalty)), len(types), set(types)
+
+
+def test_score_points_match_brute_force_reference():
+    lats, lons = synthetic_queries(200)
+    saved = scoring.DATASET
+    try:
+        # Crime data only: no raster, asset layers or ingested incidents
+        scoring.DATASET = scoring.CrimeDataset(saved.store, saved.index, None)
+        batch = scoring.score_points(lats, lons)
+        single = asyncio.run(scoring.calculate_safety_score(lats[0], lons[0]))
+    finally:
+        scoring.DATASET = saved
+
+    assert single == batch[0]
+    assert any(res["details"]["crimes_nearby"] for res in batch)
+    for lat, lon, res in zip(lats, lons, batch):
+        score, count, types = brute_force_score(saved.store, lat, lon)
+        assert res["score"] == pytest.approx(score)
+        assert res["details"]["crimes_nearby"] == count
+        assert set(res["details"]["crime_types"]) == types
+
+
+def test_score_points_penalizes_hotspot():
+    # Central district centroid has scattered incidents around it
+    res = scoring.score_points([28.6453], [77.2373])[0]
+    assert res["score"] < 100
+    assert res["details"]["crimes_nearby"] > 0
+
+
+def test_raster_matches_exact_scores_at_cell_centres():
+    raster = SafetyRaster.build(scoring.DATASET.store, scoring.DATASET.index, radius_m=500, cell_deg=0.002)
+    rows, cols = np.meshgrid(np.arange(0, raster.shape[0], 7), np.arange(0, raster.shape[1], 7))
+    lats = raster.lat0 + rows.ravel() * raster.cell_deg
+    lons = raster.lon0 + cols.ravel() * raster.cell_deg
+
+    saved = scoring.DATASET
+    try:
+        scoring.DATASET = scoring.CrimeDataset(saved.store, saved.index, None)
+        exact = scoring.score_points(lats, lons)
+        scoring.DATASET = scoring.CrimeDataset(saved.store, saved.index, raster)
+        looked_up = scoring.score_points(lats, lons)
+    finally:
+        scoring.DATASET = saved
+
+    for a, b in zip(exact, looked_up):
+        assert a["score"] == b["score"]
+        assert a["details"]["crimes_nearby"] == b["details"]["crimes_nearby"]
+        assert sorted(a["details"]["crime_types"]) == sorted(b["details"]["crime_types"])
+
+
+def test_score_endpoints_bound_the_radius():
+    client = TestClient(main.app)
+    point = {"lat": 28.6453, "lon": 77.2373}
+    assert client.get("/score", params={**point, "radius_meters": 50000}).status_code == 422
+    assert client.get("/score", params={**point, "radius_meters": 0}).status_code == 422
+    assert client.post("/score/batch", json={"points": [point], "radius_meters": 1e9}).status_code == 422
+    wide = client.get("/score", params={**point, "radius_meters": 1000}).json()
+    assert wide["details"]["crimes_nearby"] >= client.get("/score", params=point).json()["details"]["crimes_nearby"]
@@ -0,0 +1,77 @@
+import asyncio
+import numpy as np
+from backend import main, scoring
+from backend.assets import AssetLayers
+from backend.graph import RoadGraph
+from backend.segments import SegmentScores
+from etl.score_road_segments import score_segments, way_linestrings
+
+# A-B-C along a parallel in central Delhi: way 100 is A-B (two-way), way 200 is B-C (oneway)
+LATS = [28.6300, 28.6300, 28.6300]
+LONS = [77.2000, 77.2050, 77.2100]
+
+
+def make_graph():
+    src, dst, way = [0, 1, 1], [1, 0, 2], [100, 100, 200]
+    return RoadGraph.from_edges([11, 12, 13], LATS, LONS, src, dst, [60.0, 60.0, 60.0], way)
+
+
+def setup_module(module):
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+def test_scores_each_way_once():
+    graph = make_graph()
+    # One working light in the middle of A-B, a station at C
+    lights = (np.array([28.6300]), np.array([77.2025]))
+    stations = (np.array([28.6300]), np.array([77.2100]))
+    segments, edges, way_pos = score_segments(graph, lights, stations, spacing_m=10)
+
+    assert segments.way_ids.tolist() == [100, 200]
+    assert len(edges) == 2 # A-B counted once despite both directions
+    assert 0 < segments.lighting[0] < 100 and segments.lighting[1] == 0
+    assert segments.police[1] > segments.police[0]
+    assert np.all(segments.final >= segments.crime)
+
+    linestrings = way_linestrings(graph, edges, way_pos, len(segments))
+    assert linestrings[0].startswith("LINESTRING(") and linestrings[0].count(",") == 1
+
+
+def test_crime_score_leaves_out_point_asset_bonuses():
+    # Lighting and police are added once, by score_segments, not again via score_values
+    graph = make_graph()
+    saved = scoring.DATASET
+    layers = AssetLayers([28.6300], [77.2025], [5], [28.6300], [77.2100])
+    try:
+        plain, _, _ = score_segments(graph, spacing_m=10)
+        scoring.DATASET = scoring.CrimeDataset(saved.store, saved.index, saved.raster, assets=layers)
+        with_assets, _, _ = score_segments(graph, spacing_m=10)
+    finally:
+        scoring.DATASET = saved
+    assert np.allclose(with_assets.crime, plain.crime)
+    assert np.allclose(with_assets.final, plain.final)
+
+
+def test_route_score_is_length_weighted():
+    graph = make_graph()
+    segments = SegmentScores([100, 200], [0, 0], [0, 0], [0, 0], [40.0, 90.0])
+    # OSRM node annotations C->B->A: B->C is oneway, so C-B resolves to the B->C edge
+    edges = graph.edges_between([13, 12, 11])
+    assert np.all(edges >= 0)
+    score, length, way_scores = segments.score_edges(graph, edges)
+    lengths = graph.edge_length[edges]
+    assert abs(score - (90 * lengths[0] + 40 * lengths[1]) / lengths.sum()) < 1e-3
+    assert way_scores == {200: 90.0, 100: 40.0}
+
+    # Unscored ways are excluded rather than counted as safe or unsafe
+    partial = SegmentScores([100], [0], [0], [0], [40.0])
+    score, length, _ = partial.score_edges(graph, edges)
+    assert score == 40.0 and abs(length - lengths[1]) < 1e-3
+
+
+def test_segment_scoring_falls_back_without_loaded_data(monkeypatch):
+    monkeypatch.setattr(scoring, "DATASET", None)
+    monkeypatch.setattr(main, "_segment_scores", None)
+    assert main.get_segment_scores() is None
+    assert asyncio.run(main.segment_route_scores([{"distance": 100.0, "legs": []}])) == [None]
+    assert main._segment_scores is None # Checked again once data loads
@@ -0,0 +1,38 @@
+import os
+import shutil
+from backend import scoring, snapshot
+
+CSV = "data/processed_crime.csv"
+
+
+def build(tmp_path, monkeypatch):
+    csv = tmp_path / "crime.csv"
+    shutil.copyfile(CSV, csv)
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", None)
+    monkeypatch.setattr(scoring, "RASTER_PATH", None)
+    dataset = scoring.build_dataset(str(csv))
+    snapshot.write_snapshot(str(tmp_path / "snapshot"), dataset.store, dataset.index, source_path=str(csv))
+    monkeypatch.setattr(scoring, "SNAPSHOT_PATH", str(tmp_path / "snapshot"))
+    return csv, dataset
+
+
+def test_snapshot_survives_a_fresh_checkout(tmp_path, monkeypatch, capsys):
+    csv, built = build(tmp_path, monkeypatch)
+    # A clone writes the same bytes with new mtimes
+    checkout = tmp_path / "checkout.csv"
+    shutil.copyfile(csv, checkout)
+    os.utime(checkout, ns=(1, 1))
+    capsys.readouterr()
+    mapped = scoring.build_dataset(str(checkout))
+    assert "from snapshot" in capsys.readouterr().out
+    assert mapped.version == built.version
+
+
+def test_changed_csv_makes_the_snapshot_stale(tmp_path, monkeypatch, capsys):
+    csv, _ = build(tmp_path, monkeypatch)
+    data = csv.read_bytes()
+    csv.write_bytes(data.replace(b"Robbery", b"Burglar", 1)) # Same size, new content
+    assert not snapshot.is_current(snapshot.read_meta(scoring.SNAPSHOT_PATH), str(csv))
+    capsys.readouterr()
+    scoring.build_dataset(str(csv))
+    assert "Ignoring stale snapshot" in capsys.readouterr().out
@@ -0,0 +1,23 @@
+import numpy as np
+from backend.spatial import build_index
+from benchmarks.synthetic import synthetic_incidents, synthetic_queries
+
+
+def test_indexes_match_linear_scan():
+    lats, lons = synthetic_incidents(20000)
+    q_lats, q_lons = synthetic_queries(100)
+    linear = build_index(lats, lons, kind="linear")
+    indexes = [build_index(lats, lons, kind=k) for k in ("grid", "kdtree")]
+
+    for lat, lon in zip(q_lats, q_lons):
+        for radius in (100, 500, 2000):
+            expected = linear.query_radius(lat, lon, radius)
+            for index in indexes:
+                got = index.query_radius(lat, lon, radius)
+                assert np.array_equal(got, expected), f"{index.name} mismatch at r={radius}"
+
+
+def test_empty_index():
+    for kind in ("linear", "grid", "kdtree"):
+        index = build_index([], [], kind=kind)
+        assert len(index.query_radius(28.6, 77.2, 500)) == 0
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from backend import scoring, temporal
+from backend.raster import SafetyRaster
+from backend.spatial import build_index
+from backend.store import CrimeStore
+
+HOTSPOT = (28.6453, 77.2373)
+
+
+def use_store(df):
+    store = CrimeStore.from_dataframe(df)
+    scoring.set_dataset(scoring.CrimeDataset(store, build_index(store.lats, store.lons), None))
+    return store
+
+
+def night_incidents(n=4, seed=0):
+    # Weekday incidents between 22:00 and 22:59
+    rng = np.random.default_rng(seed)
+    stamps = pd.Timestamp("2022-03-07 22:00") + pd.to_timedelta(rng.integers(0, 4, n), unit="D") \
+        + pd.to_timedelta(rng.integers(0, 60, n), unit="min")
+    return pd.DataFrame({
+        "Crime Type": "Theft",
+        "Latitude": HOTSPOT[0] + rng.uniform(-0.002, 0.002, n),
+        "Longitude": HOTSPOT[1] + rng.uniform(-0.002, 0.002, n),
+        "Date Time": stamps.astype(str),
+    })
+
+
+def teardown_module(module):
+    scoring.load_crime_data("data/processed_crime.csv")
+
+
+def test_time_buckets_and_weight_normalization():
+    assert temporal.time_bucket(datetime(2022, 3, 7, 22, 15)) == 22 # Monday
+    assert temporal.time_bucket(datetime(2022, 3, 12, 9)) == 24 + 9 # Saturday
+    assert temporal.time_bucket(datetime(2022, 3, 7, 16, 30, tzinfo=timezone.utc)) == 22 # 22:00 IST
+    share = np.where(np.arange(temporal.TIME_BUCKETS) < 24, 5 / 7, 2 / 7) / 24
+    assert np.allclose(share @ temporal.WEIGHTS, 1.0, atol=1e-5)
+
+
+def test_night_incidents_score_worse_at_night():
+    use_store(night_incidents())
+    untimed = scoring.score_points([HOTSPOT[0]], [HOTSPOT[1]])[0]
+    night = scoring.score_points([HOTSPOT[0]], [HOTSPOT[1]], time_bucket=temporal.time_bucket(datetime(2022, 3, 9, 22)))[0]
+    noon = scoring.score_points([HOTSPOT[0]], [HOTSPOT[1]], time_bucket=temporal.time_bucket(datetime(2022, 3, 9, 12)))[0]
+    assert night["score"] < untimed["score"] < noon["score"]
+    assert night["details"]["crimes_nearby"] == noon["details"]["crimes_nearby"] == 4
+
+
+def test_untimed_data_ignores_query_time():
+    df = night_incidents().drop(columns=["Date Time"])
+    use_store(df)
+    lats, lons = [HOTSPOT[0], HOTSPOT[0] + 0.003], [HOTSPOT[1], HOTSPOT[1]]
+    assert scoring.score_points(lats, lons) == scoring.score_points(lats, lons, time_bucket=22)
+
+
+def test_raster_time_layers_match_exact_timed_scores():
+    store = use_store(night_incidents())
+    raster = SafetyRaster.build(store, scoring.DATASET.index, radius_m=500, cell_deg=0.001, time_layers=True)
+    assert raster.has_time_layers
+    rows, cols = np.meshgrid(np.arange(0, raster.shape[0], 3), np.arange(0, raster.shape[1], 3))
+    lats = raster.lat0 + rows.ravel() * raster.cell_deg
+    lons = raster.lon0 + cols.ravel() * raster.cell_deg
+    for bucket in (3, 22, 30):
+        exact = scoring.score_values(lats, lons, time_bucket=bucket)
+        scoring.set_dataset(scoring.CrimeDataset(store, scoring.DATASET.index, raster))
+        looked_up = scoring.score_values(lats, lons, time_bucket=bucket)
+        scoring.set_dataset(scoring.CrimeDataset(store, scoring.DATASET.index, None))
+        assert np.allclose(exact, looked_up, atol=1e-3)
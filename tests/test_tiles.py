@@ -0,0 +1,101 @@
+import struct
+import zlib
+import numpy as np
+from fastapi.testclient import TestClient
+from backend import main, scoring, tiles
+from backend.incidents import IncidentBatch, IncidentDelta
+
+CENTRAL = (28.6453, 77.2373)
+
+
+def setup_module(module):
+    if scoring.DATASET is None:
+        scoring.load_crime_data("data/processed_crime.csv")
+
+
+def decode_png(data):
+    # Minimal reader for encode_png's output: RGBA, filter type 0
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, idat = 8, b""
+    while pos < len(data):
+        length, tag = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        assert struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])[0] == zlib.crc32(tag + body)
+        if tag == b"IHDR":
+            w, h = struct.unpack(">II", body[:8])
+        elif tag == b"IDAT":
+            idat += body
+        pos += 12 + length
+    rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(h, 1 + w * 4)
+    assert (rows[:, 0] == 0).all()
+    return rows[:, 1:].reshape(h, w, 4)
+
+
+def central_tile(z):
+    x0, _, y0, _ = tiles.tile_range(CENTRAL[0], CENTRAL[1], CENTRAL[0], CENTRAL[1], z)
+    return x0, y0
+
+
+def test_png_round_trip():
+    rgba = np.random.default_rng(0).integers(0, 256, (7, 5, 4), dtype=np.uint8)
+    assert np.array_equal(decode_png(tiles.encode_png(rgba)), rgba)
+
+
+def test_safety_tile_pixels_are_scores_at_sample_centres():
+    x, y = central_tile(14)
+    image = decode_png(tiles.render_tile("safety", 14, x, y))
+    lats, lons = tiles.tile_lat_lon(14, x, y, tiles.TILE_SAMPLES)
+    grid_lats, grid_lons = np.meshgrid(lats, lons, indexing="ij")
+    scores = scoring.score_values(grid_lats.ravel(), grid_lons.ravel()).reshape(grid_lats.shape)
+    step = tiles.TILE_SIZE // tiles.TILE_SAMPLES
+    assert np.array_equal(image[::step, ::step], tiles.colorize(100.0 - scores))
+
+
+def test_density_tracks_safety():
+    x, y = central_tile(13)
+    safety = tiles.render_safety(13, x, y)
+    density = tiles.render_density(13, x, y, scoring.DATASET)
+    assert np.corrcoef(safety.ravel(), density.ravel())[0, 1] > 0.8
+
+
+def test_density_and_extent_include_pending_incidents(monkeypatch):
+    dataset = scoring.DATASET
+    lat, lon = dataset.store.lats.max() + 0.05, dataset.store.lons.max() + 0.05
+    x0, _, y0, _ = tiles.tile_range(lat, lon, lat, lon, 13)
+    assert not tiles.render_density(13, x0, y0, dataset).any()
+    delta = IncidentDelta(dataset.incident_seq, IncidentBatch([lat] * 3, [lon] * 3, ["Robbery"] * 3, [np.nan] * 3,
+                                                              [0] * 3))
+    monkeypatch.setattr(dataset, "delta", delta)
+    assert tiles.render_density(13, x0, y0, dataset).any()
+    south, west, north, east = tiles.data_extent(dataset)
+    assert south < lat < north and west < lon < east
+
+
+def test_disk_cache_prunes_old_versions_and_caps_tiles(tmp_path):
+    cache = tiles.TileCache(directory=str(tmp_path), max_disk_tiles=10)
+    for y in range(5):
+        cache.put("v1", "safety", 13, 0, y, b"png")
+    cache.put("v2", "safety", 13, 0, 0, b"png")
+    assert not (tmp_path / "v1").exists()
+    for y in range(1, 12):
+        cache.put("v2", "safety", 13, 0, y, b"png")
+    assert len(list(tmp_path.rglob("*.png"))) <= 10
+
+
+def test_endpoint_caches_and_revalidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "tile_cache", tiles.TileCache(directory=str(tmp_path)))
+    x, y = central_tile(13)
+    with TestClient(main.app) as client:
+        first = client.get(f"/tiles/safety/13/{x}/{y}.png")
+        assert first.status_code == 200 and first.headers["content-type"] == "image/png"
+        again = client.get(f"/tiles/safety/13/{x}/{y}.png")
+        assert again.content == first.content and main.tile_cache.renders == 1
+        revalidated = client.get(f"/tiles/safety/13/{x}/{y}.png", headers={"If-None-Match": first.headers["ETag"]})
+        assert revalidated.status_code == 304
+
+        # Served from disk by a fresh cache; far from the data no scoring runs at all
+        monkeypatch.setattr(main, "tile_cache", tiles.TileCache(directory=str(tmp_path)))
+        monkeypatch.setattr(scoring, "score_values", None)
+        assert client.get(f"/tiles/safety/13/{x}/{y}.png").content == first.content
+        assert client.get("/tiles/safety/13/0/0.png").content == tiles.EMPTY_TILE
+        assert client.get("/tiles/nope/13/0/0.png").status_code == 404